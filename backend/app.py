@@ -24,6 +24,10 @@ def create_app(config_name=None):
     
     app.config.from_object(config_dict[config_name])
     
+    # Response JSON encoder
+    from utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
     # Initialize extensions
     jwt.init_app(app)
     
@@ -34,10 +38,66 @@ def create_app(config_name=None):
          allow_headers=['Content-Type', 'Authorization'],
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
     
+    # Password hashing pool (started on first use)
+    from services.passwords import password_hasher
+    password_hasher.init_app(app)
+    
+    # Login throttling (per email and client IP)
+    from services.login_limiter import login_limiter
+    login_limiter.init_app(app)
+    
     # Initialize database
     from database import init_db
     init_db(app)
     
+    # Initialize availability engine (built lazily on first search)
+    from services.occupancy import occupancy_engine
+    occupancy_engine.init_app(app)
+    
+    # Booking / transaction reference generator
+    from utils.references import reference_ids
+    reference_ids.init_app(app)
+    
+    # Initialize catalog cache
+    from services.cache import catalog_cache
+    catalog_cache.init_app(app)
+    
+    # Rate calendars (nightly pricing)
+    from services.pricing import rate_calendars
+    rate_calendars.init_app(app)
+    
+    # Room hold store
+    from services.holds import hold_store
+    hold_store.init_app(app)
+    
+    # Idempotency-Key store
+    from services.idempotency import idempotency_store
+    idempotency_store.init_app(app)
+    
+    # Revoked tokens (logout, deactivation, role change)
+    from services.revocation import token_revocations
+    token_revocations.init_app(app)
+    
+    @jwt.token_in_blocklist_loader
+    def token_revoked_check(jwt_header, jwt_payload):
+        return token_revocations.is_revoked(jwt_payload)
+    
+    @jwt.additional_claims_loader
+    def token_issue_claims(identity):
+        return token_revocations.issue_claims()
+    
+    # Write-behind login bookkeeping (flushed on shutdown)
+    from services.login_buffer import login_buffer
+    login_buffer.init_app(app)
+    
+    # Authenticated-user cache (one user load per request, optionally cached)
+    from services.user_cache import user_cache
+    user_cache.init_app(app)
+    
+    # Booking lifecycle sweeper (only started when enabled)
+    from services.lifecycle import booking_sweeper
+    booking_sweeper.init_app(app)
+    
     # Register blueprints
     from routes.auth import auth_bp
     from routes.hotels import hotels_bp
@@ -64,6 +124,13 @@ def create_app(config_name=None):
             'message': 'Authentication token is invalid'
         }), 401
     
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({
+            'error': 'Token has been revoked',
+            'message': 'Please log in again'
+        }), 401
+    
     @jwt.unauthorized_loader
     def missing_token_callback(error):
         return jsonify({
@@ -87,6 +154,22 @@ def create_app(config_name=None):
             'roles': ['client', 'hotelier', 'admin']
         }), 200
     
+    # CLI: repair / daily rollover of the materialized hotel summaries
+    @app.cli.command('rebuild-hotel-summary')
+    def rebuild_hotel_summary_command():
+        """Rebuild the hotel_summary table from rooms and bookings"""
+        from services.hotel_summary import rebuild_hotel_summaries
+        count = rebuild_hotel_summaries()
+        print(f"[v0] Rebuilt {count} hotel summaries")
+    
+    # CLI: move past confirmed bookings to completed / no-show
+    @app.cli.command('sweep-bookings')
+    def sweep_bookings_command():
+        """Run the booking lifecycle sweeper once"""
+        from services.lifecycle import booking_sweeper
+        counts = booking_sweeper.run_once(app)
+        print(f"[v0] Swept bookings: {counts}")
+    
     # Health check endpoint
     @app.route('/health')
     def health():
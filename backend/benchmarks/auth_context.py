@@ -0,0 +1,94 @@
+"""
+Benchmark: authenticated-user resolution per request
+
+Counts the SQL statements (all of them, and the SELECTs on users) issued
+by authenticated endpoints, and their latency, with the user resolved once
+per request from the database (AUTH_USER_CACHE_BACKEND='none') and served
+from the memory user cache.
+
+Usage (from backend/):
+    python -m benchmarks.auth_context --database-url <scratch-db-url>
+"""
+from sqlalchemy import event
+
+from benchmarks.common import base_parser, create_bench_app, measure, report, seed_catalog, teardown
+
+# name, url, token holder
+CASES = (
+    ('me (jwt_required)', '/api/auth/me', 'client'),
+    ('bookings (role_required)', '/api/bookings?limit=20', 'client'),
+    ('booking detail (role_required)', '/api/bookings/1', 'client'),
+    ('admin user (admin_required)', '/api/admin/users/1', 'admin'),
+)
+
+
+class StatementCounter:
+    """Counts statements executed on an engine"""
+
+    def __init__(self, engine):
+        self.total = 0
+        self.user_selects = 0
+        event.listen(engine, 'before_cursor_execute', self)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.total += 1
+        if statement.lstrip().upper().startswith('SELECT') and 'FROM users' in statement:
+            self.user_selects += 1
+
+    def reset(self):
+        self.total = 0
+        self.user_selects = 0
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=200)
+    parser.add_argument('--bookings-per-room', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from flask_jwt_extended import create_access_token
+    from database import db
+    from models.user import User
+    from services.cache import MemoryCache, NullCache
+    from services.user_cache import user_cache
+
+    seeded = seed_catalog(args.rooms, args.bookings_per_room, seed=args.seed)
+    admin = User(email='bench-admin@hoteliasem.cm', password='Bench123!', full_name='Bench Admin', user_type='admin')
+    db.session.add(admin)
+    db.session.commit()
+    print(f"Seeded {seeded['hotels']} hotels, {seeded['rooms']} rooms, {seeded['bookings']} bookings")
+
+    tokens = {
+        'client': create_access_token(identity=seeded['client_id']),
+        'admin': create_access_token(identity=admin.id),
+    }
+    counter = StatementCounter(db.engine)
+    client = app.test_client()
+    results = {}
+
+    for mode, cache in (('no user cache', NullCache()), ('memory user cache', MemoryCache(10000))):
+        user_cache.cache = cache
+        for name, url, holder in CASES:
+            headers = {'Authorization': f'Bearer {tokens[holder]}'}
+
+            def call(i):
+                assert client.get(url, headers=headers).status_code == 200
+                # The benchmark keeps one app context: start each request
+                # with an empty session, as a fresh request would
+                db.session.remove()
+
+            call(0)
+            counter.reset()
+            result = measure(call, args.iterations)
+            result['queries_per_req'] = round(counter.total / args.iterations, 2)
+            result['user_selects_per_req'] = round(counter.user_selects / args.iterations, 2)
+            results[f'{name}, {mode}'] = result
+
+    report('Authenticated-user resolution', results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
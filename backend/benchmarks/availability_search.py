@@ -0,0 +1,73 @@
+"""
+Benchmark: date-range availability search
+
+Seeds 10k rooms and 1M bookings (by default) and times the set-based
+search behind GET /api/hotels/search for random cities, stays and guest
+counts, then the same searches answered by the in-process occupancy engine.
+
+Usage (from backend/):
+    python -m benchmarks.availability_search --database-url <scratch-db-url>
+"""
+import random
+from datetime import date, timedelta
+
+from benchmarks.common import (
+    CITIES,
+    base_parser,
+    create_bench_app,
+    measure,
+    report,
+    seed_catalog,
+    teardown
+)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=10000)
+    parser.add_argument('--bookings-per-room', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    create_bench_app(args.database_url)
+    from services.availability import available_rooms_query, search_available_hotels
+    from services.occupancy import occupancy_engine
+
+    seeded = seed_catalog(args.rooms, args.bookings_per_room, seed=args.seed)
+    print(f"Seeded {seeded['hotels']} hotels, {seeded['rooms']} rooms, {seeded['bookings']} bookings")
+
+    rng = random.Random(args.seed)
+    stays = []
+    for _ in range(args.iterations):
+        check_in = date.today() + timedelta(days=rng.randint(0, 180))
+        stays.append((check_in, check_in + timedelta(days=rng.randint(1, 7)), rng.randint(1, 4), rng.choice(CITIES)))
+
+    def count_only(i):
+        check_in, check_out, guests, city = stays[i]
+        available_rooms_query(check_in, check_out, guests, city).count()
+
+    def full_search(i):
+        check_in, check_out, guests, city = stays[i]
+        search_available_hotels(check_in, check_out, guests, city)
+
+    def engine_free_rooms(i):
+        check_in, check_out, guests, city = stays[i]
+        occupancy_engine.free_room_ids(check_in, check_out, city, guests)
+
+    results = {
+        'count (SQL only)': measure(count_only, args.iterations),
+        'search + serialize': measure(full_search, args.iterations),
+    }
+
+    occupancy_engine.enabled = True
+    results['engine build'] = measure(lambda i: occupancy_engine.build(), 1)
+    results['engine free rooms (city)'] = measure(engine_free_rooms, args.iterations)
+    results['engine search + serialize'] = measure(full_search, args.iterations)
+    report('Availability search', results)
+    print(f"\nEngine memory: {occupancy_engine.memory_report()}")
+
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark: concurrent booking creation
+
+N threads post bookings through POST /api/bookings, first all on the same
+room, then spread over the rooms of the same hotel. Reports bookings/sec,
+latency, conflicts (409) and the number of double-booked room nights found
+in the database afterwards, which must be zero.
+
+The in-memory SQLite default shares one connection between threads, so this
+benchmark defaults to a temporary SQLite file instead.
+
+Usage (from backend/):
+    python -m benchmarks.booking_contention --database-url <scratch-db-url>
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import base_parser, create_bench_app, report, seed_catalog, summarize, teardown
+
+
+def double_bookings():
+    """Pairs of distinct confirmed bookings overlapping on the same room"""
+    from sqlalchemy import and_, func
+    from sqlalchemy.orm import aliased
+    from database import db
+    from models.booking import Booking
+
+    other = aliased(Booking)
+    return db.session.query(func.count()).select_from(Booking).join(other, and_(
+        other.room_id == Booking.room_id,
+        other.id > Booking.id,
+        other.check_in_date < Booking.check_out_date,
+        other.check_out_date > Booking.check_in_date
+    )).filter(Booking.status == 'confirmed', other.status == 'confirmed').scalar()
+
+
+def run_scenario(app, headers, room_ids, threads, requests_per_thread, seed):
+    """Fire bookings from several threads and collect latency and status counts"""
+    timings = []
+    statuses = {}
+    lock = threading.Lock()
+    start_day = date.today() + timedelta(days=1)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        client = app.test_client()
+        local_timings, local_statuses = [], {}
+        for _ in range(requests_per_thread):
+            check_in = start_day + timedelta(days=rng.randint(0, 60))
+            payload = {
+                'room_id': rng.choice(room_ids),
+                'check_in_date': check_in.isoformat(),
+                'check_out_date': (check_in + timedelta(days=rng.randint(1, 4))).isoformat(),
+                'num_adults': 1,
+            }
+            t0 = time.perf_counter()
+            status = client.post('/api/bookings', json=payload, headers=headers).status_code
+            local_timings.append((time.perf_counter() - t0) * 1000)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            timings.extend(local_timings)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    result = summarize(timings, elapsed)
+    result['bookings_per_sec'] = round(statuses.get(201, 0) / elapsed, 1)
+    result['created'] = statuses.get(201, 0)
+    result['conflicts'] = statuses.get(409, 0)
+    result['errors'] = sum(count for status, count in statuses.items() if status not in (201, 409))
+    return result
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.set_defaults(database_url=os.environ.get('BENCH_DATABASE_URL') or
+                        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'booking_contention.db')}")
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='Requests per thread')
+    parser.add_argument('--rooms', type=int, default=20, help='Rooms in the hotel')
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from flask_jwt_extended import create_access_token
+    from database import db
+    from models.booking import Booking
+    from models.room import Room
+
+    seeded = seed_catalog(args.rooms, 0, rooms_per_hotel=args.rooms, seed=args.seed)
+    room_ids = [room_id for (room_id,) in db.session.query(Room.id).order_by(Room.id)]
+    db.session.query(Room).update({Room.max_guests: 6})
+    db.session.commit()
+    headers = {'Authorization': f"Bearer {create_access_token(identity=seeded['client_id'])}"}
+
+    results = {}
+    for name, targets in (('same room', room_ids[:1]), ('same hotel', room_ids)):
+        db.session.query(Booking).delete()
+        db.session.commit()
+        result = run_scenario(app, headers, targets, args.threads, args.requests, args.seed)
+        db.session.remove()
+        result['double_bookings'] = double_bookings()
+        results[name] = result
+
+    report(f'{args.threads} threads x {args.requests} bookings ({db.engine.dialect.name})', results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""
+Shared helpers for HoteliaSEM benchmarks
+
+Benchmarks run against a scratch database given by --database-url (or the
+BENCH_DATABASE_URL environment variable). The schema is created from the
+models and dropped again at the end unless --keep is passed.
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+CITIES = ['Douala', 'Yaounde', 'Kribi', 'Limbe', 'Bafoussam']
+ROOM_TYPES = ['standard', 'deluxe', 'suite']
+CHUNK_SIZE = 10000
+
+
+def base_parser(description):
+    """Argument parser with the options shared by every benchmark"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', 'sqlite://'),
+                        help='Scratch database URL (default: in-memory SQLite)')
+    parser.add_argument('--keep', action='store_true', help='Keep the seeded schema')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    return parser
+
+
+def create_bench_app(database_url):
+    """Create the Flask app bound to the benchmark database with a fresh schema"""
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['FLASK_ENV'] = 'production'
+
+    from app import app
+    from database import db
+
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    app.app_context().push()
+
+    from services.passwords import password_hasher
+    password_hasher.init_app(app)
+
+    if db.engine.dialect.name == 'sqlite':
+        _adapt_schema_for_sqlite(db)
+
+    db.drop_all()
+    db.create_all()
+    return app
+
+
+def _adapt_schema_for_sqlite(db):
+    """SQLite has no DATEDIFF and only autoincrements INTEGER primary keys"""
+    from sqlalchemy import Integer, text
+    from models.booking import Booking
+    from models.audit_log import AuditLog
+
+    Booking.__table__.c.num_nights.computed.sqltext = text(
+        "CAST(julianday(check_out_date) - julianday(check_in_date) AS INTEGER)"
+    )
+    AuditLog.__table__.c.id.type = Integer()
+
+
+def insert_chunked(table, rows):
+    """Insert an iterable of row dicts with executemany in fixed-size chunks"""
+    from database import db
+
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            db.session.execute(table.insert(), chunk)
+            db.session.commit()
+            chunk = []
+    if chunk:
+        db.session.execute(table.insert(), chunk)
+        db.session.commit()
+
+
+def seed_catalog(num_rooms, bookings_per_room, rooms_per_hotel=20, seed=42):
+    """
+    Seed users, approved hotels, rooms and non-overlapping bookings
+
+    Bookings for each room are laid out back to back, starting 90 days in
+    the past, with 10% of them cancelled and 30% carrying special requests.
+
+    Returns:
+        Dict with the seeded row counts and the id of the client user
+    """
+    from database import db
+    from models.user import User
+    from models.hotel import Hotel
+    from models.room import Room
+    from models.booking import Booking
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+
+    owner = User(email='bench-owner@hoteliasem.cm', password='Bench123!', full_name='Bench Owner', user_type='hotelier')
+    client = User(email='bench-client@hoteliasem.cm', password='Bench123!', full_name='Bench Client')
+    db.session.add_all([owner, client])
+    db.session.commit()
+
+    num_hotels = max(1, num_rooms // rooms_per_hotel)
+    insert_chunked(Hotel.__table__, (
+        {
+            'id': hotel_id,
+            'name': f'Bench Hotel {hotel_id}',
+            'description': 'Seeded for benchmarking ' * 20,
+            'address': f'{hotel_id} Rue du Benchmark',
+            'city': CITIES[hotel_id % len(CITIES)],
+            'country': 'Cameroun',
+            'rating': round(rng.uniform(0, 5), 2),
+            'total_reviews': rng.randint(0, 500),
+            'owner_id': owner.id,
+            'subscription_type': 'premium' if hotel_id % 4 == 0 else 'standard',
+            'status': 'approved',
+            'is_manually_geocoded': False,
+            'commission_rate': 0.15,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for hotel_id in range(1, num_hotels + 1)
+    ))
+
+    insert_chunked(Room.__table__, (
+        {
+            'id': room_id,
+            'hotel_id': (room_id - 1) % num_hotels + 1,
+            'room_number': str(room_id),
+            'room_type': ROOM_TYPES[room_id % len(ROOM_TYPES)],
+            'price_per_night': rng.choice([15000, 25000, 35000, 50000, 90000]),
+            'currency': 'XAF',
+            'max_guests': rng.randint(1, 6),
+            'is_available': room_id % 50 != 0,
+            'created_at': now,
+            'updated_at': now,
+        }
+        for room_id in range(1, num_rooms + 1)
+    ))
+
+    def bookings():
+        booking_id = 0
+        start = date.today() - timedelta(days=90)
+        for room_id in range(1, num_rooms + 1):
+            day = start + timedelta(days=rng.randint(0, 3))
+            for _ in range(bookings_per_room):
+                booking_id += 1
+                nights = rng.randint(1, 5)
+                yield {
+                    'id': booking_id,
+                    'booking_ref': f'BENCH-{booking_id:09d}',
+                    'user_id': client.id,
+                    'hotel_id': (room_id - 1) % num_hotels + 1,
+                    'room_id': room_id,
+                    'check_in_date': day,
+                    'check_out_date': day + timedelta(days=nights),
+                    'num_adults': 1,
+                    'num_children': 0,
+                    'total_price': 25000 * nights,
+                    'status': 'cancelled' if rng.random() < 0.1 else 'confirmed',
+                    'special_requests': 'Late check-in, airport pickup, quiet room. ' * 5 if rng.random() < 0.3 else None,
+                    'created_at': now,
+                    'updated_at': now,
+                }
+                day += timedelta(days=nights + rng.randint(0, 3))
+
+    insert_chunked(Booking.__table__, bookings())
+
+    return {
+        'hotels': num_hotels,
+        'rooms': num_rooms,
+        'bookings': num_rooms * bookings_per_room,
+        'client_id': client.id,
+        'owner_id': owner.id,
+    }
+
+
+def measure(fn, iterations):
+    """
+    Call fn repeatedly and summarise its latency
+
+    Returns:
+        Dict with mean/p50/p99 latency in milliseconds and calls per second
+    """
+    timings = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    return summarize(timings, elapsed)
+
+
+def summarize(timings, elapsed):
+    """Summarise a list of latencies (ms) collected over elapsed seconds"""
+    timings = sorted(timings)
+    return {
+        'calls': len(timings),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'p50_ms': round(timings[len(timings) // 2], 3),
+        'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+        'per_sec': round(len(timings) / elapsed, 1) if elapsed else None,
+    }
+
+
+def report(title, results):
+    """Print one benchmark result line per entry"""
+    print(f'\n{title}')
+    print('-' * len(title))
+    for name, result in results.items():
+        fields = ', '.join(f'{key}={value}' for key, value in result.items())
+        print(f'{name:<32} {fields}')
+
+
+def teardown(keep):
+    """Drop the benchmark schema unless asked to keep it"""
+    from database import db
+
+    db.session.remove()
+    if not keep:
+        db.drop_all()
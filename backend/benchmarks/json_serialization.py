@@ -0,0 +1,72 @@
+"""
+Benchmark: list serialization paths
+
+Compares, for a list of bookings:
+- the previous path: ORM objects -> to_dict() -> stdlib json
+- ORM objects -> to_dict() -> orjson
+- column rows -> serialize_rows() -> orjson (current list endpoints)
+
+and the end-to-end GET /api/bookings (admin, 100-row page) with each JSON provider.
+
+Usage (from backend/):
+    python -m benchmarks.json_serialization --database-url <scratch-db-url>
+"""
+from benchmarks.common import base_parser, create_bench_app, measure, report, seed_catalog, teardown
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=1000)
+    parser.add_argument('--bookings-per-room', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from flask.json.provider import DefaultJSONProvider
+    from flask_jwt_extended import create_access_token
+    from database import db
+    from models.booking import Booking
+    from models.user import User
+    from utils.json_provider import OrjsonProvider
+    from utils.rows import columns_for, serialize_rows
+
+    seeded = seed_catalog(args.rooms, args.bookings_per_room, seed=args.seed)
+    admin = User(email='bench-admin@hoteliasem.cm', password='Bench123!', full_name='Bench Admin', user_type='admin')
+    db.session.add(admin)
+    db.session.commit()
+    admin_id = admin.id
+    print(f"Seeded {seeded['bookings']} bookings")
+
+    stdlib_json = DefaultJSONProvider(app)
+    fast_json = OrjsonProvider(app)
+    columns = columns_for(Booking)
+
+    def orm_dicts():
+        db.session.remove()
+        return [booking.to_dict() for booking in Booking.query.order_by(Booking.created_at.desc()).all()]
+
+    def row_dicts():
+        db.session.remove()
+        rows = Booking.query.with_entities(*columns).order_by(Booking.created_at.desc()).all()
+        return serialize_rows(rows, columns)
+
+    results = {
+        'orm + to_dict + json': measure(lambda i: stdlib_json.dumps({'bookings': orm_dicts()}), args.iterations),
+        'orm + to_dict + orjson': measure(lambda i: fast_json.dumps({'bookings': orm_dicts()}), args.iterations),
+        'rows + orjson': measure(lambda i: fast_json.dumps({'bookings': row_dicts()}), args.iterations),
+    }
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin_id)}'}
+    for name, provider in (('json', stdlib_json), ('orjson', fast_json)):
+        app.json = provider
+        results[f'GET /api/bookings ({name})'] = measure(
+            lambda i: client.get('/api/bookings?limit=100', headers=headers), args.iterations
+        )
+
+    report(f"Serializing {seeded['bookings']} bookings", results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
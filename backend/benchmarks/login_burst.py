@@ -0,0 +1,131 @@
+"""
+Benchmark: catalog latency during a login burst
+
+Fires logins at a fixed rate (200/s by default) from a pool of request
+threads, as a threaded web worker would receive them, while one client
+reads the hotel catalog back to back. Catalog p99 is reported at rest and
+during the burst, with bcrypt on the request threads
+(PASSWORD_HASH_WORKERS = 0) and on the password hashing pool. Logins the
+pool sheds are counted as 503s.
+
+The in-memory SQLite default shares one connection between threads, so this
+benchmark defaults to a temporary SQLite file instead.
+
+Usage (from backend/):
+    python -m benchmarks.login_burst --database-url <scratch-db-url>
+"""
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import base_parser, create_bench_app, report, seed_catalog, summarize, teardown
+
+CATALOG_URL = '/api/hotels?limit=20'
+
+
+def read_catalog(app, duration):
+    """Read the catalog back to back for duration seconds"""
+    client = app.test_client()
+    timings = []
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        t0 = time.perf_counter()
+        assert client.get(CATALOG_URL).status_code == 200
+        timings.append((time.perf_counter() - t0) * 1000)
+    return summarize(timings, time.perf_counter() - started)
+
+
+def login_burst(app, emails, rate, duration, threads):
+    """
+    Submit rate logins per second for duration seconds
+
+    Returns:
+        (status counts, latencies in ms from submission to response)
+    """
+    local = threading.local()
+    statuses = {}
+    timings = []
+    lock = threading.Lock()
+
+    def login(email, submitted):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        status = local.client.post('/api/auth/login', json={'email': email, 'password': 'Bench123!'}).status_code
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            timings.append((time.perf_counter() - submitted) * 1000)
+
+    with ThreadPoolExecutor(threads) as executor:
+        started = time.perf_counter()
+        for i in range(int(rate * duration)):
+            # Open loop: keep the arrival rate whatever the response times
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(login, emails[i % len(emails)], time.perf_counter())
+    return statuses, timings
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.set_defaults(database_url=os.environ.get('BENCH_DATABASE_URL') or
+                        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login_burst.db')}")
+    parser.add_argument('--rate', type=int, default=200, help='Logins per second')
+    parser.add_argument('--duration', type=float, default=5, help='Seconds of burst')
+    parser.add_argument('--rounds', type=int, default=10, help='bcrypt cost factor')
+    parser.add_argument('--threads', type=int, default=12, help='Request threads serving logins')
+    parser.add_argument('--workers', type=int, default=2, help='Password hashing processes')
+    parser.add_argument('--max-queue', type=int, default=8, help='PASSWORD_HASH_MAX_QUEUE')
+    parser.add_argument('--users', type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from database import db
+    from models.user import User
+    from services.login_limiter import login_limiter
+    from services.passwords import password_hasher
+
+    # Every login comes from the same client: measure hashing, not throttling
+    app.config.update(BCRYPT_LOG_ROUNDS=args.rounds, PASSWORD_HASH_MAX_QUEUE=args.max_queue, RATELIMIT_ENABLED=False)
+    password_hasher.init_app(app)
+    login_limiter.init_app(app)
+
+    seeded = seed_catalog(200, 2, seed=args.seed)
+    emails = [f'bench-login-{i}@hoteliasem.cm' for i in range(args.users)]
+    db.session.add_all(User(email=email, password='Bench123!', full_name='Bench Login') for email in emails)
+    db.session.commit()
+    db.session.remove()
+    print(f"Seeded {seeded['hotels']} hotels and {args.users} users (bcrypt cost {args.rounds})")
+
+    results = {'catalog at rest': read_catalog(app, 2)}
+    for mode, workers in (('request threads', 0), (f'pool of {args.workers}', args.workers)):
+        app.config['PASSWORD_HASH_WORKERS'] = workers
+        password_hasher.init_app(app)
+        if workers:
+            password_hasher.check(db.session.get(User, seeded['client_id']).password_hash, 'warm-up')
+
+        burst = []
+        burster = threading.Thread(target=lambda: burst.extend(
+            login_burst(app, emails, args.rate, args.duration, args.threads)))
+        burster.start()
+        result = read_catalog(app, args.duration)
+        burster.join()
+
+        statuses, timings = burst
+        logins = summarize(timings, args.duration)
+        result['logins_ok'] = statuses.get(200, 0)
+        result['logins_503'] = statuses.get(503, 0)
+        result['login_errors'] = sum(count for status, count in statuses.items() if status not in (200, 503))
+        result['login_p50_ms'] = logins['p50_ms']
+        result['login_p99_ms'] = logins['p99_ms']
+        results[f'catalog during burst, bcrypt on {mode}'] = result
+        password_hasher.shutdown()
+
+    report(f'{args.rate} logins/s for {args.duration:g} s', results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: hotel occupancy calendar
+
+Seeds one hotel (500 rooms by default) with bookings covering more than a
+year and times GET /api/hotels/<id>/occupancy over a 365-night window. The
+result is checked once against a naive per-booking, per-night loop.
+
+Usage (from backend/):
+    python -m benchmarks.occupancy_calendar --database-url <scratch-db-url>
+"""
+from datetime import date, timedelta
+
+from benchmarks.common import base_parser, create_bench_app, measure, report, seed_catalog, teardown
+
+
+def naive_booked_rooms(hotel_id, start, days):
+    """Reference result: walk every night of every booking in Python"""
+    from models.booking import Booking
+    from services.calendar import OCCUPIED_STATUSES
+
+    booked = [0] * days
+    for booking in Booking.query.filter(Booking.hotel_id == hotel_id, Booking.status.in_(OCCUPIED_STATUSES)):
+        night = booking.check_in_date
+        while night < booking.check_out_date:
+            offset = (night - start).days
+            if 0 <= offset < days:
+                booked[offset] += 1
+            night += timedelta(days=1)
+    return booked
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=500)
+    parser.add_argument('--bookings-per-room', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from flask_jwt_extended import create_access_token
+
+    seeded = seed_catalog(args.rooms, args.bookings_per_room, rooms_per_hotel=args.rooms, seed=args.seed)
+    print(f"Seeded 1 hotel with {seeded['rooms']} rooms and {seeded['bookings']} bookings")
+
+    client = app.test_client()
+    headers = {'Authorization': f"Bearer {create_access_token(identity=seeded['owner_id'])}"}
+    start = date.today() - timedelta(days=60)
+    url = f'/api/hotels/1/occupancy?start={start.isoformat()}&days={args.days}'
+
+    calendar = client.get(url, headers=headers).get_json()
+    matches = calendar['booked_rooms'] == naive_booked_rooms(1, start, args.days)
+
+    result = measure(lambda i: client.get(url, headers=headers), args.iterations)
+    result['matches_naive'] = matches
+    result['room_nights'] = calendar['totals']['room_nights_booked']
+    report(f"Occupancy calendar ({args.rooms} rooms, {args.days} nights)", {'GET occupancy': result})
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
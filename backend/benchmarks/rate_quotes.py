@@ -0,0 +1,132 @@
+"""
+Benchmark: nightly-rate quotes
+
+Seeds hotels with rooms and a mix of seasonal, weekend, room-type and
+length-of-stay rate rules, then times:
+- compiling one hotel's rate calendar (cold)
+- GET /api/hotels/quote for every room of a hotel (warm calendars)
+- the same stays priced by a naive per-room, per-night rule walk
+The warm quotes are checked once against the naive prices.
+
+Usage (from backend/):
+    python -m benchmarks.rate_quotes --database-url <scratch-db-url>
+"""
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.common import base_parser, create_bench_app, insert_chunked, measure, report, seed_catalog, teardown
+
+
+def seed_rules(num_hotels, seed):
+    """A season, weekends, a room-type price and a weekly discount per hotel"""
+    from models.rate_rule import RateRule
+
+    rng = random.Random(seed)
+    today = date.today()
+    empty = {'room_id': None, 'room_type': None, 'start_date': None, 'end_date': None, 'weekdays': None,
+             'min_nights': None, 'name': None, 'created_at': datetime.utcnow()}
+    rows = []
+    for hotel_id in range(1, num_hotels + 1):
+        season = today + timedelta(days=rng.randint(0, 60))
+        rows += [
+            {'hotel_id': hotel_id, 'adjustment': 'percent', 'value': Decimal(25), 'priority': 0,
+             'start_date': season, 'end_date': season + timedelta(days=45)},
+            {'hotel_id': hotel_id, 'adjustment': 'percent', 'value': Decimal(15), 'priority': 1, 'weekdays': 0b1110000},
+            {'hotel_id': hotel_id, 'adjustment': 'fixed', 'value': Decimal(60000), 'priority': 2, 'room_type': 'suite'},
+            {'hotel_id': hotel_id, 'adjustment': 'percent', 'value': Decimal(-10), 'priority': 3, 'min_nights': 7},
+        ]
+    insert_chunked(RateRule.__table__, ({**empty, **row} for row in rows))
+    return len(rows)
+
+
+def naive_price(room, rules, check_in, check_out):
+    """Reference price: apply every rule to every night in Python"""
+    nights = (check_out - check_in).days
+    total = 0
+    for offset in range(nights):
+        night = check_in + timedelta(days=offset)
+        price = int(room.price_per_night * 100)
+        for rule in rules:
+            if rule.room_id is not None and rule.room_id != room.id:
+                continue
+            if rule.room_type is not None and rule.room_type != room.room_type:
+                continue
+            if rule.start_date and night < rule.start_date or rule.end_date and night > rule.end_date:
+                continue
+            if rule.weekdays is not None and not rule.weekdays >> night.weekday() & 1:
+                continue
+            if rule.min_nights and nights < rule.min_nights:
+                continue
+            if rule.adjustment == 'fixed':
+                price = int(rule.value * 100)
+            elif rule.adjustment == 'percent':
+                price = int(price * (1 + float(rule.value) / 100) + 0.5)
+            else:
+                price += int(rule.value * 100)
+        total += max(price, 0)
+    return Decimal(total).scaleb(-2)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--rooms-per-hotel', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from models.rate_rule import RateRule
+    from models.room import Room
+    from services.pricing import compile_calendar, rate_calendars
+
+    seeded = seed_catalog(args.rooms, 1, rooms_per_hotel=args.rooms_per_hotel, seed=args.seed)
+    rules = seed_rules(seeded['hotels'], args.seed)
+    print(f"Seeded {seeded['hotels']} hotels, {seeded['rooms']} rooms and {rules} rate rules")
+
+    client = app.test_client()
+    rng = random.Random(args.seed)
+    stays = []
+    for _ in range(args.iterations):
+        check_in = date.today() + timedelta(days=rng.randint(1, 300))
+        stays.append((rng.randint(1, seeded['hotels']), check_in, check_in + timedelta(days=rng.randint(1, 14))))
+
+    def url(i):
+        hotel_id, check_in, check_out = stays[i]
+        return f'/api/hotels/quote?hotel_id={hotel_id}&check_in={check_in}&check_out={check_out}'
+
+    # Check one stay per hotel against the naive walk
+    matches = True
+    for hotel_id in range(1, seeded['hotels'] + 1):
+        _, check_in, check_out = stays[hotel_id % len(stays)]
+        quotes = client.get(f'/api/hotels/quote?hotel_id={hotel_id}&check_in={check_in}&check_out={check_out}').get_json()
+        hotel_rules = RateRule.query.filter_by(hotel_id=hotel_id).order_by(RateRule.priority, RateRule.id).all()
+        rooms = {room.id: room for room in Room.query.filter_by(hotel_id=hotel_id)}
+        for quote in quotes['quotes']:
+            expected = naive_price(rooms[quote['room_id']], hotel_rules, check_in, check_out)
+            matches = matches and float(expected) == quote['total_price']
+
+    results = {
+        'compile calendar': measure(
+            lambda i: compile_calendar(i % seeded['hotels'] + 1, date.today(), rate_calendars.horizon_days),
+            min(args.iterations, 50)
+        ),
+        'GET quote (warm)': measure(lambda i: client.get(url(i)), args.iterations),
+    }
+
+    def naive(i):
+        hotel_id, check_in, check_out = stays[i]
+        hotel_rules = RateRule.query.filter_by(hotel_id=hotel_id).order_by(RateRule.priority, RateRule.id).all()
+        for room in Room.query.filter_by(hotel_id=hotel_id):
+            naive_price(room, hotel_rules, check_in, check_out)
+
+    results['naive walk'] = measure(naive, min(args.iterations, 50))
+    results['GET quote (warm)']['matches_naive'] = matches
+    results['GET quote (warm)']['calendar_bytes'] = rate_calendars.stats()['total_bytes']
+    report(f"Rate quotes ({args.rooms_per_hotel} rooms per hotel, {rate_calendars.horizon_days}-night calendars)",
+           results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Stress test: reference ID uniqueness across processes
+
+Forks several worker processes (after the parent has already generated an
+ID, as a preloading gunicorn master would) that each generate references at
+a share of the target rate. Checks that all IDs are unique across processes
+and strictly increasing within each process, and reports the achieved rate.
+
+Usage (from backend/):
+    python -m benchmarks.reference_ids --processes 4 --rate 100000 --seconds 5
+    python -m benchmarks.reference_ids --rate 0      # unthrottled
+"""
+import argparse
+import multiprocessing
+import time
+
+from benchmarks.common import report
+
+
+def generate(args):
+    """Worker: generate ids at rate ids/sec (0 = unthrottled) for the given seconds"""
+    rate, seconds = args
+    from utils.references import reference_ids
+
+    ids = []
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        now = time.perf_counter()
+        if now >= deadline:
+            break
+        # Pace in 10 ms slices
+        target = int((now - started + 0.01) * rate) if rate else len(ids) + 1000
+        while len(ids) < target:
+            ids.append(reference_ids.next_id())
+        if rate:
+            time.sleep(max(0.0, started + len(ids) / rate - time.perf_counter()))
+    return ids, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--rate', type=int, default=100000, help='Total ids/sec across processes (0 = unthrottled)')
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    from utils.references import encode, reference_ids
+    reference_ids.next_id()  # generator state exists before the fork
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    with context.Pool(args.processes) as pool:
+        results = pool.map(generate, [(args.rate / args.processes, args.seconds)] * args.processes)
+
+    seen = set()
+    total = duplicates = not_increasing = 0
+    for ids, _ in results:
+        total += len(ids)
+        not_increasing += sum(1 for previous, current in zip(ids, ids[1:]) if current <= previous)
+        for value in ids:
+            if value in seen:
+                duplicates += 1
+            seen.add(value)
+
+    elapsed = max(elapsed for _, elapsed in results)
+    report(f'{args.processes} processes, target {args.rate or "unthrottled"} ids/sec', {
+        'reference ids': {
+            'ids': total,
+            'per_sec': round(total / elapsed),
+            'duplicates': duplicates,
+            'not_increasing': not_increasing,
+            'sample': f'HSEM-{encode(results[0][0][-1])}',
+        }
+    })
+    if duplicates or not_increasing:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: sparse fieldsets on list endpoints
+
+Compares payload size and latency of the full representation with a
+?fields= projection (the mobile list view) on the hotels, bookings and
+admin users list endpoints.
+
+Usage (from backend/):
+    python -m benchmarks.sparse_fields --database-url <scratch-db-url>
+"""
+from benchmarks.common import base_parser, create_bench_app, measure, report, seed_catalog, teardown
+
+CASES = (
+    ('hotels', '/api/hotels?limit=100', 'id,name,city,rating'),
+    ('bookings', '/api/bookings?limit=100', 'id,booking_ref,check_in_date,check_out_date,status,total_price'),
+    ('admin users', '/api/admin/users', 'id,email,full_name,user_type'),
+)
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--rooms', type=int, default=2000)
+    parser.add_argument('--bookings-per-room', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    app = create_bench_app(args.database_url)
+    from flask_jwt_extended import create_access_token
+    from database import db
+    from models.user import User
+
+    seeded = seed_catalog(args.rooms, args.bookings_per_room, seed=args.seed)
+    admin = User(email='bench-admin@hoteliasem.cm', password='Bench123!', full_name='Bench Admin', user_type='admin')
+    db.session.add(admin)
+    db.session.commit()
+    print(f"Seeded {seeded['hotels']} hotels, {seeded['rooms']} rooms, {seeded['bookings']} bookings")
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {create_access_token(identity=admin.id)}'}
+    results = {}
+
+    for name, url, fields in CASES:
+        separator = '&' if '?' in url else '?'
+        for label, target in (('full', url), ('fields', f'{url}{separator}fields={fields}')):
+            size = len(client.get(target, headers=headers).data)
+            result = measure(lambda i: client.get(target, headers=headers), args.iterations)
+            result['payload_bytes'] = size
+            results[f'{name} ({label})'] = result
+
+    report('Sparse fieldsets', results)
+    teardown(args.keep)
+
+
+if __name__ == '__main__':
+    main()
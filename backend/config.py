@@ -32,6 +32,13 @@ class Config:
     JWT_COOKIE_CSRF_PROTECT = ENV == 'production'
     JWT_ACCESS_COOKIE_NAME = 'access_token_cookie'
     JWT_REFRESH_COOKIE_NAME = 'refresh_token_cookie'
+    JWT_ROLE_CLAIMS = True  # role/active claims in access tokens, used by role_required
+    
+    # Token revocation ('memory' per worker, or 'redis' shared through
+    # CATALOG_CACHE_REDIS_URL); past TOKEN_REVOCATION_MAX_ENTRIES revoked
+    # tokens the oldest are folded into per-user cutoffs
+    TOKEN_REVOCATION_BACKEND = os.environ.get('TOKEN_REVOCATION_BACKEND', 'memory')
+    TOKEN_REVOCATION_MAX_ENTRIES = 100000
     
     # Security Headers
     SESSION_COOKIE_SECURE = ENV == 'production'
@@ -51,10 +58,23 @@ class Config:
     REQUIRE_LOWERCASE = True
     REQUIRE_DIGIT = True
     
-    # Rate Limiting
+    # Password hashing: bcrypt cost factor (hashes with another cost are
+    # upgraded at login) and the per-worker hashing process pool
+    # (0 workers hashes on the request thread)
+    BCRYPT_LOG_ROUNDS = 12
+    PASSWORD_HASH_WORKERS = 2
+    PASSWORD_HASH_MAX_QUEUE = 64  # running + waiting hashes before 503s
+    PASSWORD_HASH_TIMEOUT = 30  # seconds
+    
+    # Rate Limiting (login attempts per email / client IP over a sliding
+    # LOCKOUT_DURATION window; 'memory' per worker or 'redis' shared through
+    # CATALOG_CACHE_REDIS_URL)
     RATELIMIT_ENABLED = True
     MAX_LOGIN_ATTEMPTS = 5
+    LOGIN_IP_MAX_ATTEMPTS = 50
     LOCKOUT_DURATION = timedelta(minutes=15)
+    LOGIN_LIMITER_BACKEND = os.environ.get('LOGIN_LIMITER_BACKEND', 'memory')
+    LOGIN_LIMITER_MAX_KEYS = 100000  # tracked emails + IPs per worker
     
     # File Upload (for media/avatars)
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
@@ -64,6 +84,90 @@ class Config:
     # Audit Logging
     ENABLE_AUDIT_LOG = True
     
+    # Login bookkeeping (users.last_login_at + login audit rows): 'buffered'
+    # writes them behind in batches (logins not yet flushed are lost if the
+    # process crashes), 'immediate' commits them in the login request
+    LOGIN_WRITE_MODE = os.environ.get('LOGIN_WRITE_MODE', 'buffered')
+    LOGIN_FLUSH_INTERVAL = 2  # seconds between flushes
+    LOGIN_FLUSH_BATCH_SIZE = 500  # pending logins that trigger an early flush
+    LOGIN_BUFFER_MAX_PENDING = 50000  # kept across failed flushes
+    
+    # Pagination (keyset cursors on list endpoints)
+    PAGINATION_DEFAULT_LIMIT = 20
+    PAGINATION_MAX_LIMIT = 100
+    
+    # In-process availability engine (per-room occupancy bitmaps)
+    AVAILABILITY_ENGINE_ENABLED = os.environ.get('AVAILABILITY_ENGINE_ENABLED', 'false').lower() == 'true'
+    AVAILABILITY_ENGINE_HORIZON_DAYS = 365
+    AVAILABILITY_ENGINE_MAX_AGE = 300  # seconds before a full rebuild
+    
+    # Catalog cache ('memory', 'redis' or 'none')
+    CATALOG_CACHE_BACKEND = os.environ.get('CATALOG_CACHE_BACKEND', 'memory')
+    CATALOG_CACHE_REDIS_URL = os.environ.get('CATALOG_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CATALOG_CACHE_TTL = 60  # seconds, single hotel payloads
+    CATALOG_CACHE_LIST_TTL = 30  # seconds, list pages
+    CATALOG_CACHE_MAX_ENTRIES = 1000
+    
+    # Bulk hotel/room import
+    BULK_IMPORT_CHUNK_SIZE = 1000  # rows per transaction
+    BULK_IMPORT_MAX_ERRORS = 1000  # per-row errors reported back
+    
+    # Booking creation (retries on deadlocks / lock timeouts)
+    BOOKING_MAX_RETRIES = 3
+    BOOKING_RETRY_BACKOFF = 0.02  # seconds, doubled on each retry
+    GROUP_BOOKING_MAX_ROOMS = 50
+    BULK_STATUS_MAX_BOOKINGS = 10000  # bookings per admin bulk status call
+    
+    # Room holds during checkout ('memory' per worker, or 'redis' shared
+    # through CATALOG_CACHE_REDIS_URL)
+    HOLD_BACKEND = os.environ.get('HOLD_BACKEND', 'memory')
+    HOLD_TTL = 600  # seconds before an unconfirmed hold lapses
+    HOLD_MAX_PER_USER = 5  # live holds per client (0 = unlimited)
+    
+    # Idempotency-Key replays on booking writes ('memory', 'redis' or 'none'
+    # for the replay cache; the idempotency_keys table is always used)
+    IDEMPOTENCY_CACHE_BACKEND = os.environ.get('IDEMPOTENCY_CACHE_BACKEND', 'memory')
+    IDEMPOTENCY_CACHE_MAX_ENTRIES = 10000
+    IDEMPOTENCY_KEY_TTL = 86400  # seconds a response is replayed
+    IDEMPOTENCY_CLAIM_LEASE = 60  # seconds a running request holds its key (above the worker timeout)
+    IDEMPOTENCY_WAIT_TIMEOUT = 10  # seconds a duplicate waits for the first request
+    
+    # Booking lifecycle sweeper (confirmed -> completed / no-show); run it
+    # with `flask sweep-bookings` or in-process every LIFECYCLE_SWEEP_INTERVAL
+    LIFECYCLE_SWEEPER_ENABLED = os.environ.get('LIFECYCLE_SWEEPER_ENABLED', 'false').lower() == 'true'
+    LIFECYCLE_SWEEP_INTERVAL = 3600  # seconds between in-process runs
+    LIFECYCLE_SWEEP_CHUNK_SIZE = 500  # rows per UPDATE, below lock escalation
+    LIFECYCLE_SWEEP_PAUSE = 0.05  # seconds between chunks
+    # No-shows are inferred from missing completed payment transactions: only
+    # enable where payments are recorded in the transactions table
+    LIFECYCLE_NO_SHOW_ENABLED = os.environ.get('LIFECYCLE_NO_SHOW_ENABLED', 'false').lower() == 'true'
+    LIFECYCLE_NO_SHOW_AFTER_DAYS = 1  # days after check-in before an unpaid booking is a no-show
+    
+    # Nightly-rate pricing: compiled per-hotel rate calendars (per worker)
+    RATE_CALENDAR_HORIZON_DAYS = 730  # nights compiled from today
+    RATE_CALENDAR_MAX_AGE = 300  # seconds before a calendar is recompiled
+    RATE_CALENDAR_MAX_HOTELS = 1000  # calendars kept per worker (LRU)
+    RATE_QUOTE_MAX_ROOMS = 500
+    
+    # Authenticated-user cache across requests ('memory' per worker, 'redis'
+    # shared through CATALOG_CACHE_REDIS_URL, or 'none'); a deactivation or
+    # role change reaches other memory-backed workers within the TTL
+    AUTH_USER_CACHE_BACKEND = os.environ.get('AUTH_USER_CACHE_BACKEND', 'none')
+    AUTH_USER_CACHE_TTL = 30  # seconds
+    AUTH_USER_CACHE_MAX_ENTRIES = 10000
+    
+    # Hotel occupancy calendar
+    OCCUPANCY_CALENDAR_MAX_DAYS = 366
+    OCCUPANCY_CALENDAR_MAX_OFFSET_DAYS = 3660  # start at most ~10 years from today
+    
+    # Reference IDs (HSEM-/TXN-): set a distinct host id (0-127) per host when
+    # several hosts share the database (default: host name hash); processes
+    # on a host get distinct slots on their own
+    REFERENCE_HOST_ID = os.environ.get('REFERENCE_HOST_ID')
+    
+    # JSON encoder for responses ('orjson' or 'default' for the stdlib json)
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+    
 
 class DevelopmentConfig(Config):
     """Development-specific configuration"""
@@ -85,6 +189,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
+    BCRYPT_LOG_ROUNDS = 4
+    PASSWORD_HASH_WORKERS = 0
+    LOGIN_WRITE_MODE = 'immediate'
 
 
 # Configuration dictionary
@@ -23,6 +23,12 @@ def init_db(app):
         from models.booking import Booking
         from models.transaction import Transaction
         from models.audit_log import AuditLog
+        from models.media import Media
+        from models.review import Review
+        from models.hotel_summary import HotelSummary
+        from models.idempotency_key import IdempotencyKey
+        from models.job_watermark import JobWatermark
+        from models.rate_rule import RateRule
         
         # Create tables if they don't exist (in development only)
         # In production, use proper migrations with Alembic
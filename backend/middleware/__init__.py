@@ -7,6 +7,7 @@ from middleware.role_required import (
     authenticated_required,
     owner_or_admin_required
 )
+from middleware.idempotency import idempotent
 from middleware.permissions import (
     can_manage_hotel,
     can_view_hotel,
@@ -28,6 +29,7 @@ __all__ = [
     'client_required',
     'authenticated_required',
     'owner_or_admin_required',
+    'idempotent',
     'can_manage_hotel',
     'can_view_hotel',
     'can_manage_booking',
@@ -0,0 +1,48 @@
+"""
+Idempotency-Key decorator for HoteliaSEM write routes
+
+Usage (inside an authentication decorator):
+    @bookings_bp.route('', methods=['POST'])
+    @client_required
+    @idempotent
+    def create_booking():
+        ...
+
+Requests without an Idempotency-Key header run normally.
+"""
+import hashlib
+from functools import wraps
+from flask import request, jsonify, make_response
+from flask_jwt_extended import get_jwt_identity
+
+from services.idempotency import idempotency_store
+
+MAX_KEY_LENGTH = 100
+
+
+def idempotent(fn):
+    """
+    Decorator replaying the stored response of a retried keyed request
+    
+    The key is scoped to the authenticated user and the method + path, and
+    bound to a hash of the request body.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return fn(*args, **kwargs)
+        
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify({'error': f'Idempotency-Key must be at most {MAX_KEY_LENGTH} characters'}), 400
+        
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        return idempotency_store.run(
+            user_id=get_jwt_identity(),
+            endpoint=f'{request.method} {request.path}',
+            key=key,
+            fingerprint=fingerprint,
+            execute=lambda: make_response(fn(*args, **kwargs))
+        )
+    
+    return wrapper
@@ -19,7 +19,7 @@ Usage:
 from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from models.user import User
+from utils.auth_helpers import load_current_user, token_role
 
 
 def role_required(*allowed_roles):
@@ -53,30 +53,34 @@ def role_required(*allowed_roles):
                     'message': 'Please log in to access this resource'
                 }), 401
             
-            # Get current user
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            
-            if not user:
-                return jsonify({
-                    'error': 'User not found',
-                    'message': 'Invalid authentication token'
-                }), 401
+            # Role and active state from the token's claims; tokens
+            # issued without them fall back to loading the user
+            role, is_active = token_role()
+            if role is None:
+                user = load_current_user()
+                
+                if not user:
+                    return jsonify({
+                        'error': 'User not found',
+                        'message': 'Invalid authentication token'
+                    }), 401
+                
+                role, is_active = user.user_type, user.is_active
             
             # Check if user account is active
-            if not user.is_active:
+            if not is_active:
                 return jsonify({
                     'error': 'Account deactivated',
                     'message': 'Your account has been deactivated'
                 }), 403
             
             # Check if user has one of the allowed roles
-            if not user.has_role(*allowed_roles):
+            if role not in allowed_roles:
                 return jsonify({
                     'error': 'Insufficient permissions',
                     'message': f'This resource requires one of the following roles: {", ".join(allowed_roles)}',
                     'required_roles': list(allowed_roles),
-                    'your_role': user.user_type
+                    'your_role': role
                 }), 403
             
             # User is authenticated and authorized
@@ -155,20 +159,22 @@ def owner_or_admin_required(resource_user_field='user_id'):
             except Exception as e:
                 return jsonify({'error': 'Authentication required'}), 401
             
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
+            role, is_active = token_role()
+            if role is None:
+                user = load_current_user()
+                role, is_active = (user.user_type, user.is_active) if user else (None, False)
             
-            if not user or not user.is_active:
+            if not is_active:
                 return jsonify({'error': 'Invalid user'}), 401
             
             # Admin has full access
-            if user.is_admin():
+            if role == 'admin':
                 return fn(*args, **kwargs)
             
             # Check if user is the owner of the resource
             resource_owner_id = kwargs.get(resource_user_field)
             
-            if resource_owner_id and int(resource_owner_id) == user_id:
+            if resource_owner_id and int(resource_owner_id) == int(get_jwt_identity()):
                 return fn(*args, **kwargs)
             
             return jsonify({
@@ -5,5 +5,12 @@ from models.room import Room
 from models.booking import Booking
 from models.transaction import Transaction
 from models.audit_log import AuditLog
+from models.media import Media
+from models.review import Review
+from models.hotel_summary import HotelSummary
+from models.idempotency_key import IdempotencyKey
+from models.job_watermark import JobWatermark
+from models.rate_rule import RateRule
 
-__all__ = ['User', 'Hotel', 'Room', 'Booking', 'Transaction', 'AuditLog']
+__all__ = ['User', 'Hotel', 'Room', 'Booking', 'Transaction', 'AuditLog', 'Media', 'Review', 'HotelSummary',
+           'IdempotencyKey', 'JobWatermark', 'RateRule']
@@ -40,6 +40,34 @@ class AuditLog(db.Model):
         db.session.commit()
         return log
     
+    @staticmethod
+    def log_actions(entries):
+        """
+        Insert many audit log entries with a single executemany
+        
+        Entries are dicts of log_action() arguments. The caller owns the
+        transaction, so the entries commit together with the audited writes.
+        """
+        if not entries:
+            return
+        
+        now = datetime.utcnow()
+        rows = [
+            {
+                'user_id': entry.get('user_id'),
+                'action': entry['action'],
+                'entity_type': entry['entity_type'],
+                'entity_id': entry.get('entity_id'),
+                'old_values': entry.get('old_values'),
+                'new_values': entry.get('new_values'),
+                'ip_address': entry.get('ip_address'),
+                'user_agent': entry.get('user_agent'),
+                'created_at': entry.get('created_at', now),
+            }
+            for entry in entries
+        ]
+        db.session.execute(AuditLog.__table__.insert(), rows)
+    
     def to_dict(self):
         """Convert audit log to dictionary"""
         return {
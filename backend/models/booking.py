@@ -40,6 +40,25 @@ class Booking(db.Model):
         CheckConstraint("status IN ('confirmed', 'cancelled', 'completed', 'no-show')", name='ck_booking_stat'),
         CheckConstraint("num_adults >= 1", name='ck_booking_guests'),
         db.Index('ix_bookings_avail', 'room_id', 'check_in_date', 'check_out_date'),
+        # Keyset pagination of the bookings list, per scope
+        db.Index('ix_bookings_created', 'created_at', 'id'),
+        db.Index('ix_bookings_user_created', 'user_id', 'created_at', 'id'),
+        db.Index('ix_bookings_hotel_created', 'hotel_id', 'created_at', 'id'),
+        # Occupancy calendar: covering seek on a hotel's stays
+        db.Index('ix_bookings_hotel_stay', 'hotel_id', 'check_in_date', 'check_out_date',
+                 mssql_include=['status', 'total_price']),
+        # Lifecycle sweeper: confirmed bookings past check-in / check-out
+        db.Index('ix_bookings_status_checkin', 'status', 'check_in_date', 'id'),
+        db.Index('ix_bookings_status_checkout', 'status', 'check_out_date', 'id'),
+    )
+    
+    STATUSES = ('confirmed', 'cancelled', 'completed', 'no-show')
+    
+    # Fields emitted by to_dict(), selectable with ?fields= on list endpoints
+    SERIALIZED_FIELDS = (
+        'id', 'booking_ref', 'user_id', 'hotel_id', 'room_id', 'check_in_date', 'check_out_date',
+        'num_nights', 'num_adults', 'num_children', 'total_price', 'status', 'special_requests',
+        'created_at',
     )
     
     def to_dict(self):
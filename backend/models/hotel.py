@@ -45,8 +45,13 @@ class Hotel(db.Model):
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    rooms = db.relationship('Room', backref='hotel', lazy='dynamic', cascade='all, delete-orphan')
+    # Relationships (rooms and media are eager-loadable for expanded payloads)
+    rooms = db.relationship('Room', backref='hotel', lazy='select', cascade='all, delete-orphan',
+                            order_by='Room.price_per_night')
+    media = db.relationship('Media', backref='hotel', lazy='select', cascade='all, delete-orphan',
+                            order_by='Media.sort_order')
+    summary = db.relationship('HotelSummary', uselist=False, lazy='select', cascade='all, delete-orphan')
+    rate_rules = db.relationship('RateRule', lazy='select', cascade='all, delete-orphan')
     bookings = db.relationship('Booking', backref='hotel', lazy='dynamic')
     
     __table_args__ = (
@@ -56,6 +61,13 @@ class Hotel(db.Model):
         CheckConstraint("commission_rate BETWEEN 0 AND 1", name='ck_hotel_comm'),
     )
     
+    # Fields emitted by to_dict(), selectable with ?fields= on list endpoints
+    SERIALIZED_FIELDS = (
+        'id', 'name', 'description', 'address', 'city', 'country', 'latitude', 'longitude',
+        'phone', 'email', 'website', 'rating', 'total_reviews', 'subscription_type', 'status',
+        'created_at',
+    )
+    
     def to_dict(self):
         """Convert hotel to dictionary"""
         return {
@@ -0,0 +1,43 @@
+"""Hotel Summary Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+from sqlalchemy import Numeric
+
+
+class HotelSummary(db.Model):
+    """
+    Materialized per-hotel listing figures (price range, room counts, rating)
+    
+    Maintained by services.hotel_summary on room and booking writes and
+    rebuilt in full by the `flask rebuild-hotel-summary` command.
+    """
+    
+    __tablename__ = 'hotel_summary'
+    
+    hotel_id = db.Column(db.Integer, db.ForeignKey('hotels.id', ondelete='CASCADE'), primary_key=True)
+    min_price = db.Column(Numeric(18, 2))
+    max_price = db.Column(Numeric(18, 2))
+    room_count = db.Column(db.Integer, nullable=False, default=0)
+    available_room_count = db.Column(db.Integer, nullable=False, default=0)
+    free_rooms_today = db.Column(db.Integer, nullable=False, default=0)  # stale after midnight until the daily rebuild
+    rating = db.Column(Numeric(3, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # Keyset seeks for sort=price
+        db.Index('ix_hotel_summary_price', 'min_price', 'hotel_id'),
+    )
+    
+    def to_dict(self):
+        """Convert summary to dictionary"""
+        return {
+            'min_price': float(self.min_price) if self.min_price is not None else None,
+            'max_price': float(self.max_price) if self.max_price is not None else None,
+            'room_count': self.room_count,
+            'available_room_count': self.available_room_count,
+            'free_rooms_today': self.free_rooms_today,
+            'updated_at': self.updated_at.isoformat(),
+        }
+    
+    def __repr__(self):
+        return f'<HotelSummary {self.hotel_id}>'
@@ -0,0 +1,34 @@
+"""Idempotency Key Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+
+
+class IdempotencyKey(db.Model):
+    """
+    Stored outcome of a POST sent with an Idempotency-Key header
+    
+    A row is claimed ('in_progress') before the request runs and completed
+    with the response, which is replayed for retries until expires_at. For
+    an in_progress row, expires_at is the end of the claim's short lease.
+    """
+    
+    __tablename__ = 'idempotency_keys'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    endpoint = db.Column(db.String(200), nullable=False)
+    idem_key = db.Column(db.String(100), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='in_progress')
+    response_status = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'endpoint', 'idem_key', name='uq_idempotency_scope'),
+        db.CheckConstraint("status IN ('in_progress', 'completed')", name='ck_idempotency_status'),
+    )
+    
+    def __repr__(self):
+        return f'<IdempotencyKey {self.idem_key} ({self.status})>'
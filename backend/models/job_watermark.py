@@ -0,0 +1,29 @@
+"""Job Watermark Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+
+
+class JobWatermark(db.Model):
+    """
+    Progress marker of an incremental background job
+    
+    Holds the position of the last row a job processed, so the next run
+    only looks at rows past it (see services.lifecycle).
+    """
+    
+    __tablename__ = 'job_watermarks'
+    
+    job = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.String(100), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert watermark to dictionary"""
+        return {
+            'job': self.job,
+            'value': self.value,
+            'updated_at': self.updated_at.isoformat(),
+        }
+    
+    def __repr__(self):
+        return f'<JobWatermark {self.job}={self.value}>'
@@ -0,0 +1,41 @@
+"""Media Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+from sqlalchemy import CheckConstraint
+
+
+class Media(db.Model):
+    """Photo, video or 3D model attached to a hotel or one of its rooms"""
+    
+    __tablename__ = 'media'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hotel_id = db.Column(db.Integer, db.ForeignKey('hotels.id', ondelete='CASCADE'), nullable=False, index=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'), index=True)
+    file_path = db.Column(db.String(500), nullable=False)
+    file_type = db.Column(db.String(20), nullable=False, default='image')
+    file_size = db.Column(db.Integer)
+    alt_text = db.Column(db.String(200))
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+    is_primary = db.Column(db.Boolean, nullable=False, default=False)
+    uploaded_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        CheckConstraint("file_type IN ('image', 'video', '3d_model')", name='ck_media_type'),
+    )
+    
+    def to_dict(self):
+        """Convert media to dictionary"""
+        return {
+            'id': self.id,
+            'hotel_id': self.hotel_id,
+            'room_id': self.room_id,
+            'file_path': self.file_path,
+            'file_type': self.file_type,
+            'alt_text': self.alt_text,
+            'sort_order': self.sort_order,
+            'is_primary': self.is_primary,
+        }
+    
+    def __repr__(self):
+        return f'<Media {self.file_path}>'
@@ -0,0 +1,72 @@
+"""Rate Rule Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+from sqlalchemy import CheckConstraint, Date, Numeric
+
+
+class RateRule(db.Model):
+    """
+    Nightly price rule of a hotel (seasonal, weekday or length-of-stay)
+    
+    A rule targets one room, every room of a room type, or the whole hotel,
+    for the nights between start_date and end_date (inclusive, open when
+    null) falling on the weekdays bitmask (bit 0 = Monday). It sets the
+    nightly price ('fixed') or adjusts it by a percentage or an amount.
+    With min_nights, it only applies to stays of at least that length.
+    Rules are applied in (priority, id) order on top of price_per_night;
+    services.pricing compiles them into per-day price arrays.
+    """
+    
+    __tablename__ = 'rate_rules'
+    
+    ADJUSTMENTS = ('fixed', 'percent', 'amount')
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hotel_id = db.Column(db.Integer, db.ForeignKey('hotels.id', ondelete='CASCADE'), nullable=False, index=True)
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id'))
+    room_type = db.Column(db.String(50))
+    name = db.Column(db.String(100))
+    
+    start_date = db.Column(Date)
+    end_date = db.Column(Date)
+    weekdays = db.Column(db.Integer)
+    min_nights = db.Column(db.Integer)
+    
+    adjustment = db.Column(db.String(10), nullable=False)
+    value = db.Column(Numeric(18, 2), nullable=False)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        CheckConstraint("adjustment IN ('fixed', 'percent', 'amount')", name='ck_rate_adjustment'),
+        CheckConstraint("end_date IS NULL OR start_date IS NULL OR end_date >= start_date", name='ck_rate_dates'),
+        CheckConstraint("weekdays IS NULL OR weekdays BETWEEN 1 AND 127", name='ck_rate_weekdays'),
+    )
+    
+    def weekday_list(self):
+        """Weekdays the rule applies to (0 = Monday), or None for every day"""
+        if self.weekdays is None:
+            return None
+        return [day for day in range(7) if self.weekdays >> day & 1]
+    
+    def to_dict(self):
+        """Convert rule to dictionary"""
+        return {
+            'id': self.id,
+            'hotel_id': self.hotel_id,
+            'room_id': self.room_id,
+            'room_type': self.room_type,
+            'name': self.name,
+            'start_date': self.start_date.isoformat() if self.start_date else None,
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'weekdays': self.weekday_list(),
+            'min_nights': self.min_nights,
+            'adjustment': self.adjustment,
+            'value': float(self.value),
+            'priority': self.priority,
+            'created_at': self.created_at.isoformat(),
+        }
+    
+    def __repr__(self):
+        return f'<RateRule {self.id} {self.adjustment} {self.value} for Hotel {self.hotel_id}>'
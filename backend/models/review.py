@@ -0,0 +1,46 @@
+"""Review Model for HoteliaSEM"""
+from datetime import datetime
+from database import db
+from sqlalchemy import CheckConstraint, Numeric
+
+
+class Review(db.Model):
+    """Verified guest review of a hotel stay"""
+    
+    __tablename__ = 'reviews'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    hotel_id = db.Column(db.Integer, db.ForeignKey('hotels.id'), nullable=False, index=True)
+    booking_id = db.Column(db.Integer, db.ForeignKey('bookings.id'), nullable=False)
+    rating = db.Column(Numeric(3, 2), nullable=False)
+    title = db.Column(db.String(200))
+    comment = db.Column(db.Text)
+    is_verified = db.Column(db.Boolean, nullable=False, default=False)
+    
+    # Timestamps
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        CheckConstraint("rating BETWEEN 1 AND 5", name='ck_rev_rating'),
+        db.UniqueConstraint('user_id', 'booking_id', name='uq_rev_booking'),
+        db.Index('ix_rev_rating', 'hotel_id', 'rating'),
+    )
+    
+    def to_dict(self):
+        """Convert review to dictionary"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'hotel_id': self.hotel_id,
+            'booking_id': self.booking_id,
+            'rating': float(self.rating),
+            'title': self.title,
+            'comment': self.comment,
+            'is_verified': self.is_verified,
+            'created_at': self.created_at.isoformat(),
+        }
+    
+    def __repr__(self):
+        return f'<Review {self.rating} for Hotel {self.hotel_id}>'
@@ -3,7 +3,8 @@ User Model for HoteliaSEM
 Supports three role types: client, hotelier, admin
 """
 from datetime import datetime
-from database import db, bcrypt
+from database import db
+from services.passwords import password_hasher
 from sqlalchemy import CheckConstraint
 
 
@@ -42,14 +43,22 @@ class User(db.Model):
     def __init__(self, email, password, full_name, user_type='client', phone=None):
         """Initialize user with hashed password"""
         self.email = email.lower().strip()
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.set_password(password)
         self.full_name = full_name
         self.user_type = user_type
         self.phone = phone
     
+    def set_password(self, password):
+        """Hash and store a new password (on the password hashing pool)"""
+        self.password_hash = password_hasher.hash(password)
+    
     def check_password(self, password):
-        """Verify password against hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Verify password against hash (on the password hashing pool)"""
+        return password_hasher.check(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Whether the stored hash uses another cost factor than BCRYPT_LOG_ROUNDS"""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def update_last_login(self):
         """Update last login timestamp"""
@@ -72,6 +81,12 @@ class User(db.Model):
         """Check if user is client"""
         return self.user_type == 'client'
     
+    # Fields emitted by to_dict(include_sensitive=True), selectable with ?fields=
+    SERIALIZED_FIELDS = (
+        'id', 'email', 'full_name', 'phone', 'avatar_url', 'user_type', 'is_active',
+        'last_login_at', 'created_at', 'updated_at',
+    )
+    
     def to_dict(self, include_sensitive=False):
         """Convert user to dictionary (exclude password by default)"""
         data = {
@@ -13,6 +13,13 @@ from models.transaction import Transaction
 from models.audit_log import AuditLog
 from middleware import admin_required
 from utils.auth_helpers import get_current_user, log_user_action
+from utils.fields import parse_fields
+from utils.rows import columns_for, serialize_rows
+from utils.validators import ValidationError
+from services.occupancy import occupancy_engine
+from services.cache import catalog_cache
+from services.revocation import token_revocations
+from services.user_cache import user_cache
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
 
@@ -61,13 +68,26 @@ def get_system_stats():
 @admin_bp.route('/users', methods=['GET'])
 @admin_required
 def get_all_users():
-    """Get all users with filtering (admin only)"""
+    """
+    Get all users with filtering (admin only)
+    
+    Query params:
+    - user_type, is_active: Filters
+    - fields: Comma-separated user columns to return
+    """
     try:
         # Query parameters
         user_type = request.args.get('user_type')
         is_active = request.args.get('is_active')
         
-        query = User.query
+        try:
+            fields = parse_fields(request.args.get('fields'), User.SERIALIZED_FIELDS)
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Plain column rows, serialized without hydrating User objects
+        columns = columns_for(User, fields)
+        query = User.query.with_entities(*columns)
         
         if user_type:
             query = query.filter_by(user_type=user_type)
@@ -79,7 +99,7 @@ def get_all_users():
         users = query.order_by(User.created_at.desc()).all()
         
         return jsonify({
-            'users': [user.to_dict(include_sensitive=True) for user in users],
+            'users': serialize_rows(users, columns),
             'count': len(users)
         }), 200
         
@@ -121,6 +141,8 @@ def deactivate_user(user_id):
         
         user.is_active = False
         db.session.commit()
+        user_cache.invalidate(user.id)
+        token_revocations.revoke_user(user.id)
         
         # Log deactivation
         log_user_action(
@@ -155,6 +177,7 @@ def activate_user(user_id):
         
         user.is_active = True
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         # Log activation
         log_user_action(
@@ -199,6 +222,8 @@ def change_user_role(user_id):
         old_role = user.user_type
         user.user_type = new_role
         db.session.commit()
+        user_cache.invalidate(user.id)
+        token_revocations.revoke_user(user.id)
         
         # Log role change
         log_user_action(
@@ -259,3 +284,40 @@ def get_audit_logs():
     except Exception as e:
         print(f"[v0] Get audit logs error: {str(e)}")
         return jsonify({'error': 'Failed to fetch audit logs'}), 500
+
+
+@admin_bp.route('/availability-engine', methods=['GET'])
+@admin_required
+def get_availability_engine_status():
+    """
+    Availability engine memory report and consistency check (admin only)
+    
+    Query params:
+    - verify: 'true' to compare the in-memory bitmaps against the database
+    """
+    try:
+        if not occupancy_engine.ensure_ready():
+            return jsonify({'enabled': False}), 200
+        
+        result = {'memory': occupancy_engine.memory_report()}
+        
+        if request.args.get('verify', 'false').lower() == 'true':
+            result['consistency'] = occupancy_engine.verify()
+        
+        return jsonify(result), 200
+        
+    except Exception as e:
+        print(f"[v0] Availability engine status error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch availability engine status'}), 500
+
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@admin_required
+def get_cache_stats():
+    """Catalog cache hit, miss and eviction counters (admin only)"""
+    try:
+        return jsonify({'catalog': catalog_cache.stats()}), 200
+        
+    except Exception as e:
+        print(f"[v0] Get cache stats error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch cache statistics'}), 500
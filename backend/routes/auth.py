@@ -8,9 +8,11 @@ from flask_jwt_extended import (
     create_refresh_token,
     jwt_required,
     get_jwt_identity,
-    get_jwt
+    get_jwt,
+    decode_token
 )
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import set_committed_value
 from datetime import datetime
 
 from database import db
@@ -25,13 +27,29 @@ from utils.validators import (
 )
 from utils.auth_helpers import (
     get_current_user,
+    access_claims,
     create_token_response,
+    get_client_ip,
+    get_user_agent,
     log_user_action
 )
+from services.login_buffer import login_buffer
+from services.login_limiter import login_limiter
+from services.passwords import PasswordHasherBusy
+from services.revocation import token_revocations
+from services.user_cache import user_cache
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
 
+def password_busy_response():
+    """503 returned when the password hashing queue is full"""
+    response = jsonify({'error': 'Server busy, please retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     """
@@ -93,7 +111,7 @@ def register():
         )
         
         # Create tokens
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=access_claims(user))
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
@@ -101,6 +119,9 @@ def register():
             **create_token_response(user, access_token, refresh_token)
         }), 201
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_busy_response()
     except IntegrityError:
         db.session.rollback()
         return jsonify({'error': 'User already exists'}), 409
@@ -132,6 +153,15 @@ def login():
         # Normalize email
         email = email.lower().strip()
         
+        # Throttle by email and client IP before any lookup or hash
+        ip_address = get_client_ip()
+        retry_after = login_limiter.attempt(email, ip_address)
+        if retry_after is not None:
+            response = jsonify({'error': 'Too many login attempts, please try again later'})
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+        
         # Find user
         user = User.query.filter_by(email=email).first()
         
@@ -142,19 +172,20 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 403
         
-        # Update last login
-        user.update_last_login()
+        login_limiter.succeeded(email, ip_address)
         
-        # Log login
-        log_user_action(
-            user_id=user.id,
-            action='login',
-            entity_type='user',
-            entity_id=user.id
-        )
+        # Upgrade the hash if BCRYPT_LOG_ROUNDS changed since it was made
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+        
+        # Update last login and log it (written behind in batches)
+        login_at = login_buffer.record(user.id, ip_address, get_user_agent())
+        set_committed_value(user, 'last_login_at', login_at)
+        user_cache.invalidate(user.id)
         
         # Create tokens
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=access_claims(user))
         refresh_token = create_refresh_token(identity=user.id)
         
         return jsonify({
@@ -162,6 +193,9 @@ def login():
             **create_token_response(user, access_token, refresh_token)
         }), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_busy_response()
     except Exception as e:
         print(f"[v0] Login error: {str(e)}")
         return jsonify({'error': 'Login failed'}), 500
@@ -171,11 +205,22 @@ def login():
 @jwt_required()
 def logout():
     """
-    Logout user (client should delete tokens)
-    In a production system, you would add token to blacklist
+    Logout user: revoke the access token, and the refresh token if given
+    
+    Optional fields: refresh_token
     """
     try:
         user_id = get_jwt_identity()
+        token_revocations.revoke_token(get_jwt())
+        
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                payload = decode_token(refresh_token)
+            except Exception:
+                payload = None
+            if payload and payload.get('type') == 'refresh' and str(payload['sub']) == str(user_id):
+                token_revocations.revoke_token(payload)
         
         # Log logout
         log_user_action(
@@ -205,7 +250,7 @@ def refresh():
         if not user or not user.is_active:
             return jsonify({'error': 'Invalid user'}), 401
         
-        access_token = create_access_token(identity=user_id)
+        access_token = create_access_token(identity=user_id, additional_claims=access_claims(user))
         
         return jsonify({
             'access_token': access_token,
@@ -265,6 +310,7 @@ def update_current_user():
         
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         # Log update
         log_user_action(
@@ -321,10 +367,10 @@ def change_password():
             return jsonify({'error': str(e)}), 400
         
         # Update password
-        from database import bcrypt
-        user.password_hash = bcrypt.generate_password_hash(new_password).decode('utf-8')
+        user.set_password(new_password)
         user.updated_at = datetime.utcnow()
         db.session.commit()
+        user_cache.invalidate(user.id)
         
         # Log password change
         log_user_action(
@@ -336,6 +382,9 @@ def change_password():
         
         return jsonify({'message': 'Password changed successfully'}), 200
         
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return password_busy_response()
     except Exception as e:
         db.session.rollback()
         print(f"[v0] Change password error: {str(e)}")
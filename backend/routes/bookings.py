@@ -5,8 +5,9 @@ Role-based access control:
 - Hotelier: View bookings for their hotels
 - Admin: Full access to all bookings
 """
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from datetime import datetime, date
+from sqlalchemy import or_, and_
 
 from database import db
 from models.booking import Booking
@@ -16,13 +17,19 @@ from middleware import (
     role_required,
     admin_required,
     client_required,
-    can_manage_booking
-)
-from utils.auth_helpers import (
-    get_current_user,
-    log_user_action,
-    generate_booking_reference
+    can_manage_booking,
+    idempotent
 )
+from utils.auth_helpers import get_current_user, log_user_action
+from utils.fields import parse_fields
+from utils.rows import columns_for, serialize_rows
+from utils.pagination import decode_cursor, parse_limit, paginate_keyset
+from utils.validators import ValidationError, parse_iso_datetime, validate_date_range
+from services.occupancy import occupancy_engine
+from services.hotel_summary import refresh_for_booking, refresh_for_bookings
+from services.reservations import BookingConflict, convert_hold, place_hold, reserve_room, reserve_rooms
+from services.holds import HoldConflict, HoldLimitReached, hold_store
+from services.lifecycle import TRANSITIONS, bulk_transition
 
 bookings_bp = Blueprint('bookings', __name__, url_prefix='/api/bookings')
 
@@ -36,26 +43,91 @@ def get_bookings():
     - Client: their own bookings
     - Hotelier: bookings for their hotels
     - Admin: all bookings
+    
+    Results are ordered by (created_at DESC, id DESC) and paginated with an
+    opaque keyset cursor, so every page is a bounded index seek.
+    
+    Query params:
+    - status: Filter by booking status
+    - hotel_id: Filter by hotel
+    - check_in_from, check_in_to: Check-in date window (inclusive)
+    - created_from, created_to: Creation time range [from, to)
+    - limit: Page size (default 20, max 100)
+    - cursor: next_cursor value from the previous page
+    - fields: Comma-separated booking columns to return; other columns
+      (e.g. special_requests) are not fetched from the database
     """
     try:
         user = get_current_user()
         
+        try:
+            fields = parse_fields(request.args.get('fields'), Booking.SERIALIZED_FIELDS)
+            check_in_from = parse_iso_datetime(request.args.get('check_in_from'), 'check_in_from')
+            check_in_to = parse_iso_datetime(request.args.get('check_in_to'), 'check_in_to')
+            created_from = parse_iso_datetime(request.args.get('created_from'), 'created_from')
+            created_to = parse_iso_datetime(request.args.get('created_to'), 'created_to')
+            hotel_id = request.args.get('hotel_id', type=int)
+            
+            status = request.args.get('status')
+            if status and status not in Booking.STATUSES:
+                raise ValidationError(f"status must be one of: {', '.join(Booking.STATUSES)}")
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        query = Booking.query
+        
         if user.is_client():
             # Client sees only their bookings
-            bookings = Booking.query.filter_by(user_id=user.id).order_by(Booking.created_at.desc()).all()
+            query = query.filter(Booking.user_id == user.id)
         
         elif user.is_hotelier():
-            # Hotelier sees bookings for their hotels
-            hotel_ids = [h.id for h in Hotel.query.filter_by(owner_id=user.id).all()]
-            bookings = Booking.query.filter(Booking.hotel_id.in_(hotel_ids)).order_by(Booking.created_at.desc()).all()
-        
-        else:  # Admin
-            # Admin sees all bookings
-            bookings = Booking.query.order_by(Booking.created_at.desc()).all()
+            # Hotelier sees bookings for their hotels (resolved in the same query)
+            owned_hotels = db.session.query(Hotel.id).filter(Hotel.owner_id == user.id)
+            query = query.filter(Booking.hotel_id.in_(owned_hotels.scalar_subquery()))
+        
+        # Admin: all bookings
+        
+        if status:
+            query = query.filter(Booking.status == status)
+        if hotel_id:
+            query = query.filter(Booking.hotel_id == hotel_id)
+        if check_in_from:
+            query = query.filter(Booking.check_in_date >= check_in_from.date())
+        if check_in_to:
+            query = query.filter(Booking.check_in_date <= check_in_to.date())
+        if created_from:
+            query = query.filter(Booking.created_at >= created_from)
+        if created_to:
+            query = query.filter(Booking.created_at < created_to)
+        
+        # Keyset pagination on (created_at DESC, id DESC)
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            if cursor:
+                created_at, last_id = decode_cursor(cursor)
+                created_at = datetime.fromisoformat(created_at)
+                query = query.filter(or_(
+                    Booking.created_at < created_at,
+                    and_(Booking.created_at == created_at, Booking.id < int(last_id))
+                ))
+        except (ValidationError, ValueError, TypeError):
+            return jsonify({'error': 'Invalid pagination parameters'}), 400
+        
+        # Plain column rows, serialized without hydrating Booking objects
+        columns = columns_for(Booking, fields)
+        query = query.with_entities(*columns, Booking.created_at.label('sort_key')).order_by(
+            Booking.created_at.desc(), Booking.id.desc()
+        )
+        bookings, next_cursor = paginate_keyset(
+            query, limit, lambda row: [row.sort_key.isoformat(), row.id]
+        )
         
         return jsonify({
-            'bookings': [booking.to_dict() for booking in bookings],
-            'count': len(bookings)
+            'bookings': serialize_rows(bookings, columns),
+            'count': len(bookings),
+            'limit': limit,
+            'next_cursor': next_cursor
         }), 200
         
     except Exception as e:
@@ -87,11 +159,14 @@ def get_booking(booking_id):
 
 @bookings_bp.route('', methods=['POST'])
 @client_required
+@idempotent
 def create_booking():
     """
     Create new booking (client only)
     
     Required: room_id, check_in_date, check_out_date, num_adults
+    
+    Returns 409 if the room already has a confirmed booking overlapping the stay.
     """
     try:
         user = get_current_user()
@@ -124,10 +199,6 @@ def create_booking():
         if check_in < date.today():
             return jsonify({'error': 'Check-in date cannot be in the past'}), 400
         
-        # Calculate total price
-        num_nights = (check_out - check_in).days
-        total_price = room.price_per_night * num_nights
-        
         # Check guest capacity
         num_adults = data['num_adults']
         num_children = data.get('num_children', 0)
@@ -135,22 +206,22 @@ def create_booking():
         if num_adults + num_children > room.max_guests:
             return jsonify({'error': f'Room capacity is {room.max_guests} guests'}), 400
         
-        # Create booking
-        booking = Booking(
-            booking_ref=generate_booking_reference(),
-            user_id=user.id,
-            hotel_id=room.hotel_id,
-            room_id=room.id,
-            check_in_date=check_in,
-            check_out_date=check_out,
-            num_adults=num_adults,
-            num_children=num_children,
-            total_price=total_price,
-            special_requests=data.get('special_requests')
-        )
-        
-        db.session.add(booking)
-        db.session.commit()
+        # Overlap check and insert under a lock on the room row
+        try:
+            booking = reserve_room(
+                room,
+                user_id=user.id,
+                check_in=check_in,
+                check_out=check_out,
+                num_adults=num_adults,
+                num_children=num_children,
+                special_requests=data.get('special_requests')
+            )
+        except BookingConflict as e:
+            return jsonify({'error': str(e)}), 409
+        
+        occupancy_engine.mark_booked(booking)
+        refresh_for_booking(booking)
         
         # Log creation
         log_user_action(
@@ -176,8 +247,211 @@ def create_booking():
         return jsonify({'error': 'Failed to create booking'}), 500
 
 
+@bookings_bp.route('/group', methods=['POST'])
+@client_required
+@idempotent
+def create_group_booking():
+    """
+    Book several rooms at once, all-or-nothing (client only)
+    
+    Required: items, a list of {room_id, check_in_date, check_out_date,
+    num_adults, num_children?}. Optional: special_requests (applied to all).
+    
+    Returns 409 if any room already has a confirmed booking overlapping its
+    stay; nothing is booked in that case.
+    """
+    try:
+        user = get_current_user()
+        data = request.get_json() or {}
+        
+        items = data.get('items')
+        max_rooms = current_app.config.get('GROUP_BOOKING_MAX_ROOMS', 50)
+        if not isinstance(items, list) or not items:
+            return jsonify({'error': 'items must be a non-empty list'}), 400
+        if len(items) > max_rooms:
+            return jsonify({'error': f'A group booking is limited to {max_rooms} rooms'}), 400
+        
+        # Validate every item before touching the database
+        parsed = []
+        try:
+            for index, item in enumerate(items):
+                if not isinstance(item, dict) or 'room_id' not in item or 'num_adults' not in item:
+                    raise ValidationError(f'items[{index}]: room_id and num_adults are required')
+                check_in, check_out = validate_date_range(item.get('check_in_date'), item.get('check_out_date'))
+                num_adults = int(item['num_adults'])
+                num_children = int(item.get('num_children', 0))
+                if num_adults < 1 or num_children < 0:
+                    raise ValidationError(f'items[{index}]: invalid guest count')
+                parsed.append({
+                    'room_id': int(item['room_id']),
+                    'check_in': check_in,
+                    'check_out': check_out,
+                    'num_adults': num_adults,
+                    'num_children': num_children,
+                })
+        except (TypeError, ValueError):
+            return jsonify({'error': 'room_id and guest counts must be integers'}), 400
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        try:
+            booking_ids = reserve_rooms(user.id, parsed, special_requests=data.get('special_requests'))
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except BookingConflict as e:
+            return jsonify({'error': str(e)}), 409
+        
+        columns = columns_for(Booking)
+        bookings = Booking.query.with_entities(*columns).filter(
+            Booking.id.in_(booking_ids)
+        ).order_by(Booking.id).all()
+        for booking in bookings:
+            occupancy_engine.mark_booked(booking)
+        refresh_for_bookings(bookings)
+        
+        return jsonify({
+            'message': 'Group booking created successfully',
+            'bookings': serialize_rows(bookings, columns),
+            'count': len(bookings),
+            'total_price': sum(float(booking.total_price) for booking in bookings)
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Create group booking error: {str(e)}")
+        return jsonify({'error': 'Failed to create group booking'}), 500
+
+
+@bookings_bp.route('/holds', methods=['POST'])
+@client_required
+def create_hold():
+    """
+    Hold a room for a stay while the client checks out (client only)
+    
+    Required: room_id, check_in_date, check_out_date, num_adults
+    
+    The hold expires after HOLD_TTL seconds unless confirmed. Returns 409 if
+    the room is booked or held by another client for overlapping dates, and
+    429 if the client already has HOLD_MAX_PER_USER live holds.
+    """
+    try:
+        user = get_current_user()
+        data = request.get_json() or {}
+        
+        if 'room_id' not in data or 'num_adults' not in data:
+            return jsonify({'error': 'room_id and num_adults are required'}), 400
+        
+        try:
+            check_in, check_out = validate_date_range(data.get('check_in_date'), data.get('check_out_date'))
+            num_adults = int(data['num_adults'])
+            num_children = int(data.get('num_children', 0))
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Guest counts must be integers'}), 400
+        
+        room = Room.query.get(data['room_id'])
+        if not room:
+            return jsonify({'error': 'Room not found'}), 404
+        
+        if not room.is_available:
+            return jsonify({'error': 'Room is not available'}), 400
+        
+        if num_adults < 1 or num_children < 0:
+            return jsonify({'error': 'At least one adult is required'}), 400
+        
+        if num_adults + num_children > room.max_guests:
+            return jsonify({'error': f'Room capacity is {room.max_guests} guests'}), 400
+        
+        try:
+            hold = place_hold(room, user.id, check_in, check_out, num_adults, num_children)
+        except (BookingConflict, HoldConflict) as e:
+            return jsonify({'error': str(e)}), 409
+        except HoldLimitReached as e:
+            return jsonify({'error': str(e)}), 429
+        
+        return jsonify({
+            'message': 'Room held',
+            'hold': hold_store.to_dict(hold)
+        }), 201
+        
+    except Exception as e:
+        print(f"[v0] Create hold error: {str(e)}")
+        return jsonify({'error': 'Failed to hold room'}), 500
+
+
+@bookings_bp.route('/holds/<hold_id>/confirm', methods=['POST'])
+@client_required
+@idempotent
+def confirm_hold(hold_id):
+    """
+    Convert a live hold into a confirmed booking (hold owner only)
+    
+    Optional: special_requests. Returns 404 if the hold is unknown or has
+    expired.
+    """
+    try:
+        user = get_current_user()
+        data = request.get_json(silent=True) or {}
+        
+        hold = hold_store.get(hold_id)
+        if hold is None or hold['user_id'] != user.id:
+            return jsonify({'error': 'Hold not found or expired'}), 404
+        
+        try:
+            booking = convert_hold(hold, special_requests=data.get('special_requests'))
+        except BookingConflict as e:
+            return jsonify({'error': str(e)}), 409
+        
+        occupancy_engine.mark_booked(booking)
+        refresh_for_booking(booking)
+        
+        log_user_action(
+            user_id=user.id,
+            action='create',
+            entity_type='booking',
+            entity_id=booking.id,
+            new_values={
+                'booking_ref': booking.booking_ref,
+                'hotel_id': booking.hotel_id,
+                'room_id': booking.room_id,
+                'hold_id': hold_id
+            }
+        )
+        
+        return jsonify({
+            'message': 'Booking created successfully',
+            'booking': booking.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Confirm hold error: {str(e)}")
+        return jsonify({'error': 'Failed to confirm hold'}), 500
+
+
+@bookings_bp.route('/holds/<hold_id>', methods=['DELETE'])
+@client_required
+def release_hold(hold_id):
+    """Release a hold before it expires (hold owner only)"""
+    try:
+        user = get_current_user()
+        
+        hold = hold_store.get(hold_id)
+        if hold is None or hold['user_id'] != user.id:
+            return jsonify({'error': 'Hold not found or expired'}), 404
+        
+        hold_store.release(hold_id)
+        return jsonify({'message': 'Hold released'}), 200
+        
+    except Exception as e:
+        print(f"[v0] Release hold error: {str(e)}")
+        return jsonify({'error': 'Failed to release hold'}), 500
+
+
 @bookings_bp.route('/<int:booking_id>/cancel', methods=['POST'])
 @role_required('client', 'admin')
+@idempotent
 def cancel_booking(booking_id):
     """Cancel booking (client can cancel their own, admin can cancel any)"""
     try:
@@ -197,6 +471,8 @@ def cancel_booking(booking_id):
         # Update status
         booking.status = 'cancelled'
         db.session.commit()
+        occupancy_engine.release(booking)
+        refresh_for_booking(booking)
         
         # Log cancellation
         log_user_action(
@@ -250,3 +526,80 @@ def complete_booking(booking_id):
         db.session.rollback()
         print(f"[v0] Complete booking error: {str(e)}")
         return jsonify({'error': 'Failed to complete booking'}), 500
+
+
+@bookings_bp.route('/bulk-status', methods=['POST'])
+@admin_required
+def bulk_update_status():
+    """
+    Cancel, complete or no-show many bookings at once (admin only)
+    
+    Required: action ('cancel', 'complete' or 'no-show') and either ids (a
+    list of booking ids) or filter ({hotel_id, room_id, user_id,
+    check_in_from, check_in_to, created_from, created_to}; only bookings
+    the action applies to are selected).
+    
+    Up to BULK_STATUS_MAX_BOOKINGS bookings per call. Returns a result per
+    id: updated, not_found or invalid_transition (with the current status).
+    """
+    try:
+        user = get_current_user()
+        data = request.get_json() or {}
+        max_bookings = current_app.config.get('BULK_STATUS_MAX_BOOKINGS', 10000)
+        
+        action = data.get('action')
+        if action not in TRANSITIONS:
+            return jsonify({'error': f"action must be one of: {', '.join(TRANSITIONS)}"}), 400
+        
+        ids = data.get('ids')
+        filters = data.get('filter')
+        if (ids is None) == (filters is None):
+            return jsonify({'error': 'Provide either ids or filter'}), 400
+        
+        try:
+            if ids is not None:
+                if not isinstance(ids, list) or not ids:
+                    raise ValidationError('ids must be a non-empty list')
+                if len(ids) > max_bookings:
+                    raise ValidationError(f'At most {max_bookings} bookings can be changed at once')
+                ids = [int(booking_id) for booking_id in ids]
+            else:
+                if not isinstance(filters, dict) or not filters:
+                    raise ValidationError('filter must be a non-empty object')
+                unknown = set(filters) - {'hotel_id', 'room_id', 'user_id', 'check_in_from', 'check_in_to',
+                                          'created_from', 'created_to'}
+                if unknown:
+                    raise ValidationError(f"Unknown filter: {', '.join(sorted(unknown))}")
+                # A null or empty criterion selects nothing; an all-empty filter must not match every booking
+                filters = {name: value for name, value in filters.items() if value not in (None, '')}
+                if not filters:
+                    raise ValidationError('filter needs at least one non-empty criterion')
+                for name in ('check_in_from', 'check_in_to', 'created_from', 'created_to'):
+                    if name in filters:
+                        parsed = parse_iso_datetime(filters[name], name)
+                        if parsed is None:
+                            raise ValidationError(f'Invalid {name}. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)')
+                        filters[name] = parsed.date() if name.startswith('check_in') else parsed
+                for name in ('hotel_id', 'room_id', 'user_id'):
+                    if filters.get(name) is not None:
+                        filters[name] = int(filters[name])
+            
+            results = bulk_transition(action, user.id, booking_ids=ids, filters=filters, max_bookings=max_bookings)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Booking, hotel, room and user ids must be integers'}), 400
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        updated = sum(1 for result in results if result['result'] == 'updated')
+        return jsonify({
+            'message': f'{updated} booking(s) updated',
+            'action': action,
+            'requested': len(results),
+            'updated': updated,
+            'results': results
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Bulk booking status error: {str(e)}")
+        return jsonify({'error': 'Failed to update bookings'}), 500
@@ -5,12 +5,18 @@ Role-based access control implemented:
 - Hotelier: Manage their own hotels
 - Client: View approved hotels only
 """
-from flask import Blueprint, request, jsonify
+from datetime import date
+from decimal import Decimal
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required
-from sqlalchemy import or_
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import joinedload
 
 from database import db
 from models.hotel import Hotel
+from models.hotel_summary import HotelSummary
+from models.rate_rule import RateRule
+from models.room import Room
 from models.user import User
 from middleware import (
     role_required,
@@ -21,25 +27,92 @@ from middleware import (
     require_permission,
     PermissionDenied
 )
-from utils.auth_helpers import get_current_user, log_user_action
+from utils.auth_helpers import get_current_user, get_optional_identity, log_user_action
+from utils.pagination import decode_cursor, parse_limit, paginate_keyset
+from utils.fields import parse_fields, projection
+from utils.rows import columns_for, serialize_rows
+from utils.validators import ValidationError, parse_iso_datetime, parse_price, validate_date_range, validate_rate_rule
+from services.availability import search_available_hotels
+from services.cache import catalog_cache
+from services.catalog import include_options, parse_includes, serialize_hotels
+from services.facets import compute_facets, parse_facets
+from services.bulk_import import HotelImporter, read_rows
+from services.occupancy import occupancy_engine
+from services.hotel_summary import refresh_hotel_summaries
+from services.calendar import occupancy_calendar
+from services.pricing import rate_calendars
 
 hotels_bp = Blueprint('hotels', __name__, url_prefix='/api/hotels')
 
+# Sort orders for the hotel list: column, descending
+HOTEL_SORTS = {
+    'rating': (Hotel.rating, True),
+    'price': (HotelSummary.min_price, False),
+    '-price': (HotelSummary.min_price, True),
+}
+
 
 @hotels_bp.route('', methods=['GET'])
 def get_hotels():
     """
     Get list of hotels (public endpoint with filtering)
     
+    Results are ordered by (rating DESC, id) by default and paginated with
+    an opaque keyset cursor, so every page is an index seek on
+    IX_hotels_rating. Price sorts and filters read the materialized
+    hotel_summary table instead of joining rooms.
+    
     Query params:
     - city: Filter by city
     - status: Filter by status (admin/hotelier only)
     - owner_id: Filter by owner (admin only)
+    - min_price, max_price: Hotels with at least one room priced within the
+      range (bounds inclusive)
+    - sort: 'rating' (default), 'price' or '-price' (by cheapest room)
+    - limit: Page size (default 20, max 100)
+    - cursor: next_cursor value from the previous page
+    - include: Comma-separated expansions (rooms, media, rating_summary, summary)
+    - facets: Comma-separated facet counts (city, rating, subscription_type,
+      price) or 'all', computed over the filtered result set
+    - fields: Comma-separated hotel columns to return (e.g. id,name,city,rating);
+      other columns are not fetched from the database
+    
+    Public (anonymous/client) pages are served from the catalog cache.
     """
     try:
+        try:
+            includes = parse_includes(request.args.get('include'))
+            facets = parse_facets(request.args.get('facets'))
+            fields = parse_fields(request.args.get('fields'), Hotel.SERIALIZED_FIELDS)
+            min_price = parse_price(request.args.get('min_price'), 'min_price')
+            max_price = parse_price(request.args.get('max_price'), 'max_price')
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        sort = request.args.get('sort', 'rating')
+        if sort not in HOTEL_SORTS:
+            return jsonify({'error': f"sort must be one of: {', '.join(HOTEL_SORTS)}"}), 400
+        sort_column, descending = HOTEL_SORTS[sort]
+        
         # Get current user if authenticated
         user = get_current_user()
         
+        # Anonymous users and clients share the same public catalog
+        public = not user or user.is_client()
+        cache_params = {
+            key: request.args.get(key)
+            for key in ('city', 'limit', 'cursor', 'sort', 'min_price', 'max_price')
+        }
+        cache_params['include'] = ','.join(includes)
+        cache_params['facets'] = ','.join(facets)
+        cache_params['fields'] = ','.join(fields or ())
+        if public:
+            # Taken before the query so a concurrent write orphans this page
+            cache_key = catalog_cache.list_key(cache_params)
+            cached = catalog_cache.get_list(cache_key)
+            if cached is not None:
+                return jsonify(cached), 200
+        
         query = Hotel.query
         
         # Apply filters based on user role
@@ -67,42 +140,417 @@ def get_hotels():
         if owner_id and user and user.is_admin():
             query = query.filter_by(owner_id=int(owner_id))
         
-        # Execute query
-        hotels = query.order_by(Hotel.rating.desc()).all()
+        # Price filters and sorts use the materialized summary, not rooms
+        uses_summary = sort != 'rating' or min_price is not None or max_price is not None
+        if uses_summary:
+            query = query.join(HotelSummary, HotelSummary.hotel_id == Hotel.id).filter(
+                HotelSummary.min_price.isnot(None)
+            )
+            if min_price is not None:
+                query = query.filter(HotelSummary.max_price >= min_price)
+            if max_price is not None:
+                query = query.filter(HotelSummary.min_price <= max_price)
+            if min_price is not None and max_price is not None:
+                # The summary's price range only overlapping [min, max] does not
+                # mean a room falls inside it (rooms at 50 and 500 vs 100-200):
+                # confirm on the hotel's rooms, for the hotels the summary kept
+                query = query.filter(exists().where(
+                    Room.hotel_id == Hotel.id,
+                    Room.price_per_night >= min_price,
+                    Room.price_per_night <= max_price
+                ))
+        
+        # Facets cover the whole filtered result set, not just this page
+        facet_counts = compute_facets(query, facets) if facets else None
+        
+        # Keyset pagination on (sort column, id)
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor')
+            if cursor:
+                cursor_sort, value, last_id = decode_cursor(cursor)
+                if cursor_sort != sort:
+                    raise ValidationError("Cursor does not match sort")
+                value = Decimal(value)
+                beyond = sort_column < value if descending else sort_column > value
+                query = query.filter(or_(
+                    beyond,
+                    and_(sort_column == value, Hotel.id > int(last_id))
+                ))
+        except (ValidationError, ValueError, TypeError, ArithmeticError):
+            return jsonify({'error': 'Invalid pagination parameters'}), 400
+        
+        query = query.order_by(sort_column.desc() if descending else sort_column.asc(), Hotel.id.asc())
+        
+        if includes:
+            # Expansions need ORM objects with eager-loaded relationships
+            query = query.options(*include_options(includes))
+            if uses_summary and 'summary' not in includes:
+                query = query.options(joinedload(Hotel.summary))
+            if fields:
+                query = query.options(projection(Hotel, fields, 'rating'))
+            
+            def cursor_for(hotel):
+                value = hotel.rating if sort == 'rating' else hotel.summary.min_price
+                return [sort, str(value), hotel.id]
+            
+            hotels, next_cursor = paginate_keyset(query, limit, cursor_for)
+            serialized = serialize_hotels(hotels, includes, fields)
+        else:
+            # Plain column rows straight to JSON, with the sort key riding along
+            columns = columns_for(Hotel, fields)
+            query = query.with_entities(*columns, sort_column.label('sort_key'))
+            hotels, next_cursor = paginate_keyset(
+                query, limit, lambda row: [sort, str(row.sort_key), row.id]
+            )
+            serialized = serialize_rows(hotels, columns)
+        
+        payload = {
+            'hotels': serialized,
+            'count': len(hotels),
+            'limit': limit,
+            'next_cursor': next_cursor
+        }
+        if facet_counts is not None:
+            payload['facets'] = facet_counts
+        if public:
+            catalog_cache.set_list(cache_key, payload)
+        
+        return jsonify(payload), 200
+        
+    except Exception as e:
+        print(f"[v0] Get hotels error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch hotels'}), 500
+
+
+@hotels_bp.route('/search', methods=['GET'])
+def search_hotels():
+    """
+    Search approved hotels with free rooms for a stay (public endpoint)
+    
+    Rooms on hold for another client are not listed; a signed-in client
+    still sees the rooms they hold themselves.
+    
+    Query params:
+    - check_in, check_out: Stay dates (YYYY-MM-DD, required)
+    - adults: Number of adults (default 1)
+    - children: Number of children (default 0)
+    - city: Filter by city
+    - hotel_id: Restrict to one hotel
+    """
+    try:
+        try:
+            check_in, check_out = validate_date_range(
+                request.args.get('check_in'),
+                request.args.get('check_out')
+            )
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        adults = request.args.get('adults', 1, type=int)
+        children = request.args.get('children', 0, type=int)
+        if adults < 1 or children < 0:
+            return jsonify({'error': 'At least one adult is required'}), 400
+        guests = adults + children
+        
+        hotels = search_available_hotels(
+            check_in,
+            check_out,
+            guests=guests,
+            city=request.args.get('city'),
+            hotel_id=request.args.get('hotel_id', type=int),
+            user_id=get_optional_identity()
+        )
         
         return jsonify({
-            'hotels': [hotel.to_dict() for hotel in hotels],
-            'count': len(hotels)
+            'hotels': hotels,
+            'count': len(hotels),
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+            'guests': guests
         }), 200
         
     except Exception as e:
-        print(f"[v0] Get hotels error: {str(e)}")
-        return jsonify({'error': 'Failed to fetch hotels'}), 500
+        print(f"[v0] Search hotels error: {str(e)}")
+        return jsonify({'error': 'Failed to search hotels'}), 500
 
 
 @hotels_bp.route('/<int:hotel_id>', methods=['GET'])
 def get_hotel(hotel_id):
-    """Get single hotel details"""
+    """
+    Get single hotel details (approved hotels are served from the catalog cache)
+    
+    Query params:
+    - include: Comma-separated expansions (rooms, media, rating_summary, summary),
+      loaded in at most three batched queries
+    """
     try:
-        hotel = Hotel.query.get(hotel_id)
+        try:
+            includes = parse_includes(request.args.get('include'))
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        user = get_current_user()
+        
+        # Only approved hotels are cached, and those are visible to everyone
+        public = not user or user.is_client()
+        if public:
+            # Taken before the load so a concurrent write orphans this payload
+            cache_key = catalog_cache.hotel_key(hotel_id, includes)
+            cached = catalog_cache.get_hotel(cache_key)
+            if cached is not None:
+                return jsonify(cached), 200
+        
+        hotel = Hotel.query.options(*include_options(includes)).filter_by(id=hotel_id).first()
         
         if not hotel:
             return jsonify({'error': 'Hotel not found'}), 404
         
         # Check view permissions
-        user = get_current_user()
         if user and not can_view_hotel(user, hotel_id):
             return jsonify({'error': 'You cannot view this hotel'}), 403
         elif not user and hotel.status != 'approved':
             return jsonify({'error': 'Hotel not found'}), 404
         
-        return jsonify(hotel.to_dict()), 200
+        payload = serialize_hotels([hotel], includes)[0]
+        if public and hotel.status == 'approved':
+            catalog_cache.set_hotel(cache_key, payload)
+        
+        return jsonify(payload), 200
         
     except Exception as e:
         print(f"[v0] Get hotel error: {str(e)}")
         return jsonify({'error': 'Failed to fetch hotel'}), 500
 
 
+@hotels_bp.route('/<int:hotel_id>/occupancy', methods=['GET'])
+@role_required('hotelier', 'admin')
+def get_hotel_occupancy(hotel_id):
+    """
+    Occupancy calendar of a hotel (owner or admin only)
+    
+    Query params:
+    - start: First night, ISO date (default: today), at most
+      OCCUPANCY_CALENDAR_MAX_OFFSET_DAYS before or after today
+    - days: Number of nights (default 90, max OCCUPANCY_CALENDAR_MAX_DAYS)
+    
+    Returns per-night booked rooms, occupancy rate and revenue.
+    """
+    try:
+        user = get_current_user()
+        
+        if not Hotel.query.get(hotel_id):
+            return jsonify({'error': 'Hotel not found'}), 404
+        
+        if not can_manage_hotel(user, hotel_id):
+            return jsonify({'error': 'You cannot view this hotel'}), 403
+        
+        max_days = current_app.config.get('OCCUPANCY_CALENDAR_MAX_DAYS', 366)
+        days = request.args.get('days', 90, type=int)
+        if not 1 <= days <= max_days:
+            return jsonify({'error': f'days must be between 1 and {max_days}'}), 400
+        
+        try:
+            start = parse_iso_datetime(request.args.get('start'), 'start')
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        start = start.date() if start else date.today()
+        
+        # Far-off starts (e.g. 9999-12-31) would overflow the date arithmetic
+        max_offset = current_app.config.get('OCCUPANCY_CALENDAR_MAX_OFFSET_DAYS', 3660)
+        if abs((start - date.today()).days) > max_offset:
+            return jsonify({'error': f'start must be within {max_offset} days of today'}), 400
+        
+        return jsonify(occupancy_calendar(hotel_id, start, days)), 200
+        
+    except Exception as e:
+        print(f"[v0] Get hotel occupancy error: {str(e)}")
+        return jsonify({'error': 'Failed to compute occupancy'}), 500
+
+
+@hotels_bp.route('/quote', methods=['GET'])
+def quote_rooms():
+    """
+    Price a stay for many rooms at once (public endpoint)
+    
+    Query params:
+    - check_in, check_out: Stay dates (YYYY-MM-DD, required)
+    - room_ids: Comma-separated room ids, and/or
+    - hotel_id: Quote every room of an approved hotel
+    
+    Returns the stay total and average nightly price of each room from the
+    rate calendars (seasonal, weekday and length-of-stay rules applied).
+    """
+    try:
+        try:
+            check_in, check_out = validate_date_range(
+                request.args.get('check_in'),
+                request.args.get('check_out')
+            )
+            room_ids = [int(part) for part in request.args.get('room_ids', '').split(',') if part.strip()]
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        except ValueError:
+            return jsonify({'error': 'room_ids must be a comma-separated list of integers'}), 400
+        
+        hotel_id = request.args.get('hotel_id', type=int)
+        if not room_ids and not hotel_id:
+            return jsonify({'error': 'room_ids or hotel_id is required'}), 400
+        
+        max_rooms = current_app.config.get('RATE_QUOTE_MAX_ROOMS', 500)
+        if len(room_ids) > max_rooms:
+            return jsonify({'error': f'At most {max_rooms} rooms can be quoted at once'}), 400
+        
+        query = db.session.query(Room.id, Room.hotel_id, Room.room_number, Room.room_type, Room.currency).join(
+            Hotel, Hotel.id == Room.hotel_id
+        ).filter(Hotel.status == 'approved')
+        if room_ids and hotel_id:
+            query = query.filter(or_(Room.id.in_(room_ids), Room.hotel_id == hotel_id))
+        elif room_ids:
+            query = query.filter(Room.id.in_(room_ids))
+        else:
+            query = query.filter(Room.hotel_id == hotel_id)
+        rooms = query.order_by(Room.hotel_id, Room.id).limit(max_rooms).all()
+        
+        totals = rate_calendars.quote_rooms(rooms, check_in, check_out)
+        nights = (check_out - check_in).days
+        
+        return jsonify({
+            'quotes': [
+                {
+                    'room_id': room.id,
+                    'hotel_id': room.hotel_id,
+                    'room_number': room.room_number,
+                    'room_type': room.room_type,
+                    'currency': room.currency,
+                    'total_price': float(totals[room.id]),
+                    'average_nightly_price': round(float(totals[room.id]) / nights, 2),
+                }
+                for room in rooms
+            ],
+            'count': len(rooms),
+            'check_in': check_in.isoformat(),
+            'check_out': check_out.isoformat(),
+            'nights': nights
+        }), 200
+        
+    except Exception as e:
+        print(f"[v0] Quote rooms error: {str(e)}")
+        return jsonify({'error': 'Failed to quote rooms'}), 500
+
+
+@hotels_bp.route('/<int:hotel_id>/rates', methods=['GET'])
+@role_required('hotelier', 'admin')
+def get_rate_rules(hotel_id):
+    """List the rate rules of a hotel (owner or admin only)"""
+    try:
+        user = get_current_user()
+        
+        if not Hotel.query.get(hotel_id):
+            return jsonify({'error': 'Hotel not found'}), 404
+        
+        if not can_manage_hotel(user, hotel_id):
+            return jsonify({'error': 'You cannot view this hotel'}), 403
+        
+        rules = RateRule.query.filter_by(hotel_id=hotel_id).order_by(RateRule.priority, RateRule.id).all()
+        
+        return jsonify({
+            'rates': [rule.to_dict() for rule in rules],
+            'count': len(rules)
+        }), 200
+        
+    except Exception as e:
+        print(f"[v0] Get rate rules error: {str(e)}")
+        return jsonify({'error': 'Failed to fetch rate rules'}), 500
+
+
+@hotels_bp.route('/<int:hotel_id>/rates', methods=['POST'])
+@role_required('hotelier', 'admin')
+def create_rate_rule(hotel_id):
+    """
+    Add a rate rule to a hotel (owner or admin only)
+    
+    Required: adjustment ('fixed', 'percent' or 'amount'), value
+    Optional: room_id or room_type, start_date, end_date (inclusive),
+    weekdays (0 = Monday), min_nights, priority, name
+    """
+    try:
+        user = get_current_user()
+        
+        if not Hotel.query.get(hotel_id):
+            return jsonify({'error': 'Hotel not found'}), 404
+        
+        if not can_manage_hotel(user, hotel_id):
+            return jsonify({'error': 'You cannot manage this hotel'}), 403
+        
+        try:
+            values = validate_rate_rule(request.get_json())
+        except ValidationError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if values['room_id'] is not None:
+            room = Room.query.get(values['room_id'])
+            if not room or room.hotel_id != hotel_id:
+                return jsonify({'error': 'Room not found in this hotel'}), 404
+        
+        rule = RateRule(hotel_id=hotel_id, **values)
+        db.session.add(rule)
+        db.session.commit()
+        rate_calendars.invalidate([hotel_id])
+        
+        log_user_action(
+            user_id=user.id,
+            action='create',
+            entity_type='rate_rule',
+            entity_id=rule.id,
+            new_values={'hotel_id': hotel_id, 'adjustment': rule.adjustment, 'value': float(rule.value)}
+        )
+        
+        return jsonify({
+            'message': 'Rate rule created successfully',
+            'rate': rule.to_dict()
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Create rate rule error: {str(e)}")
+        return jsonify({'error': 'Failed to create rate rule'}), 500
+
+
+@hotels_bp.route('/<int:hotel_id>/rates/<int:rule_id>', methods=['DELETE'])
+@role_required('hotelier', 'admin')
+def delete_rate_rule(hotel_id, rule_id):
+    """Delete a rate rule (owner or admin only)"""
+    try:
+        user = get_current_user()
+        rule = RateRule.query.get(rule_id)
+        
+        if not rule or rule.hotel_id != hotel_id:
+            return jsonify({'error': 'Rate rule not found'}), 404
+        
+        if not can_manage_hotel(user, hotel_id):
+            return jsonify({'error': 'You cannot manage this hotel'}), 403
+        
+        log_user_action(
+            user_id=user.id,
+            action='delete',
+            entity_type='rate_rule',
+            entity_id=rule.id,
+            old_values=rule.to_dict()
+        )
+        
+        db.session.delete(rule)
+        db.session.commit()
+        rate_calendars.invalidate([hotel_id])
+        
+        return jsonify({'message': 'Rate rule deleted successfully'}), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Delete rate rule error: {str(e)}")
+        return jsonify({'error': 'Failed to delete rate rule'}), 500
+
+
 @hotels_bp.route('', methods=['POST'])
 @role_required('hotelier', 'admin')
 def create_hotel():
@@ -140,6 +588,8 @@ def create_hotel():
         
         db.session.add(hotel)
         db.session.commit()
+        catalog_cache.invalidate_hotel(hotel.id)
+        refresh_hotel_summaries([hotel.id])
         
         # Log creation
         log_user_action(
@@ -161,6 +611,54 @@ def create_hotel():
         return jsonify({'error': 'Failed to create hotel'}), 500
 
 
+@hotels_bp.route('/import', methods=['POST'])
+@role_required('hotelier', 'admin')
+def import_hotels():
+    """
+    Bulk import hotels and rooms from a CSV or NDJSON body (hotelier or admin only)
+    
+    The body is streamed row by row and written in bounded chunks. Each row
+    has a 'record' column: 'hotel' rows need ref, name, address, city;
+    'room' rows need hotel_ref (or an existing hotel_id), room_number and
+    price_per_night.
+    
+    Query params:
+    - format: 'csv' or 'ndjson' (default: from Content-Type)
+    """
+    try:
+        user = get_current_user()
+        
+        fmt = request.args.get('format')
+        if not fmt:
+            fmt = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+        if fmt not in ('csv', 'ndjson'):
+            return jsonify({'error': "format must be 'csv' or 'ndjson'"}), 400
+        
+        importer = HotelImporter(
+            user,
+            chunk_size=current_app.config['BULK_IMPORT_CHUNK_SIZE'],
+            max_errors=current_app.config['BULK_IMPORT_MAX_ERRORS']
+        )
+        report = importer.run(read_rows(request.stream, fmt))
+        
+        if report['hotels_created'] or report['rooms_created']:
+            refresh_hotel_summaries(importer.touched_hotel_ids)
+            catalog_cache.clear()
+            occupancy_engine.invalidate()
+            rate_calendars.invalidate(importer.touched_hotel_ids)
+        
+        status_code = 201 if report['hotels_created'] or report['rooms_created'] else 400
+        return jsonify({
+            'message': 'Import finished',
+            **report
+        }), status_code
+        
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Import hotels error: {str(e)}")
+        return jsonify({'error': 'Failed to import hotels'}), 500
+
+
 @hotels_bp.route('/<int:hotel_id>', methods=['PUT'])
 @jwt_required()
 def update_hotel(hotel_id):
@@ -187,6 +685,7 @@ def update_hotel(hotel_id):
                 setattr(hotel, field, data[field])
         
         db.session.commit()
+        catalog_cache.invalidate_hotel(hotel.id)
         
         # Log update
         log_user_action(
@@ -233,6 +732,7 @@ def delete_hotel(hotel_id):
         
         db.session.delete(hotel)
         db.session.commit()
+        catalog_cache.invalidate_hotel(hotel_id)
         
         return jsonify({'message': 'Hotel deleted successfully'}), 200
         
@@ -261,6 +761,7 @@ def approve_hotel(hotel_id):
         
         hotel.status = status
         db.session.commit()
+        catalog_cache.invalidate_hotel(hotel.id)
         
         # Log approval
         log_user_action(
@@ -0,0 +1,101 @@
+"""
+Room availability queries for HoteliaSEM
+Set-based availability search backed by the ix_bookings_avail index
+"""
+from sqlalchemy import exists
+
+from database import db
+from models.booking import Booking
+from models.hotel import Hotel
+from models.room import Room
+from services.holds import hold_store
+from services.occupancy import occupancy_engine
+from services.pricing import rate_calendars
+
+# Booking statuses that occupy a room for their date range
+BLOCKING_STATUSES = ('confirmed',)
+
+
+def overlapping_bookings(room_id_column, check_in, check_out):
+    """
+    Correlated EXISTS over bookings overlapping [check_in, check_out)
+
+    The predicate (room_id =, check_in_date <, check_out_date >) is a seek
+    on ix_bookings_avail (room_id, check_in_date, check_out_date).
+    """
+    return exists().where(
+        Booking.room_id == room_id_column,
+        Booking.check_in_date < check_out,
+        Booking.check_out_date > check_in,
+        Booking.status.in_(BLOCKING_STATUSES)
+    )
+
+
+def available_rooms_query(check_in, check_out, guests=1, city=None, hotel_id=None, exclude_booked=True):
+    """
+    Build a single query returning (Hotel, Room) pairs free for the stay
+
+    Rooms are anti-joined against overlapping bookings, so no per-room
+    round trip is needed. With exclude_booked=False only the catalog
+    filters are applied and occupancy is left to the caller.
+    """
+    query = db.session.query(Hotel, Room).join(Room, Room.hotel_id == Hotel.id).filter(
+        Hotel.status == 'approved',
+        Room.is_available == True,  # noqa: E712
+        Room.max_guests >= guests
+    )
+
+    if exclude_booked:
+        query = query.filter(~overlapping_bookings(Room.id, check_in, check_out))
+
+    if city:
+        query = query.filter(Hotel.city.ilike(f'%{city}%'))
+
+    if hotel_id:
+        query = query.filter(Hotel.id == hotel_id)
+
+    return query.order_by(Hotel.rating.desc(), Hotel.id, Room.price_per_night, Room.id)
+
+
+def search_available_hotels(check_in, check_out, guests=1, city=None, hotel_id=None, user_id=None):
+    """
+    Return hotels with their free rooms for a date range and guest count
+
+    Rooms held by another client for overlapping dates are left out; the
+    searching user's own holds (user_id) do not hide their rooms. Each room
+    carries the stay total from the rate calendars (total_price).
+
+    Returns:
+        List of hotel dicts, each with an 'available_rooms' list
+    """
+    use_engine = occupancy_engine.covers(check_in, check_out)
+    rows = available_rooms_query(
+        check_in, check_out, guests, city, hotel_id, exclude_booked=not use_engine
+    ).all()
+
+    if use_engine and rows:
+        free = occupancy_engine.free_mask([room.id for _, room in rows], check_in, check_out)
+        rows = [row for row, is_free in zip(rows, free) if is_free]
+
+    if rows:
+        held = hold_store.held_room_ids({room.id for _, room in rows}, check_in, check_out, user_id)
+        if held:
+            rows = [(hotel, room) for hotel, room in rows if room.id not in held]
+
+    quotes = rate_calendars.quote_rooms([room for _, room in rows], check_in, check_out)
+    nights = (check_out - check_in).days
+
+    results = []
+    current = None
+
+    for hotel, room in rows:
+        if current is None or current['id'] != hotel.id:
+            current = hotel.to_dict()
+            current['available_rooms'] = []
+            results.append(current)
+        data = room.to_dict()
+        data['total_price'] = float(quotes[room.id])
+        data['average_nightly_price'] = round(float(quotes[room.id]) / nights, 2)
+        current['available_rooms'].append(data)
+
+    return results
@@ -0,0 +1,356 @@
+"""
+Streaming bulk import of hotels and rooms for HoteliaSEM
+
+Rows are read one at a time from a CSV or NDJSON stream, validated, and
+written in chunks: each chunk is one transaction with one executemany for
+hotels, one for rooms and one for the audit entries. Memory stays bounded
+by the chunk size, the file-ref -> hotel id map and the capped error list.
+
+Row format (CSV header or NDJSON keys):
+- record=hotel: ref, name, address, city, plus optional hotel columns
+- record=room: hotel_ref (a hotel ref earlier in the file) or hotel_id
+  (an existing hotel), room_number, price_per_night, plus optional room columns
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import db
+from models.hotel import Hotel
+from models.room import Room
+from utils.auth_helpers import log_user_actions
+
+HOTEL_OPTIONAL = ('description', 'country', 'phone', 'email', 'website', 'subscription_type')
+ROOM_OPTIONAL = ('room_type', 'currency', 'floor_number', 'area_sqm', 'features')
+
+
+class RowError(Exception):
+    """Validation error for a single import row"""
+    pass
+
+
+def read_rows(stream, fmt):
+    """
+    Yield (line_number, row dict) from a binary stream without buffering it
+
+    Unparseable NDJSON lines are yielded with a None row.
+
+    Args:
+        stream: File-like object of bytes (e.g. request.stream)
+        fmt: 'csv' or 'ndjson'
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+
+def _clean(value):
+    """Empty CSV cells become None"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _decimal(row, field, required=False, positive=False):
+    value = _clean(row.get(field))
+    if value is None:
+        if required:
+            raise RowError(f'{field} is required')
+        return None
+    try:
+        number = Decimal(str(value))
+    except (InvalidOperation, ArithmeticError):
+        raise RowError(f'{field} must be a number')
+    # NaN would raise on the comparison below and Infinity would fail the whole chunk
+    if not number.is_finite():
+        raise RowError(f'{field} must be a finite number')
+    if positive and number <= 0:
+        raise RowError(f'{field} must be positive')
+    return number
+
+
+def _integer(row, field, default=None, minimum=None, maximum=None):
+    value = _clean(row.get(field))
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except (TypeError, ValueError, OverflowError):
+        raise RowError(f'{field} must be an integer')
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise RowError(f'{field} must be between {minimum} and {maximum}')
+    return number
+
+
+class HotelImporter:
+    """Validate and insert a stream of hotel and room rows for one user"""
+
+    def __init__(self, user, chunk_size=1000, max_errors=1000):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+        self.hotel_ids = {}          # file ref -> new hotel id (None if the row failed)
+        self._manageable = {}        # existing hotel id -> bool
+        self._hotels = []            # pending (line, ref, values)
+        self._rooms = []             # pending (line, hotel ref or None, hotel id or None, values)
+
+        self.touched_hotel_ids = set()
+
+        self.rows = 0
+        self.hotels_created = 0
+        self.rooms_created = 0
+        self.failed = 0
+        self.errors = []
+
+    # ------------------------------------------------------------------
+    # Validation
+    # ------------------------------------------------------------------
+
+    def _hotel_values(self, row):
+        for field in ('name', 'address', 'city'):
+            if not _clean(row.get(field)):
+                raise RowError(f'{field} is required')
+
+        subscription_type = _clean(row.get('subscription_type')) or 'standard'
+        if subscription_type not in ('standard', 'premium'):
+            raise RowError('subscription_type must be standard or premium')
+
+        values = {field: _clean(row.get(field)) for field in HOTEL_OPTIONAL}
+        values.update({
+            'name': _clean(row['name']),
+            'address': _clean(row['address']),
+            'city': _clean(row['city']),
+            'country': values['country'] or 'Cameroun',
+            'subscription_type': subscription_type,
+            'latitude': _decimal(row, 'latitude'),
+            'longitude': _decimal(row, 'longitude'),
+            'owner_id': self.user.id,
+            'status': 'pending' if self.user.is_hotelier() else 'approved',
+        })
+        return values
+
+    def _room_values(self, row):
+        if not _clean(row.get('room_number')):
+            raise RowError('room_number is required')
+
+        values = {field: _clean(row.get(field)) for field in ROOM_OPTIONAL}
+        values.update({
+            'room_number': str(_clean(row['room_number'])),
+            'room_type': values['room_type'] or 'standard',
+            'currency': values['currency'] or 'XAF',
+            'price_per_night': _decimal(row, 'price_per_night', required=True, positive=True),
+            'max_guests': _integer(row, 'max_guests', default=2, minimum=1, maximum=20),
+            'floor_number': _integer(row, 'floor_number'),
+            'area_sqm': _decimal(row, 'area_sqm'),
+        })
+        return values
+
+    def _can_manage(self, hotel_id):
+        """Ownership check for rooms added to existing hotels, cached per hotel"""
+        if hotel_id not in self._manageable:
+            if self.user.is_admin():
+                allowed = db.session.query(Hotel.id).filter_by(id=hotel_id).first() is not None
+            else:
+                allowed = db.session.query(Hotel.id).filter_by(id=hotel_id, owner_id=self.user.id).first() is not None
+            self._manageable[hotel_id] = allowed
+        return self._manageable[hotel_id]
+
+    def _error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    # ------------------------------------------------------------------
+    # Processing
+    # ------------------------------------------------------------------
+
+    def add(self, line, row):
+        """Validate one row and queue it for the next chunk"""
+        self.rows += 1
+
+        try:
+            if row is None:
+                raise RowError('invalid JSON object')
+
+            record = _clean(row.get('record'))
+            if record == 'hotel':
+                ref = _clean(row.get('ref'))
+                if not ref:
+                    raise RowError('ref is required for hotel rows')
+                if ref in self.hotel_ids:
+                    raise RowError(f'duplicate hotel ref {ref}')
+                values = self._hotel_values(row)
+                self.hotel_ids[ref] = None
+                self._hotels.append((line, ref, values))
+
+            elif record == 'room':
+                values = self._room_values(row)
+                hotel_ref = _clean(row.get('hotel_ref'))
+                hotel_id = _integer(row, 'hotel_id')
+                if hotel_ref:
+                    if hotel_ref not in self.hotel_ids:
+                        raise RowError(f'unknown hotel_ref {hotel_ref} (hotel rows must come first)')
+                    hotel_id = None
+                elif hotel_id is None:
+                    raise RowError('hotel_ref or hotel_id is required for room rows')
+                elif not self._can_manage(hotel_id):
+                    raise RowError(f'you cannot add rooms to hotel {hotel_id}')
+                self._rooms.append((line, hotel_ref, hotel_id, values))
+
+            else:
+                raise RowError("record must be 'hotel' or 'room'")
+
+        except RowError as e:
+            self._error(line, str(e))
+
+        if len(self._hotels) + len(self._rooms) >= self.chunk_size:
+            self.flush()
+
+    def run(self, rows):
+        """Import an iterable of (line, row) pairs and return the report"""
+        for line, row in rows:
+            self.add(line, row)
+        self.flush()
+        return self.report()
+
+    def flush(self):
+        """Write the pending chunk in one transaction, falling back to per-row on conflicts"""
+        if not self._hotels and not self._rooms:
+            return
+
+        hotels, rooms = self._hotels, self._rooms
+        self._hotels, self._rooms = [], []
+
+        try:
+            created_hotels, room_rows, skipped = self._write_chunk(hotels, rooms)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            for _, ref, _ in hotels:
+                self.hotel_ids[ref] = None
+            self._write_rows(hotels, rooms)
+            return
+
+        # Counted only once the chunk is in: a failed chunk is replayed by
+        # _write_rows, which counts and reports its rows itself
+        self.touched_hotel_ids.update(hotel_id for hotel_id, _ in created_hotels)
+        self.touched_hotel_ids.update(row['hotel_id'] for row in room_rows)
+        self.hotels_created += len(created_hotels)
+        self.rooms_created += len(room_rows)
+        for line, hotel_ref in skipped:
+            self._error(line, f'hotel {hotel_ref} was not imported')
+
+    def _write_chunk(self, hotels, rooms):
+        """
+        Insert a chunk with one statement per table
+
+        Returns:
+            (created hotels, inserted room rows, (line, hotel_ref) of the room
+            rows skipped because their hotel was not imported)
+        """
+        created_hotels = []
+        if hotels:
+            ids = db.session.execute(
+                insert(Hotel).returning(Hotel.id, sort_by_parameter_order=True),
+                [values for _, _, values in hotels]
+            ).scalars().all()
+            for (_, ref, values), hotel_id in zip(hotels, ids):
+                self.hotel_ids[ref] = hotel_id
+                created_hotels.append((hotel_id, values))
+
+        room_rows = []
+        skipped = []
+        for line, hotel_ref, hotel_id, values in rooms:
+            hotel_id = self.hotel_ids.get(hotel_ref) if hotel_ref else hotel_id
+            if hotel_id is None:
+                skipped.append((line, hotel_ref))
+                continue
+            room_rows.append({**values, 'hotel_id': hotel_id})
+
+        if room_rows:
+            db.session.execute(insert(Room), room_rows)
+
+        self._audit(created_hotels, len(room_rows))
+        return created_hotels, room_rows, skipped
+
+    def _write_rows(self, hotels, rooms):
+        """Slow path after a failed chunk: one savepoint per row to report exact failures"""
+        created_hotels = []
+        for line, ref, values in hotels:
+            try:
+                with db.session.begin_nested():
+                    hotel_id = db.session.execute(insert(Hotel).returning(Hotel.id), values).scalar_one()
+                self.hotel_ids[ref] = hotel_id
+                created_hotels.append((hotel_id, values))
+            except SQLAlchemyError as e:
+                self._error(line, f'database rejected hotel: {e.__class__.__name__}')
+
+        created_rooms = 0
+        for line, hotel_ref, hotel_id, values in rooms:
+            hotel_id = self.hotel_ids.get(hotel_ref) if hotel_ref else hotel_id
+            if hotel_id is None:
+                self._error(line, f'hotel {hotel_ref} was not imported')
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(insert(Room), {**values, 'hotel_id': hotel_id})
+                created_rooms += 1
+                self.touched_hotel_ids.add(hotel_id)
+            except SQLAlchemyError:
+                self._error(line, 'database rejected room (duplicate room_number for this hotel?)')
+
+        self._audit(created_hotels, created_rooms)
+        db.session.commit()
+        self.touched_hotel_ids.update(hotel_id for hotel_id, _ in created_hotels)
+        self.hotels_created += len(created_hotels)
+        self.rooms_created += created_rooms
+
+    def _audit(self, created_hotels, rooms_created):
+        """One audit entry per created hotel plus one summary for the chunk's rooms"""
+        entries = [
+            {
+                'user_id': self.user.id,
+                'action': 'create',
+                'entity_type': 'hotel',
+                'entity_id': hotel_id,
+                'new_values': {'name': values['name'], 'city': values['city'], 'source': 'import'},
+            }
+            for hotel_id, values in created_hotels
+        ]
+        if rooms_created:
+            entries.append({
+                'user_id': self.user.id,
+                'action': 'import',
+                'entity_type': 'room',
+                'new_values': {'rooms_created': rooms_created},
+            })
+        log_user_actions(entries)
+
+    def report(self):
+        return {
+            'rows': self.rows,
+            'hotels_created': self.hotels_created,
+            'rooms_created': self.rooms_created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
@@ -0,0 +1,294 @@
+"""
+Catalog cache for HoteliaSEM
+Read-through cache for serialized hotel payloads and public list results
+
+Backends:
+- memory: per-process LRU with TTL (default)
+- redis: shared across gunicorn workers (requires the redis package)
+- none: caching disabled
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Interface implemented by catalog cache backends"""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def incr(self, key):
+        """Atomically increment a counter that is never evicted or expired"""
+        raise NotImplementedError
+
+    def counter(self, key):
+        raise NotImplementedError
+
+    def counters(self, *keys):
+        """Read several counters at once, 0 for the ones never incremented"""
+        return [self.counter(key) for key in keys]
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything"""
+
+    def __init__(self):
+        self.misses = 0
+
+    def get(self, key):
+        self.misses += 1
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def incr(self, key):
+        return 0
+
+    def counter(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'none', 'hits': 0, 'misses': self.misses, 'evictions': 0, 'expirations': 0, 'entries': 0}
+
+
+class MemoryCache(CacheBackend):
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def counters(self, *keys):
+        with self._lock:
+            return [self._counters.get(key, 0) for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared by all workers through Redis
+
+    Values are stored as JSON with SETEX; LRU eviction is delegated to the
+    server (maxmemory-policy volatile-lru keeps the un-expiring counters).
+    Hit/miss counters are per worker, evictions come from the server.
+    """
+
+    def __init__(self, url, prefix='hsem:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for CATALOG_CACHE_BACKEND='redis'")
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._client.setex(self.prefix + key, int(ttl), json.dumps(value))
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*[self.prefix + key for key in keys])
+
+    def incr(self, key):
+        return self._client.incr(self.prefix + key)
+
+    def counter(self, key):
+        return int(self._client.get(self.prefix + key) or 0)
+
+    def counters(self, *keys):
+        return [int(raw or 0) for raw in self._client.mget([self.prefix + key for key in keys])]
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        server = self._client.info('stats')
+        return {
+            'backend': 'redis',
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': server.get('evicted_keys', 0),
+            'expirations': server.get('expired_keys', 0),
+        }
+
+
+class CatalogCache:
+    """
+    Hotel catalog cache with explicit invalidation from the write paths
+
+    Single hotels are cached under their id and a per-hotel version that
+    every write to that hotel bumps. List results are cached under a
+    generation number that every hotel write bumps, so all cached pages are
+    invalidated at once without scanning keys. clear() bumps a catalog
+    generation shared by every key; superseded entries age out by TTL.
+
+    Readers take the key (list_key / hotel_key) before querying and store
+    the result under that same key, so a write that lands between the
+    query and the store orphans the stale payload instead of publishing it.
+    """
+
+    CATALOG_GENERATION_KEY = 'hotels:generation'
+    LIST_GENERATION_KEY = 'hotels:list:generation'
+
+    def __init__(self, app=None):
+        self.backend = NullCache()
+        self.ttl = 60
+        self.list_ttl = 30
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Select the backend from CATALOG_CACHE_BACKEND"""
+        backend = app.config.get('CATALOG_CACHE_BACKEND', 'memory')
+        self.ttl = app.config.get('CATALOG_CACHE_TTL', 60)
+        self.list_ttl = app.config.get('CATALOG_CACHE_LIST_TTL', 30)
+
+        if backend == 'memory':
+            self.backend = MemoryCache(app.config.get('CATALOG_CACHE_MAX_ENTRIES', 1000))
+        elif backend == 'redis':
+            self.backend = RedisCache(app.config['CATALOG_CACHE_REDIS_URL'])
+        else:
+            self.backend = NullCache()
+
+        app.extensions['catalog_cache'] = self
+
+    @staticmethod
+    def _version_key(hotel_id):
+        return f'hotels:version:{hotel_id}'
+
+    def hotel_key(self, hotel_id, includes=()):
+        """Key of a hotel detail, bound to the hotel version read now"""
+        generation, version = self.backend.counters(self.CATALOG_GENERATION_KEY, self._version_key(hotel_id))
+        return f'hotels:detail:{generation}:{hotel_id}:{version}:{",".join(includes)}'
+
+    def list_key(self, params):
+        """Key of a list page, bound to the list generation read now"""
+        generation = self.backend.counter(self.LIST_GENERATION_KEY)
+        normalized = '&'.join(f'{key}={params[key]}' for key in sorted(params) if params[key] not in (None, ''))
+        return f'hotels:list:{generation}:{normalized}'
+
+    def get_hotel(self, key):
+        return self.backend.get(key)
+
+    def set_hotel(self, key, payload):
+        self.backend.set(key, payload, self.ttl)
+
+    def get_list(self, key):
+        return self.backend.get(key)
+
+    def set_list(self, key, payload):
+        self.backend.set(key, payload, self.list_ttl)
+
+    def invalidate_hotel(self, hotel_id):
+        """Retire every cached variant of a hotel and every cached list page"""
+        self.backend.incr(self._version_key(hotel_id))
+        self.backend.incr(self.LIST_GENERATION_KEY)
+
+    def clear(self):
+        # Counters are bumped, never reset: a reader holding a key from before
+        # the clear must not be able to store under a key that is live after it
+        self.backend.incr(self.CATALOG_GENERATION_KEY)
+        self.backend.incr(self.LIST_GENERATION_KEY)
+
+    def stats(self):
+        stats = self.backend.stats()
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+        return stats
+
+
+catalog_cache = CatalogCache()
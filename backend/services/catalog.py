@@ -0,0 +1,107 @@
+"""
+Expanded hotel payloads for HoteliaSEM
+Resolves ?include=rooms,media,rating_summary,summary with batched loading
+"""
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+
+from database import db
+from models.hotel import Hotel
+from models.review import Review
+from utils.fields import project
+from utils.validators import ValidationError
+
+HOTEL_INCLUDES = ('media', 'rating_summary', 'rooms', 'summary')
+
+
+def parse_includes(value):
+    """
+    Parse a comma-separated include parameter
+
+    Returns:
+        Sorted tuple of include names (empty when nothing is requested)
+    """
+    if not value:
+        return ()
+
+    includes = {part.strip() for part in value.split(',') if part.strip()}
+    unknown = includes - set(HOTEL_INCLUDES)
+    if unknown:
+        raise ValidationError(f"Unknown include: {', '.join(sorted(unknown))}. "
+                              f"Allowed: {', '.join(HOTEL_INCLUDES)}")
+
+    return tuple(sorted(includes))
+
+
+def include_options(includes):
+    """
+    Loader options for a Hotel query
+
+    Media and the one-to-one summary are joined onto the hotel query itself;
+    rooms are fetched with one extra SELECT ... WHERE hotel_id IN (...) for
+    the whole page.
+    """
+    options = []
+    if 'media' in includes:
+        options.append(joinedload(Hotel.media))
+    if 'summary' in includes:
+        options.append(joinedload(Hotel.summary))
+    if 'rooms' in includes:
+        options.append(selectinload(Hotel.rooms))
+    return options
+
+
+def rating_summaries(hotel_ids):
+    """
+    Review count, average and star distribution for many hotels in one query
+
+    Returns:
+        Dict of hotel_id -> summary dict
+    """
+    summaries = {
+        hotel_id: {'count': 0, 'average': None, 'distribution': {str(star): 0 for star in range(1, 6)}}
+        for hotel_id in hotel_ids
+    }
+    if not hotel_ids:
+        return summaries
+
+    star = func.floor(Review.rating)
+    rows = db.session.query(
+        Review.hotel_id, star, func.count(Review.id), func.sum(Review.rating)
+    ).filter(Review.hotel_id.in_(hotel_ids)).group_by(Review.hotel_id, star).all()
+
+    totals = {}
+    for hotel_id, stars, count, rating_sum in rows:
+        summary = summaries[hotel_id]
+        summary['count'] += count
+        summary['distribution'][str(int(stars))] += count
+        totals[hotel_id] = totals.get(hotel_id, 0) + float(rating_sum)
+
+    for hotel_id, total in totals.items():
+        summaries[hotel_id]['average'] = round(total / summaries[hotel_id]['count'], 2)
+
+    return summaries
+
+
+def serialize_hotels(hotels, includes, fields=None):
+    """
+    Serialize hotels with the requested expansions (relationships must be eager loaded)
+
+    With fields, only those columns are emitted (see utils.fields.project).
+    """
+    summaries = rating_summaries([hotel.id for hotel in hotels]) if 'rating_summary' in includes else {}
+
+    payloads = []
+    for hotel in hotels:
+        data = project(hotel, fields) if fields else hotel.to_dict()
+        if 'rooms' in includes:
+            data['rooms'] = [room.to_dict() for room in hotel.rooms]
+        if 'media' in includes:
+            data['media'] = [media.to_dict() for media in hotel.media]
+        if 'rating_summary' in includes:
+            data['rating_summary'] = summaries[hotel.id]
+        if 'summary' in includes:
+            data['summary'] = hotel.summary.to_dict() if hotel.summary else None
+        payloads.append(data)
+
+    return payloads
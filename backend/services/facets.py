@@ -0,0 +1,118 @@
+"""
+Facet counts for the hotel catalog
+Each facet is one GROUP BY over the already filtered hotel query
+"""
+from sqlalchemy import String, case, distinct, func, literal_column
+
+from models.hotel import Hotel
+from models.room import Room
+from utils.validators import ValidationError
+
+HOTEL_FACETS = ('city', 'price', 'rating', 'subscription_type')
+
+# (label, lower bound inclusive, upper bound exclusive)
+RATING_BUCKETS = (
+    ('4.5+', 4.5, None),
+    ('4-4.5', 4, 4.5),
+    ('3-4', 3, 4),
+    ('2-3', 2, 3),
+    ('<2', None, 2),
+)
+
+# Nightly room price bands in XAF
+PRICE_BANDS = (
+    ('<25000', None, 25000),
+    ('25000-50000', 25000, 50000),
+    ('50000-100000', 50000, 100000),
+    ('100000+', 100000, None),
+)
+
+
+def parse_facets(value):
+    """Parse a comma-separated facets parameter ('all' selects every facet)"""
+    if not value:
+        return ()
+
+    facets = {part.strip() for part in value.split(',') if part.strip()}
+    if 'all' in facets:
+        return HOTEL_FACETS
+
+    unknown = facets - set(HOTEL_FACETS)
+    if unknown:
+        raise ValidationError(f"Unknown facet: {', '.join(sorted(unknown))}. "
+                              f"Allowed: {', '.join(HOTEL_FACETS)}")
+
+    return tuple(sorted(facets))
+
+
+def _bucket_case(column, buckets):
+    """
+    CASE expression mapping a numeric column to its bucket label
+
+    Bounds and labels are rendered as SQL literals, not bound parameters:
+    the expression is both selected and grouped by, and SQL Server only
+    matches the two when their text is identical (error 8120 otherwise),
+    which two sets of ? parameters are not.
+    """
+    def bound(value):
+        return literal_column(repr(value))
+
+    whens = []
+    for label, lower, upper in buckets:
+        label = literal_column(f"'{label}'", String)
+        if lower is None:
+            whens.append((column < bound(upper), label))
+        elif upper is None:
+            whens.append((column >= bound(lower), label))
+        else:
+            whens.append(((column >= bound(lower)) & (column < bound(upper)), label))
+    return case(*whens)
+
+
+def _ordered(rows, buckets=None):
+    """Format (value, count) rows, keeping bucket order when given"""
+    counts = {value: count for value, count in rows if value is not None}
+    if buckets is None:
+        return [{'value': value, 'count': count}
+                for value, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))]
+    return [{'value': label, 'count': counts.get(label, 0)} for label, _, _ in buckets]
+
+
+def compute_facets(query, facets):
+    """
+    Facet counts for a filtered Hotel query
+
+    Args:
+        query: Hotel query with visibility and request filters applied,
+            before ordering and pagination
+        facets: Facet names from parse_facets
+
+    Returns:
+        Dict of facet name -> list of {'value', 'count'}
+    """
+    result = {}
+
+    if 'city' in facets:
+        rows = query.with_entities(Hotel.city, func.count(Hotel.id)).group_by(Hotel.city).all()
+        result['city'] = _ordered(rows)
+
+    if 'rating' in facets:
+        bucket = _bucket_case(Hotel.rating, RATING_BUCKETS)
+        rows = query.with_entities(bucket, func.count(Hotel.id)).group_by(bucket).all()
+        result['rating'] = _ordered(rows, RATING_BUCKETS)
+
+    if 'subscription_type' in facets:
+        rows = query.with_entities(Hotel.subscription_type, func.count(Hotel.id)).group_by(
+            Hotel.subscription_type
+        ).all()
+        result['subscription_type'] = _ordered(rows)
+
+    if 'price' in facets:
+        # Hotels are counted once per band in which they have an available room
+        band = _bucket_case(Room.price_per_night, PRICE_BANDS)
+        rows = query.join(Room, Room.hotel_id == Hotel.id).filter(
+            Room.is_available == True  # noqa: E712
+        ).with_entities(band, func.count(distinct(Hotel.id))).group_by(band).all()
+        result['price'] = _ordered(rows, PRICE_BANDS)
+
+    return result
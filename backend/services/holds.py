@@ -0,0 +1,387 @@
+"""
+Temporary inventory holds for HoteliaSEM
+Short-lived room reservations taken between room selection and payment
+
+A hold blocks a room for a date range for HOLD_TTL seconds. Holds live
+outside the database in an expiring store, indexed by room:
+
+- memory: per-process store (default, single worker deployments)
+- redis: shared across gunicorn workers (requires the redis package)
+
+Expired holds are dropped lazily whenever their room or id is looked up, so
+there is never a sweep over all holds. A hold carries everything needed to
+create its booking (room, dates, guests, price), so converting it is one
+locked insert (see services.reservations.convert_hold).
+
+A client may have at most HOLD_MAX_PER_USER live holds, so one client cannot
+keep a hotel's whole inventory on hold. Holds are placed under the room lock
+(services.reservations.place_hold), so a booking committed concurrently
+cannot end up with a hold on top of it.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+
+from services.pricing import rate_calendars
+from utils.references import reference_ids
+
+
+class HoldConflict(Exception):
+    """Another client holds the room for overlapping dates"""
+    pass
+
+
+class HoldLimitReached(Exception):
+    """The client already has the maximum number of live holds"""
+    pass
+
+
+def _overlaps(hold, check_in, check_out):
+    # ISO dates compare correctly as strings
+    return hold['check_in_date'] < check_out and hold['check_out_date'] > check_in
+
+
+def _blocking(holds, check_in, check_out, user_id=None):
+    """First hold of another user overlapping [check_in, check_out)"""
+    for hold in holds:
+        if hold['user_id'] != user_id and _overlaps(hold, check_in, check_out):
+            return hold
+    return None
+
+
+class MemoryHolds:
+    """Thread-safe in-process hold store"""
+
+    def __init__(self):
+        self._rooms = {}  # room_id -> {hold_id: hold}
+        self._ids = {}  # hold_id -> room_id
+        self._users = {}  # user_id -> {hold_id: expires_at}
+        self._lock = threading.Lock()
+        self.expirations = 0
+
+    def _live(self, room_id, now):
+        """Holds of a room, dropping the expired ones"""
+        holds = self._rooms.get(room_id)
+        if not holds:
+            return {}
+
+        expired = [hold_id for hold_id, hold in holds.items() if hold['expires_at'] <= now]
+        for hold_id in expired:
+            self._forget(holds.pop(hold_id))
+        self.expirations += len(expired)
+
+        if not holds:
+            del self._rooms[room_id]
+            return {}
+        return holds
+
+    def _forget(self, hold):
+        """Drop a hold from the id and user indexes"""
+        self._ids.pop(hold['id'], None)
+        user_holds = self._users.get(hold['user_id'])
+        if user_holds is not None:
+            user_holds.pop(hold['id'], None)
+            if not user_holds:
+                del self._users[hold['user_id']]
+
+    def _user_count(self, user_id, now):
+        """Live holds of a user, dropping the expired ones from the user index"""
+        user_holds = self._users.get(user_id)
+        if not user_holds:
+            return 0
+        for hold_id in [hold_id for hold_id, expires_at in user_holds.items() if expires_at <= now]:
+            del user_holds[hold_id]
+        if not user_holds:
+            del self._users[user_id]
+        return len(user_holds)
+
+    def add(self, hold, max_per_user=None):
+        """
+        Store the hold
+
+        Raises:
+            HoldConflict: If another user's hold overlaps
+            HoldLimitReached: If the user already has max_per_user live holds
+        """
+        now = time.time()
+        with self._lock:
+            holds = self._live(hold['room_id'], now)
+            if _blocking(holds.values(), hold['check_in_date'], hold['check_out_date'], hold['user_id']):
+                raise HoldConflict('Room is on hold for these dates')
+            if max_per_user and self._user_count(hold['user_id'], now) >= max_per_user:
+                raise HoldLimitReached(f'At most {max_per_user} rooms can be held at once')
+
+            self._rooms.setdefault(hold['room_id'], {})[hold['id']] = hold
+            self._ids[hold['id']] = hold['room_id']
+            self._users.setdefault(hold['user_id'], {})[hold['id']] = hold['expires_at']
+
+    def get(self, hold_id):
+        with self._lock:
+            room_id = self._ids.get(hold_id)
+            if room_id is None:
+                return None
+            return self._live(room_id, time.time()).get(hold_id)
+
+    def remove(self, hold_id):
+        with self._lock:
+            room_id = self._ids.get(hold_id)
+            if room_id is None:
+                return False
+            holds = self._rooms.get(room_id, {})
+            hold = holds.pop(hold_id, None)
+            if hold is not None:
+                self._forget(hold)
+            else:
+                self._ids.pop(hold_id, None)
+            if not holds:
+                self._rooms.pop(room_id, None)
+            return True
+
+    def for_rooms(self, room_ids):
+        """Live holds of many rooms: dict of room_id -> list of holds"""
+        now = time.time()
+        with self._lock:
+            return {
+                room_id: list(holds.values())
+                for room_id in room_ids
+                for holds in [self._live(room_id, now)]
+                if holds
+            }
+
+    def clear(self):
+        with self._lock:
+            self._rooms.clear()
+            self._ids.clear()
+            self._users.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'holds': len(self._ids),
+                'rooms': len(self._rooms),
+                'users': len(self._users),
+                'expirations': self.expirations,
+            }
+
+
+class RedisHolds:
+    """
+    Hold store shared by all workers through Redis
+
+    Each room has a hash of hold id -> hold JSON that expires with its last
+    hold; each hold id maps to its room with its own TTL, and each user has a
+    sorted set of hold ids scored by expiry. Adding a hold is a WATCH/MULTI
+    transaction on the room hash and the user's set, so two workers cannot
+    place overlapping holds or exceed the per-user limit.
+    """
+
+    def __init__(self, url, prefix='hsem:holds:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for HOLD_BACKEND='redis'")
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def _room_key(self, room_id):
+        return f'{self.prefix}room:{room_id}'
+
+    def _id_key(self, hold_id):
+        return f'{self.prefix}id:{hold_id}'
+
+    def _user_key(self, user_id):
+        return f'{self.prefix}user:{user_id}'
+
+    @staticmethod
+    def _split(raw, now):
+        """Parse a room hash into (live holds, expired hold ids)"""
+        live, expired = {}, []
+        for hold_id, value in raw.items():
+            hold = json.loads(value)
+            if hold['expires_at'] <= now:
+                expired.append(hold_id)
+            else:
+                live[hold['id']] = hold
+        return live, expired
+
+    def add(self, hold, max_per_user=None):
+        key = self._room_key(hold['room_id'])
+        user_key = self._user_key(hold['user_id'])
+
+        def attempt(pipe):
+            now = time.time()
+            live, expired = self._split(pipe.hgetall(key), now)
+            if _blocking(live.values(), hold['check_in_date'], hold['check_out_date'], hold['user_id']):
+                raise HoldConflict('Room is on hold for these dates')
+            if max_per_user and pipe.zcount(user_key, f'({now}', '+inf') >= max_per_user:
+                raise HoldLimitReached(f'At most {max_per_user} rooms can be held at once')
+
+            expires_at = max([hold['expires_at']] + [other['expires_at'] for other in live.values()])
+            pipe.multi()
+            if expired:
+                pipe.hdel(key, *expired)
+            pipe.hset(key, hold['id'], json.dumps(hold))
+            pipe.pexpireat(key, int(expires_at * 1000) + 1)
+            pipe.set(self._id_key(hold['id']), hold['room_id'], pxat=int(hold['expires_at'] * 1000) + 1)
+            pipe.zremrangebyscore(user_key, '-inf', now)
+            pipe.zadd(user_key, {hold['id']: hold['expires_at']})
+            # Holds share one TTL, so the newest hold expires last
+            pipe.pexpireat(user_key, int(hold['expires_at'] * 1000) + 1)
+
+        self._client.transaction(attempt, key, user_key)
+
+    def get(self, hold_id):
+        room_id = self._client.get(self._id_key(hold_id))
+        if room_id is None:
+            return None
+        raw = self._client.hget(self._room_key(int(room_id)), hold_id)
+        if raw is None:
+            return None
+        hold = json.loads(raw)
+        return hold if hold['expires_at'] > time.time() else None
+
+    def remove(self, hold_id):
+        room_id = self._client.get(self._id_key(hold_id))
+        if room_id is None:
+            return False
+        raw = self._client.hget(self._room_key(int(room_id)), hold_id)
+        pipe = self._client.pipeline()
+        pipe.hdel(self._room_key(int(room_id)), hold_id)
+        pipe.delete(self._id_key(hold_id))
+        if raw is not None:
+            pipe.zrem(self._user_key(json.loads(raw)['user_id']), hold_id)
+        pipe.execute()
+        return True
+
+    def for_rooms(self, room_ids):
+        room_ids = list(room_ids)
+        pipe = self._client.pipeline(transaction=False)
+        for room_id in room_ids:
+            pipe.hgetall(self._room_key(room_id))
+
+        now = time.time()
+        held = {}
+        for room_id, raw in zip(room_ids, pipe.execute()):
+            if raw:
+                live, _ = self._split(raw, now)
+                if live:
+                    held[room_id] = list(live.values())
+        return held
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+class HoldStore:
+    """Places, looks up and releases room holds"""
+
+    def __init__(self, app=None):
+        self.backend = MemoryHolds()
+        self.ttl = 600
+        self.max_per_user = 5
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Select the backend from HOLD_BACKEND"""
+        backend = app.config.get('HOLD_BACKEND', 'memory')
+        self.ttl = app.config.get('HOLD_TTL', 600)
+        self.max_per_user = app.config.get('HOLD_MAX_PER_USER', 5)
+
+        if backend == 'redis':
+            self.backend = RedisHolds(app.config['CATALOG_CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryHolds()
+
+        app.extensions['hold_store'] = self
+
+    def place(self, room, user_id, check_in, check_out, num_adults, num_children=0):
+        """
+        Hold a room for a stay
+
+        The caller checks the room against confirmed bookings first, under
+        the room lock (see services.reservations.place_hold); this only
+        arbitrates between holds.
+
+        Returns:
+            The new hold dict
+
+        Raises:
+            HoldConflict: If another client holds the room for overlapping dates
+            HoldLimitReached: If the client already has HOLD_MAX_PER_USER live holds
+        """
+        hold = {
+            'id': reference_ids.next_reference('HOLD'),
+            'user_id': user_id,
+            'hotel_id': room.hotel_id,
+            'room_id': room.id,
+            'check_in_date': check_in.isoformat(),
+            'check_out_date': check_out.isoformat(),
+            'num_adults': num_adults,
+            'num_children': num_children,
+            'total_price': str(rate_calendars.quote_room(room, check_in, check_out)),
+            'expires_at': time.time() + self.ttl,
+        }
+        self.backend.add(hold, self.max_per_user)
+        return hold
+
+    def get(self, hold_id):
+        """Live hold by id, or None if unknown or expired"""
+        return self.backend.get(hold_id)
+
+    def release(self, hold_id):
+        return self.backend.remove(hold_id)
+
+    def blocking(self, room_id, check_in, check_out, user_id=None):
+        """Another user's live hold overlapping the stay, or None"""
+        holds = self.backend.for_rooms([room_id]).get(room_id, [])
+        return _blocking(holds, check_in.isoformat(), check_out.isoformat(), user_id)
+
+    def held_room_ids(self, room_ids, check_in, check_out, user_id=None):
+        """Rooms among room_ids held by other users for overlapping dates"""
+        check_in, check_out = check_in.isoformat(), check_out.isoformat()
+        return {
+            room_id
+            for room_id, holds in self.backend.for_rooms(room_ids).items()
+            if _blocking(holds, check_in, check_out, user_id) is not None
+        }
+
+    def held_stays(self, stays, user_id=None):
+        """
+        Rooms held by other users for any of many stays, in one lookup
+
+        Args:
+            stays: Dicts with room_id, check_in, check_out (dates)
+        """
+        holds = self.backend.for_rooms({stay['room_id'] for stay in stays})
+        return {
+            stay['room_id']
+            for stay in stays
+            if _blocking(holds.get(stay['room_id'], []), stay['check_in'].isoformat(),
+                         stay['check_out'].isoformat(), user_id) is not None
+        }
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+    @staticmethod
+    def to_dict(hold):
+        """Client-facing representation of a hold"""
+        data = {key: value for key, value in hold.items() if key != 'expires_at'}
+        data['total_price'] = float(hold['total_price'])
+        data['expires_at'] = datetime.utcfromtimestamp(hold['expires_at']).isoformat()
+        return data
+
+
+hold_store = HoldStore()
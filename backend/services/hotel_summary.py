@@ -0,0 +1,109 @@
+"""
+Maintenance of the materialized hotel_summary projection
+
+Summaries are recomputed set-based (DELETE + INSERT ... SELECT with one
+GROUP BY) for just the hotels touched by a write, or for every hotel on a
+full rebuild. Read paths never write: after the table is first deployed,
+backfill it with `flask rebuild-hotel-summary`.
+
+free_rooms_today is only recomputed when a hotel is touched, so it goes
+stale at midnight: run `flask rebuild-hotel-summary` once a day.
+"""
+from datetime import date, datetime
+
+from sqlalchemy import case, delete, func, insert, literal, select
+
+from database import db
+from models.booking import Booking
+from models.hotel import Hotel
+from models.hotel_summary import HotelSummary
+from models.room import Room
+
+# Keep IN (...) lists well under the SQL Server parameter limit
+HOTEL_ID_BATCH = 1000
+
+
+def _summary_select(hotel_ids=None):
+    """Aggregate rooms (and today's confirmed bookings) per hotel"""
+    today = date.today()
+    booked_today = select(Booking.room_id).where(
+        Booking.status == 'confirmed',
+        Booking.check_in_date <= today,
+        Booking.check_out_date > today
+    ).distinct().subquery()
+
+    available = Room.is_available == True  # noqa: E712
+    query = select(
+        Hotel.id,
+        func.min(Room.price_per_night),
+        func.max(Room.price_per_night),
+        func.count(Room.id),
+        func.coalesce(func.sum(case((available, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((available & booked_today.c.room_id.is_(None), 1), else_=0)), 0),
+        Hotel.rating,
+        literal(datetime.utcnow())
+    ).select_from(Hotel).outerjoin(
+        Room, Room.hotel_id == Hotel.id
+    ).outerjoin(
+        booked_today, booked_today.c.room_id == Room.id
+    ).group_by(Hotel.id, Hotel.rating)
+
+    if hotel_ids is not None:
+        query = query.where(Hotel.id.in_(hotel_ids))
+    return query
+
+
+def _replace(hotel_ids=None):
+    columns = ['hotel_id', 'min_price', 'max_price', 'room_count', 'available_room_count',
+               'free_rooms_today', 'rating', 'updated_at']
+
+    statement = delete(HotelSummary)
+    if hotel_ids is not None:
+        statement = statement.where(HotelSummary.hotel_id.in_(hotel_ids))
+    db.session.execute(statement)
+    db.session.execute(insert(HotelSummary).from_select(columns, _summary_select(hotel_ids)))
+
+
+def refresh_hotel_summaries(hotel_ids):
+    """
+    Recompute the summaries of the given hotels and commit
+
+    Failures are logged, not raised: the summary is a projection and the
+    next refresh or rebuild repairs it.
+
+    Returns:
+        True if the summaries were written
+    """
+    hotel_ids = sorted({hotel_id for hotel_id in hotel_ids if hotel_id is not None})
+    try:
+        for start in range(0, len(hotel_ids), HOTEL_ID_BATCH):
+            _replace(hotel_ids[start:start + HOTEL_ID_BATCH])
+        db.session.commit()
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"[v0] Hotel summary refresh error: {str(e)}")
+        return False
+
+
+def refresh_for_booking(booking):
+    """Refresh after a booking write, only if the stay covers today"""
+    refresh_for_bookings([booking])
+
+
+def refresh_for_bookings(bookings):
+    """Refresh the hotels of the bookings whose stay covers today, in one batch"""
+    today = date.today()
+    hotel_ids = {
+        booking.hotel_id for booking in bookings
+        if booking.check_in_date <= today < booking.check_out_date
+    }
+    if hotel_ids:
+        refresh_hotel_summaries(hotel_ids)
+
+
+def rebuild_hotel_summaries():
+    """Recompute every summary in one transaction (repair / daily rollover)"""
+    _replace()
+    db.session.commit()
+    return db.session.query(func.count(HotelSummary.hotel_id)).scalar()
@@ -0,0 +1,267 @@
+"""
+Idempotency-Key handling for HoteliaSEM write endpoints
+
+The outcome of a keyed request is stored in the idempotency_keys table (the
+source of truth, shared by all workers) and in a TTL cache for fast replays.
+Duplicates arriving while the first request runs are coalesced: in the same
+worker they wait for it and replay its response; in another worker they get
+409 until it completes.
+
+A claim is only leased for IDEMPOTENCY_CLAIM_LEASE seconds, so a key whose
+worker died mid-request (timeout, OOM kill) can be retried once the lease
+runs out; completed outcomes are kept for IDEMPOTENCY_KEY_TTL. Expired rows
+are purged by the lifecycle sweeper (purge_expired).
+"""
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import current_app, jsonify
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+
+from database import db
+from models.idempotency_key import IdempotencyKey
+from services.cache import MemoryCache, NullCache, RedisCache
+
+
+class IdempotencyStore:
+    """Claims, completes and replays idempotent requests"""
+
+    def __init__(self, app=None):
+        self.cache = NullCache()
+        self.ttl = 86400
+        self.lease = 60
+        self.wait_timeout = 10
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Select the replay cache from IDEMPOTENCY_CACHE_BACKEND"""
+        backend = app.config.get('IDEMPOTENCY_CACHE_BACKEND', 'memory')
+        self.ttl = app.config.get('IDEMPOTENCY_KEY_TTL', 86400)
+        self.lease = app.config.get('IDEMPOTENCY_CLAIM_LEASE', 60)
+        self.wait_timeout = app.config.get('IDEMPOTENCY_WAIT_TIMEOUT', 10)
+
+        if backend == 'memory':
+            self.cache = MemoryCache(app.config.get('IDEMPOTENCY_CACHE_MAX_ENTRIES', 10000))
+        elif backend == 'redis':
+            self.cache = RedisCache(app.config['CATALOG_CACHE_REDIS_URL'], prefix='hsem:idempotency:')
+        else:
+            self.cache = NullCache()
+
+        app.extensions['idempotency_store'] = self
+
+    # ------------------------------------------------------------------
+    # In-process coalescing
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _exclusive(self, cache_key):
+        """Hold the per-key lock of this worker; yields False on timeout"""
+        with self._lock:
+            entry = self._inflight.setdefault(cache_key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        acquired = entry[0].acquire(timeout=self.wait_timeout)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                entry[0].release()
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._inflight[cache_key]
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _lookup(self, cache_key, user_id, endpoint, key):
+        """Completed outcome from the cache, then the table"""
+        stored = self.cache.get(cache_key)
+        if stored is not None:
+            return stored
+
+        row = IdempotencyKey.query.filter_by(user_id=user_id, endpoint=endpoint, idem_key=key).first()
+        if row is None or row.expires_at <= datetime.utcnow():
+            return None
+        if row.status != 'completed':
+            return {'in_progress': True, 'fingerprint': row.fingerprint}
+
+        stored = {'fingerprint': row.fingerprint, 'status': row.response_status, 'body': row.response_body}
+        self.cache.set(cache_key, stored, self.ttl)
+        return stored
+
+    def _claim(self, user_id, endpoint, key, fingerprint):
+        """
+        Insert the in_progress row, leased for self.lease seconds
+
+        Returns:
+            False if another worker holds the key (a lapsed lease or an
+            expired outcome is taken over)
+        """
+        now = datetime.utcnow()
+        values = {
+            'user_id': user_id,
+            'endpoint': endpoint,
+            'idem_key': key,
+            'fingerprint': fingerprint,
+            'status': 'in_progress',
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=self.lease),
+        }
+        for _ in range(2):
+            try:
+                db.session.add(IdempotencyKey(**values))
+                db.session.commit()
+                return True
+            except IntegrityError:
+                db.session.rollback()
+                # Take the key over if the existing claim or outcome has expired
+                reclaimed = db.session.execute(delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id,
+                    IdempotencyKey.endpoint == endpoint,
+                    IdempotencyKey.idem_key == key,
+                    IdempotencyKey.expires_at <= now
+                ).execution_options(synchronize_session='fetch')).rowcount
+                db.session.commit()
+                if not reclaimed:
+                    return False
+        return False
+
+    def _complete(self, cache_key, user_id, endpoint, key, fingerprint, response):
+        """Store the outcome on our own claim (not one taken over after our lease lapsed)"""
+        body = response.get_data(as_text=True)
+        completed = db.session.execute(update(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.idem_key == key,
+            IdempotencyKey.status == 'in_progress',
+            IdempotencyKey.fingerprint == fingerprint
+        ).values(
+            status='completed',
+            response_status=response.status_code,
+            response_body=body,
+            expires_at=datetime.utcnow() + timedelta(seconds=self.ttl)
+        )).rowcount
+        db.session.commit()
+        if completed:
+            self.cache.set(cache_key, {'fingerprint': fingerprint, 'status': response.status_code, 'body': body}, self.ttl)
+
+    def _hold(self, user_id, endpoint, key, fingerprint):
+        """
+        Keep the claim of a request that ran but whose outcome could not be
+        stored, for the full key TTL: retries get 409 instead of running the
+        write a second time
+        """
+        try:
+            db.session.rollback()
+            db.session.execute(update(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.endpoint == endpoint,
+                IdempotencyKey.idem_key == key,
+                IdempotencyKey.status == 'in_progress',
+                IdempotencyKey.fingerprint == fingerprint
+            ).values(expires_at=datetime.utcnow() + timedelta(seconds=self.ttl)))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"[v0] Idempotency hold error: {str(e)}")
+
+    def _release(self, user_id, endpoint, key):
+        """Forget a claim whose request failed, so the client can retry"""
+        db.session.rollback()
+        db.session.execute(delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.endpoint == endpoint,
+            IdempotencyKey.idem_key == key,
+            IdempotencyKey.status == 'in_progress'
+        ))
+        db.session.commit()
+
+    def purge_expired(self, chunk_size=500):
+        """
+        Delete expired keys in chunks, one transaction each (app context required)
+
+        Returns:
+            Number of rows deleted
+        """
+        purged = 0
+        while True:
+            now = datetime.utcnow()
+            ids = db.session.execute(
+                select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(chunk_size)
+            ).scalars().all()
+            if not ids:
+                return purged
+            purged += db.session.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.id.in_(ids), IdempotencyKey.expires_at <= now
+            )).rowcount
+            db.session.commit()
+            if len(ids) < chunk_size:
+                return purged
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _replay(stored, fingerprint):
+        if stored['fingerprint'] != fingerprint:
+            return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+        if stored.get('in_progress'):
+            response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+            response.status_code = 409
+            response.headers['Retry-After'] = '1'
+            return response
+
+        response = current_app.response_class(stored['body'], status=stored['status'], mimetype='application/json')
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    def run(self, user_id, endpoint, key, fingerprint, execute):
+        """
+        Execute a request at most once per (user, endpoint, key)
+
+        Args:
+            fingerprint: Hash of the request body, to reject a reused key
+            execute: Callable returning the Flask response of the view
+
+        Responses with a 5xx status (or exceptions) release the key so the
+        request can be retried; any other response is stored and replayed.
+        If storing fails, the view's response is still returned and the
+        claim is held for the key TTL rather than released.
+        """
+        cache_key = f'{user_id}:{endpoint}:{key}'
+
+        with self._exclusive(cache_key) as acquired:
+            stored = self._lookup(cache_key, user_id, endpoint, key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            if not acquired or not self._claim(user_id, endpoint, key, fingerprint):
+                return self._replay({'in_progress': True, 'fingerprint': fingerprint}, fingerprint)
+
+            try:
+                response = execute()
+            except Exception:
+                self._release(user_id, endpoint, key)
+                raise
+
+            if response.status_code >= 500:
+                self._release(user_id, endpoint, key)
+            else:
+                try:
+                    self._complete(cache_key, user_id, endpoint, key, fingerprint, response)
+                except Exception as e:
+                    # The write is committed: never let the key be claimed again
+                    print(f"[v0] Idempotency complete error: {str(e)}")
+                    self._hold(user_id, endpoint, key, fingerprint)
+            return response
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,349 @@
+"""
+Booking lifecycle transitions for HoteliaSEM
+Batch sweeper for past stays and bulk admin status changes
+
+The sweeper moves confirmed bookings whose stay is over to their final status:
+
+- no-show (only with LIFECYCLE_NO_SHOW_ENABLED): check-in date passed (by
+  LIFECYCLE_NO_SHOW_AFTER_DAYS) with no completed payment transaction matched
+  to the booking. Off by default: payments are not recorded as transactions
+  by this API, so without them every booking would look unpaid.
+- completed: check-out date passed
+
+Each rule walks its rows in (date, id) order in chunks of
+LIFECYCLE_SWEEP_CHUNK_SIZE: one seek for the next chunk's ids, one UPDATE
+... WHERE id IN (...) AND status = 'confirmed', one executemany of audit
+entries and the new watermark, committed together. Chunks stay below SQL
+Server's lock escalation threshold and the sweeper pauses between them, so
+bookings is never locked for long. The watermark (job_watermarks) lets the
+next run start after the last processed row instead of rescanning; since
+bookings cannot be created with a past check-in, rows behind it never
+become eligible later.
+
+BookingSweeper runs also purge expired idempotency_keys rows.
+
+Admin bulk transitions (cancel / complete / no-show over up to
+BULK_STATUS_MAX_BOOKINGS ids) use the same set-based UPDATE per chunk of
+ID_BATCH ids, preceded by one SELECT per chunk that classifies every id.
+"""
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, exists, or_, select, update
+
+from database import db
+from models.booking import Booking
+from models.job_watermark import JobWatermark
+from models.transaction import Transaction
+from services.hotel_summary import refresh_for_bookings
+from services.idempotency import idempotency_store
+from services.occupancy import occupancy_engine
+from utils.auth_helpers import log_user_actions
+from utils.validators import ValidationError
+
+# Keep IN (...) lists well under the SQL Server parameter limit
+ID_BATCH = 1000
+
+# Admin bulk actions: action -> (new status, statuses it may be applied to)
+TRANSITIONS = {
+    'cancel': ('cancelled', ('confirmed',)),
+    'complete': ('completed', ('confirmed',)),
+    'no-show': ('no-show', ('confirmed',)),
+}
+
+
+def _unpaid():
+    """No completed payment transaction for the booking"""
+    return ~exists().where(
+        Transaction.booking_id == Booking.id,
+        Transaction.status == 'completed'
+    )
+
+
+# status, watermark job, date column, extra predicate
+SWEEP_RULES = (
+    ('no-show', 'bookings.no_show', Booking.check_in_date, _unpaid),
+    ('completed', 'bookings.complete', Booking.check_out_date, None),
+)
+
+
+def _apply_status(booking_ids, status, from_statuses, user_id, action):
+    """
+    Set-based status change with one audit entry per changed booking (not committed)
+
+    Only rows still in from_statuses are changed, so a concurrent writer
+    cannot be overwritten.
+
+    Returns:
+        Ids of the bookings that were changed
+    """
+    updated = db.session.execute(
+        update(Booking).where(
+            Booking.id.in_(booking_ids), Booking.status.in_(from_statuses)
+        ).values(status=status, updated_at=datetime.utcnow()).returning(Booking.id)
+    ).scalars().all()
+
+    log_user_actions([
+        {
+            'user_id': user_id,
+            'action': action,
+            'entity_type': 'booking',
+            'entity_id': booking_id,
+            'new_values': {'status': status},
+        }
+        for booking_id in updated
+    ])
+    return updated
+
+
+def _after_release(bookings):
+    """Resync projections once bookings stop occupying their rooms"""
+    if bookings:
+        refresh_for_bookings(bookings)
+        occupancy_engine.invalidate()
+
+
+def _load_watermark(job):
+    row = db.session.get(JobWatermark, job)
+    if row is None:
+        return None
+    day, booking_id = row.value.split(':')
+    return date.fromisoformat(day), int(booking_id)
+
+
+def _save_watermark(job, day, booking_id):
+    value = f'{day.isoformat()}:{booking_id}'
+    row = db.session.get(JobWatermark, job)
+    if row is None:
+        db.session.add(JobWatermark(job=job, value=value))
+    else:
+        row.value = value
+
+
+def _sweep_rule(status, job, column, predicate, cutoff, chunk_size, pause):
+    """
+    Apply one rule to every confirmed booking with column <= cutoff past the watermark
+
+    Returns:
+        Rows (id, hotel_id, room_id, check_in_date, check_out_date) that were updated
+    """
+    watermark = _load_watermark(job)
+    swept = []
+
+    while True:
+        query = select(
+            Booking.id, column, Booking.hotel_id, Booking.room_id, Booking.check_in_date, Booking.check_out_date
+        ).where(Booking.status == 'confirmed', column <= cutoff)
+        if predicate is not None:
+            query = query.where(predicate())
+        if watermark is not None:
+            last_day, last_id = watermark
+            query = query.where(or_(column > last_day, and_(column == last_day, Booking.id > last_id)))
+        rows = db.session.execute(query.order_by(column, Booking.id).limit(chunk_size)).all()
+        if not rows:
+            break
+
+        by_id = {row.id: row for row in rows}
+        updated = _apply_status(list(by_id), status, ('confirmed',), None, 'sweep')
+
+        watermark = (rows[-1][1], rows[-1].id)
+        _save_watermark(job, *watermark)
+        db.session.commit()
+        swept.extend(by_id[booking_id] for booking_id in updated)
+
+        if len(rows) < chunk_size:
+            break
+        time.sleep(pause)
+
+    return swept
+
+
+def sweep_bookings(today=None, chunk_size=500, pause=0.05, no_show=False, no_show_after_days=1):
+    """
+    Run the lifecycle rules once (app context required)
+
+    Args:
+        today: Reference date (default: today)
+        chunk_size: Bookings updated per transaction
+        pause: Seconds to sleep between chunks
+        no_show: Run the no-show rule (only meaningful where payments are
+            recorded as completed transactions)
+        no_show_after_days: Days after check-in before an unpaid booking is a no-show
+
+    Returns:
+        Dict of new status -> number of bookings moved
+    """
+    today = today or date.today()
+    cutoffs = {
+        'no-show': today - timedelta(days=no_show_after_days),
+        'completed': today - timedelta(days=1),
+    }
+
+    counts = {}
+    for status, job, column, predicate in SWEEP_RULES:
+        if status == 'no-show' and not no_show:
+            continue
+        try:
+            swept = _sweep_rule(status, job, column, predicate, cutoffs[status], chunk_size, pause)
+        except Exception:
+            db.session.rollback()
+            raise
+        counts[status] = len(swept)
+
+        if status == 'no-show':
+            # No-shows free the rest of their stay
+            _after_release(swept)
+
+    return counts
+
+
+def _matching_ids(filters, from_statuses, max_bookings):
+    """
+    Ids of bookings in from_statuses matching the filters, ordered by id
+
+    Raises:
+        ValidationError: If no filter has a value (it would match every booking)
+    """
+    criteria = {
+        'hotel_id': lambda value: Booking.hotel_id == value,
+        'room_id': lambda value: Booking.room_id == value,
+        'user_id': lambda value: Booking.user_id == value,
+        'check_in_from': lambda value: Booking.check_in_date >= value,
+        'check_in_to': lambda value: Booking.check_in_date <= value,
+        'created_from': lambda value: Booking.created_at >= value,
+        'created_to': lambda value: Booking.created_at < value,
+    }
+    conditions = [criterion(filters[name]) for name, criterion in criteria.items() if filters.get(name) is not None]
+    if not conditions:
+        raise ValidationError('filter needs at least one non-null criterion')
+
+    query = select(Booking.id).where(Booking.status.in_(from_statuses), *conditions)
+
+    booking_ids = db.session.execute(query.order_by(Booking.id).limit(max_bookings + 1)).scalars().all()
+    if len(booking_ids) > max_bookings:
+        raise ValidationError(f'More than {max_bookings} bookings match the filter; narrow it down')
+    return booking_ids
+
+
+def bulk_transition(action, user_id, booking_ids=None, filters=None, max_bookings=10000):
+    """
+    Apply an admin status action to many bookings
+
+    Ids are handled in chunks of ID_BATCH: one SELECT classifies the chunk,
+    one UPDATE changes the eligible rows and their audit entries are
+    inserted in one batch, committed per chunk.
+
+    Args:
+        action: Key of TRANSITIONS
+        user_id: Admin performing the action
+        booking_ids: Explicit ids, or
+        filters: Dict of hotel_id, room_id, user_id, check_in_from/to (dates),
+            created_from/to (datetimes) selecting bookings in an allowed status
+
+    Returns:
+        List of {'id', 'result', 'status'} in request order, result being
+        'updated', 'not_found' or 'invalid_transition'
+
+    Raises:
+        ValidationError: Unknown action, or too many bookings
+    """
+    if action not in TRANSITIONS:
+        raise ValidationError(f"action must be one of: {', '.join(TRANSITIONS)}")
+    status, from_statuses = TRANSITIONS[action]
+
+    if filters is not None:
+        booking_ids = _matching_ids(filters, from_statuses, max_bookings)
+    booking_ids = list(dict.fromkeys(booking_ids))
+    if len(booking_ids) > max_bookings:
+        raise ValidationError(f'At most {max_bookings} bookings can be changed at once')
+
+    results = []
+    released = []
+    for start in range(0, len(booking_ids), ID_BATCH):
+        chunk = booking_ids[start:start + ID_BATCH]
+        current = {
+            row.id: row for row in db.session.execute(select(
+                Booking.id, Booking.status, Booking.hotel_id, Booking.check_in_date, Booking.check_out_date
+            ).where(Booking.id.in_(chunk)))
+        }
+
+        eligible = [booking_id for booking_id in chunk
+                    if booking_id in current and current[booking_id].status in from_statuses]
+        try:
+            updated = set(_apply_status(eligible, status, from_statuses, user_id, action)) if eligible else set()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        for booking_id in chunk:
+            if booking_id not in current:
+                results.append({'id': booking_id, 'result': 'not_found', 'status': None})
+            elif booking_id in updated:
+                results.append({'id': booking_id, 'result': 'updated', 'status': status})
+            else:
+                results.append({'id': booking_id, 'result': 'invalid_transition',
+                                'status': current[booking_id].status})
+        released.extend(current[booking_id] for booking_id in updated)
+
+    if status in ('cancelled', 'no-show'):
+        _after_release(released)
+
+    return results
+
+
+class BookingSweeper:
+    """Optional in-process thread running sweep_bookings periodically"""
+
+    def __init__(self, app=None):
+        self.interval = 3600
+        self._thread = None
+        self._stop = threading.Event()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Start the sweeper thread when LIFECYCLE_SWEEPER_ENABLED is set"""
+        self.interval = app.config.get('LIFECYCLE_SWEEP_INTERVAL', 3600)
+        app.extensions['booking_sweeper'] = self
+
+        if app.config.get('LIFECYCLE_SWEEPER_ENABLED', False) and self._thread is None:
+            self._thread = threading.Thread(target=self._run, args=(app,), name='booking-sweeper', daemon=True)
+            self._thread.start()
+
+    def run_once(self, app):
+        """One sweep with the app's settings, then a purge of expired idempotency keys"""
+        chunk_size = app.config.get('LIFECYCLE_SWEEP_CHUNK_SIZE', 500)
+        with app.app_context():
+            try:
+                counts = sweep_bookings(
+                    chunk_size=chunk_size,
+                    pause=app.config.get('LIFECYCLE_SWEEP_PAUSE', 0.05),
+                    no_show=app.config.get('LIFECYCLE_NO_SHOW_ENABLED', False),
+                    no_show_after_days=app.config.get('LIFECYCLE_NO_SHOW_AFTER_DAYS', 1)
+                )
+                counts['expired_idempotency_keys'] = idempotency_store.purge_expired(chunk_size)
+                return counts
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def _run(self, app):
+        while not self._stop.is_set():
+            try:
+                counts = self.run_once(app)
+                if any(counts.values()):
+                    print(f"[v0] Booking sweep: {counts}")
+            except Exception as e:
+                print(f"[v0] Booking sweep error: {str(e)}")
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+booking_sweeper = BookingSweeper()
@@ -0,0 +1,252 @@
+"""
+Write-behind login bookkeeping for HoteliaSEM
+Batches users.last_login_at updates and login audit rows
+
+A login used to commit twice (last_login_at, then its audit row). Logins
+are recorded here instead and written by LOGIN_WRITE_MODE:
+
+- buffered: a background thread flushes every LOGIN_FLUSH_INTERVAL seconds
+  (sooner once LOGIN_FLUSH_BATCH_SIZE logins are pending). One transaction
+  per flush: one executemany UPDATE of last_login_at per user (repeated
+  logins of a user coalesce into the latest) and one executemany INSERT of
+  the audit rows. Logins not yet flushed are lost if the process crashes;
+  they are flushed on normal shutdown.
+- immediate: both are written in the login request, in one commit.
+
+IP addresses and user agents are cut to their column sizes when recorded.
+If the database still rejects a batch because of its data (DataError,
+IntegrityError), it is written again row by row and only the rejected rows
+are dropped (and logged), so one bad row cannot stall every later flush.
+Any other failure (e.g. the database is unreachable) keeps the flush's
+logins for the next one, up to LOGIN_BUFFER_MAX_PENDING pending audit rows
+(the oldest are dropped). In immediate mode a failed write is logged and
+the login still succeeds.
+"""
+import atexit
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import DataError, IntegrityError
+
+from database import db
+from models.audit_log import AuditLog
+from models.user import User
+
+IP_ADDRESS_LENGTH = AuditLog.__table__.c.ip_address.type.length
+USER_AGENT_LENGTH = AuditLog.__table__.c.user_agent.type.length
+
+
+def _clip(value, length):
+    return value[:length] if isinstance(value, str) else value
+
+
+def write_logins(last_logins, audit_rows):
+    """
+    Write last_login_at per user and the login audit rows in one transaction
+
+    Args:
+        last_logins: Dict of user_id -> login datetime
+        audit_rows: List of AuditLog.log_actions() entries
+    """
+    try:
+        if last_logins:
+            db.session.execute(
+                update(User.__table__).where(User.__table__.c.id == bindparam('user_id')).values(
+                    last_login_at=bindparam('login_at')
+                ),
+                [{'user_id': user_id, 'login_at': login_at} for user_id, login_at in last_logins.items()]
+            )
+        AuditLog.log_actions(audit_rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def write_logins_by_row(last_logins, audit_rows):
+    """
+    Slow path after a rejected batch: one savepoint per row, in one transaction
+
+    Rows the database rejects (DataError, IntegrityError) are logged and
+    skipped; any other error is raised.
+
+    Returns:
+        Number of rows skipped
+    """
+    user_table = User.__table__
+    rejected = 0
+    try:
+        for user_id, login_at in last_logins.items():
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(
+                        update(user_table).where(user_table.c.id == user_id).values(last_login_at=login_at)
+                    )
+            except (DataError, IntegrityError) as e:
+                rejected += 1
+                print(f"[v0] Login buffer dropped last_login_at of user {user_id}: {str(e)}")
+
+        for row in audit_rows:
+            try:
+                with db.session.begin_nested():
+                    AuditLog.log_actions([row])
+            except (DataError, IntegrityError) as e:
+                rejected += 1
+                print(f"[v0] Login buffer dropped audit row of user {row['user_id']}: {str(e)}")
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return rejected
+
+
+class LoginBuffer:
+    """Records logins and writes them behind in batches"""
+
+    def __init__(self, app=None):
+        self.mode = 'buffered'
+        self.interval = 2
+        self.batch_size = 500
+        self.max_pending = 50000
+        self._app = None
+        self._last_logins = {}  # user_id -> latest login datetime
+        self._audit_rows = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.dropped = 0
+        self.rejected = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the write mode and flush settings from the app config"""
+        self.mode = app.config.get('LOGIN_WRITE_MODE', 'buffered')
+        self.interval = app.config.get('LOGIN_FLUSH_INTERVAL', 2)
+        self.batch_size = app.config.get('LOGIN_FLUSH_BATCH_SIZE', 500)
+        self.max_pending = app.config.get('LOGIN_BUFFER_MAX_PENDING', 50000)
+        self._app = app
+        app.extensions['login_buffer'] = self
+
+    def record(self, user_id, ip_address=None, user_agent=None, login_at=None):
+        """
+        Record a successful login (last_login_at and its audit row)
+
+        Returns:
+            The login datetime
+        """
+        login_at = login_at or datetime.utcnow()
+        row = {
+            'user_id': user_id,
+            'action': 'login',
+            'entity_type': 'user',
+            'entity_id': user_id,
+            # Client-controlled (X-Forwarded-For, User-Agent): must fit the columns
+            'ip_address': _clip(ip_address, IP_ADDRESS_LENGTH),
+            'user_agent': _clip(user_agent, USER_AGENT_LENGTH),
+            'created_at': login_at,
+        }
+
+        if self.mode == 'immediate':
+            try:
+                try:
+                    write_logins({user_id: login_at}, [row])
+                except (DataError, IntegrityError):
+                    self.rejected += write_logins_by_row({user_id: login_at}, [row])
+            except Exception as e:
+                # Bookkeeping must not fail the login
+                print(f"[v0] Login bookkeeping error: {str(e)}")
+            return login_at
+
+        with self._lock:
+            if self._last_logins.get(user_id, login_at) <= login_at:
+                self._last_logins[user_id] = login_at
+            self._audit_rows.append(row)
+            pending = len(self._audit_rows)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wake.set()
+        return login_at
+
+    def _ensure_thread(self):
+        # Started on first use, and again in a forked worker
+        if self._thread is None or self._pid != os.getpid():
+            with self._lock:
+                if self._thread is None or self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._run, name='login-buffer', daemon=True)
+                    self._thread.start()
+                    atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[v0] Login buffer flush error: {str(e)}")
+
+    def flush(self):
+        """
+        Write every pending login now
+
+        Returns:
+            Number of audit rows flushed (including rejected ones)
+        """
+        with self._flush_lock:
+            with self._lock:
+                last_logins, self._last_logins = self._last_logins, {}
+                audit_rows, self._audit_rows = self._audit_rows, []
+            if not audit_rows:
+                return 0
+
+            try:
+                with self._app.app_context():
+                    try:
+                        try:
+                            write_logins(last_logins, audit_rows)
+                        except (DataError, IntegrityError):
+                            # A row the database rejects must not hold back the batch
+                            self.rejected += write_logins_by_row(last_logins, audit_rows)
+                    finally:
+                        db.session.remove()
+            except Exception:
+                self._requeue(last_logins, audit_rows)
+                raise
+
+            self.flushes += 1
+            return len(audit_rows)
+
+    def _requeue(self, last_logins, audit_rows):
+        """Put the logins of a failed flush back in front of the newer ones"""
+        with self._lock:
+            for user_id, login_at in last_logins.items():
+                if self._last_logins.get(user_id, login_at) <= login_at:
+                    self._last_logins[user_id] = login_at
+            self._audit_rows[:0] = audit_rows
+            overflow = len(self._audit_rows) - self.max_pending
+            if overflow > 0:
+                del self._audit_rows[:overflow]
+                self.dropped += overflow
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': self.mode,
+                'pending_logins': len(self._audit_rows),
+                'pending_users': len(self._last_logins),
+                'flushes': self.flushes,
+                'dropped': self.dropped,
+                'rejected': self.rejected,
+            }
+
+
+login_buffer = LoginBuffer()
@@ -0,0 +1,241 @@
+"""
+Login throttling for HoteliaSEM
+Sliding-window limits on login attempts per email and per client IP
+
+Every login attempt is counted against its email (MAX_LOGIN_ATTEMPTS) and
+its client IP (LOGIN_IP_MAX_ATTEMPTS) over LOCKOUT_DURATION, before the user
+is looked up or a password hashed, so throttled credential stuffing costs
+one dictionary lookup. A successful login clears its email's count and
+gives its attempt back to the IP.
+
+Each key holds two counters (current and previous fixed window); the
+sliding count is previous * (share of the previous window still covered) +
+current. That is O(1) time and memory per key.
+
+Backends:
+- memory: per-process, at most LOGIN_LIMITER_MAX_KEYS keys (least recently
+  used evicted first)
+- redis: shared across gunicorn workers (requires the redis package)
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+def _sliding_count(previous, current, elapsed, window):
+    return previous * (1 - elapsed / window) + current
+
+
+def _retry_after(previous, current, elapsed, window, limit):
+    """Seconds until the sliding count drops below limit again"""
+    if current >= limit:
+        # Wait for the next window, then for the current count to fade
+        return (window - elapsed) + window * (1 - limit / current)
+    if previous:
+        return max(0.0, window * (1 - (limit - current) / previous) - elapsed)
+    return 0.0
+
+
+class MemoryLimiter:
+    """Thread-safe in-process sliding-window counters"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._keys = OrderedDict()  # key -> [window index, current, previous]
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _entry(self, key, index):
+        entry = self._keys.get(key)
+        if entry is None:
+            entry = self._keys[key] = [index, 0, 0]
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+                self.evictions += 1
+        elif entry[0] != index:
+            # Roll the windows forward
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[1] = 0
+            entry[0] = index
+        self._keys.move_to_end(key)
+        return entry
+
+    def hit(self, limits, window):
+        """
+        Count one attempt against every key unless one of them is over its limit
+
+        Args:
+            limits: Dict of key -> limit
+
+        Returns:
+            Seconds to wait if throttled, else None
+        """
+        now = time.time()
+        index, elapsed = divmod(now, window)
+        with self._lock:
+            entries = {key: self._entry(key, int(index)) for key in limits}
+            waits = [
+                _retry_after(entry[2], entry[1], elapsed, window, limits[key])
+                for key, entry in entries.items()
+                if _sliding_count(entry[2], entry[1], elapsed, window) >= limits[key]
+            ]
+            if waits:
+                return max(waits)
+            for entry in entries.values():
+                entry[1] += 1
+            return None
+
+    def reset(self, key, window):
+        with self._lock:
+            self._keys.pop(key, None)
+
+    def refund(self, key, window):
+        with self._lock:
+            entry = self._keys.get(key)
+            if entry is not None and entry[0] == int(time.time() // window) and entry[1]:
+                entry[1] -= 1
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'keys': len(self._keys),
+                'max_keys': self.max_keys,
+                'evictions': self.evictions,
+            }
+
+
+# KEYS: current and previous window counters per key (2 per key)
+# ARGV: elapsed share of the window, window seconds, then one limit per key
+HIT_SCRIPT = """
+local share = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local blocked = 0
+for i = 1, #KEYS, 2 do
+    local current = tonumber(redis.call('GET', KEYS[i]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i + 1]) or '0')
+    if previous * (1 - share) + current >= tonumber(ARGV[2 + (i + 1) / 2]) then
+        blocked = 1
+    end
+end
+if blocked == 1 then
+    return 0
+end
+for i = 1, #KEYS, 2 do
+    redis.call('INCR', KEYS[i])
+    redis.call('EXPIRE', KEYS[i], math.ceil(window * 2))
+end
+return 1
+"""
+
+
+class RedisLimiter:
+    """
+    Sliding-window counters shared by all workers through Redis
+
+    One counter key per key and window, expiring after two windows; a hit is
+    one Lua script call, so concurrent attempts cannot overshoot the limit.
+    """
+
+    def __init__(self, url, prefix='hsem:login:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for LOGIN_LIMITER_BACKEND='redis'")
+
+        self._client = redis.Redis.from_url(url)
+        self._hit = self._client.register_script(HIT_SCRIPT)
+        self.prefix = prefix
+
+    def _key(self, key, index):
+        return f'{self.prefix}{key}:{index}'
+
+    def hit(self, limits, window):
+        now = time.time()
+        index, elapsed = divmod(now, window)
+        index = int(index)
+        keys = [name for key in limits for name in (self._key(key, index), self._key(key, index - 1))]
+        if self._hit(keys=keys, args=[elapsed / window, window, *limits.values()]):
+            return None
+
+        counts = [int(value or 0) for value in self._client.mget(keys)]
+        return max(
+            _retry_after(counts[i + 1], counts[i], elapsed, window, limit)
+            for i, limit in zip(range(0, len(counts), 2), limits.values())
+        )
+
+    def reset(self, key, window):
+        index = int(time.time() // window)
+        self._client.delete(self._key(key, index), self._key(key, index - 1))
+
+    def refund(self, key, window):
+        name = self._key(key, int(time.time() // window))
+        if int(self._client.get(name) or 0) > 0:
+            self._client.decr(name)
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+class LoginLimiter:
+    """Throttles login attempts by email and client IP"""
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.backend = MemoryLimiter()
+        self.window = 900
+        self.email_limit = 5
+        self.ip_limit = 50
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the limits and select the backend from the app config"""
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        self.window = app.config['LOCKOUT_DURATION'].total_seconds()
+        self.email_limit = app.config.get('MAX_LOGIN_ATTEMPTS', 5)
+        self.ip_limit = app.config.get('LOGIN_IP_MAX_ATTEMPTS', 50)
+
+        if app.config.get('LOGIN_LIMITER_BACKEND', 'memory') == 'redis':
+            self.backend = RedisLimiter(app.config['CATALOG_CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryLimiter(app.config.get('LOGIN_LIMITER_MAX_KEYS', 100000))
+
+        app.extensions['login_limiter'] = self
+
+    def attempt(self, email, ip_address):
+        """
+        Record a login attempt
+
+        Returns:
+            Seconds (int) to wait before retrying if throttled, else None
+        """
+        if not self.enabled:
+            return None
+        wait = self.backend.hit({f'email:{email}': self.email_limit, f'ip:{ip_address}': self.ip_limit}, self.window)
+        return None if wait is None else max(1, math.ceil(wait))
+
+    def succeeded(self, email, ip_address):
+        """Clear the email's attempts and give the IP its attempt back"""
+        if self.enabled:
+            self.backend.reset(f'email:{email}', self.window)
+            self.backend.refund(f'ip:{ip_address}', self.window)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+
+login_limiter = LoginLimiter()
@@ -0,0 +1,317 @@
+"""
+In-process room occupancy engine for HoteliaSEM
+
+Keeps one packed bit array per room covering the next N days (bit set =
+night occupied by a confirmed booking). Availability for [check_in,
+check_out) is answered for many rooms at once with vectorized bitwise ops.
+
+The engine is an optional read accelerator: each worker holds its own copy,
+updated incrementally by the booking routes of that worker and fully rebuilt
+once it is older than AVAILABILITY_ENGINE_MAX_AGE. Writes are always checked
+against the database.
+"""
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+from database import db
+from models.booking import Booking
+from models.hotel import Hotel
+from models.room import Room
+
+
+class OccupancyEngine:
+    """Per-room occupancy bitmaps with vectorized range queries"""
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.horizon_days = 365
+        self.max_age = 300
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._reset()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read engine settings from the app config"""
+        self.enabled = app.config.get('AVAILABILITY_ENGINE_ENABLED', False)
+        self.horizon_days = app.config.get('AVAILABILITY_ENGINE_HORIZON_DAYS', 365)
+        self.max_age = app.config.get('AVAILABILITY_ENGINE_MAX_AGE', 300)
+        app.extensions['occupancy_engine'] = self
+
+    def _reset(self):
+        self.origin = None
+        self.built_at = None
+        self._bits = np.zeros((0, 0), dtype=np.uint8)
+        self._room_ids = np.zeros(0, dtype=np.int64)
+        self._max_guests = np.zeros(0, dtype=np.int16)
+        self._rows = {}
+        self._city_rows = {}
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self):
+        """Load rooms and confirmed bookings from the database (app context required)"""
+        origin = date.today()
+        rooms = db.session.query(Room.id, Room.max_guests, Hotel.city).join(
+            Hotel, Hotel.id == Room.hotel_id
+        ).order_by(Room.id).all()
+
+        room_ids = np.array([r.id for r in rooms], dtype=np.int64)
+        rows = {room_id: i for i, room_id in enumerate(room_ids.tolist())}
+        bits = self._load_bits(rows, origin)
+
+        city_rows = {}
+        for i, room in enumerate(rooms):
+            city_rows.setdefault(room.city.strip().lower(), []).append(i)
+
+        with self._lock:
+            self.origin = origin
+            self.built_at = time.monotonic()
+            self._bits = bits
+            self._room_ids = room_ids
+            self._max_guests = np.array([r.max_guests for r in rooms], dtype=np.int16)
+            self._rows = rows
+            self._city_rows = {city: np.array(idx, dtype=np.int64) for city, idx in city_rows.items()}
+
+    def _load_bits(self, rows, origin):
+        """Build the packed bitmap with a difference array over all bookings"""
+        horizon_end = origin + timedelta(days=self.horizon_days)
+        bookings = db.session.query(
+            Booking.room_id, Booking.check_in_date, Booking.check_out_date
+        ).filter(
+            Booking.status == 'confirmed',
+            Booking.check_out_date > origin,
+            Booking.check_in_date < horizon_end
+        ).all()
+
+        diff = np.zeros((len(rows), self.horizon_days + 1), dtype=np.int32)
+        if bookings:
+            room_rows = np.array([rows.get(b.room_id, -1) for b in bookings], dtype=np.int64)
+            starts = np.array([(b.check_in_date - origin).days for b in bookings], dtype=np.int64)
+            ends = np.array([(b.check_out_date - origin).days for b in bookings], dtype=np.int64)
+
+            known = room_rows >= 0
+            room_rows = room_rows[known]
+            starts = np.clip(starts[known], 0, self.horizon_days)
+            ends = np.clip(ends[known], 0, self.horizon_days)
+
+            np.add.at(diff, (room_rows, starts), 1)
+            np.add.at(diff, (room_rows, ends), -1)
+
+        occupied = np.cumsum(diff[:, :self.horizon_days], axis=1) > 0
+        return np.packbits(occupied, axis=1)
+
+    def invalidate(self):
+        """Force a full rebuild on next use (e.g. after bulk room changes)"""
+        self.built_at = None
+
+    def _stale(self):
+        built_at = self.built_at
+        return (
+            built_at is None
+            or self.origin != date.today()
+            or time.monotonic() - built_at > self.max_age
+        )
+
+    def ensure_ready(self):
+        """
+        Build on first use and rebuild once the snapshot is stale or the day rolled over
+
+        One request builds while concurrent ones wait for it, instead of
+        each scanning rooms and bookings.
+        """
+        if not self.enabled:
+            return False
+
+        if self._stale():
+            with self._build_lock:
+                if self._stale():
+                    self.build()
+        return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _range_mask(self, check_in, check_out):
+        """Packed mask for [check_in, check_out), or None if outside the horizon"""
+        if self.origin is None:
+            return None
+
+        start = (check_in - self.origin).days
+        end = (check_out - self.origin).days
+        if start < 0 or end > self.horizon_days or end <= start:
+            return None
+
+        mask = np.zeros(self.horizon_days, dtype=bool)
+        mask[start:end] = True
+        return np.packbits(mask)
+
+    def covers(self, check_in, check_out):
+        """Whether the engine can answer for this date range"""
+        return self.ensure_ready() and self._range_mask(check_in, check_out) is not None
+
+    def free_mask(self, room_ids, check_in, check_out):
+        """
+        Vectorized availability for a list of rooms
+
+        Returns:
+            Boolean numpy array aligned with room_ids (unknown rooms are False),
+            or None if the range is outside the horizon
+        """
+        mask = self._range_mask(check_in, check_out)
+        if mask is None:
+            return None
+
+        with self._lock:
+            rows = np.array([self._rows.get(room_id, -1) for room_id in room_ids], dtype=np.int64)
+            known = rows >= 0
+            free = np.zeros(len(rows), dtype=bool)
+            free[known] = ~(self._bits[rows[known]] & mask).any(axis=1)
+        return free
+
+    def free_room_ids(self, check_in, check_out, city=None, guests=1):
+        """
+        Ids of rooms free for the whole stay, optionally restricted to a city
+
+        Hotel approval and room is_available flags are not tracked here and
+        must be applied by the caller.
+        """
+        mask = self._range_mask(check_in, check_out)
+        if mask is None:
+            return None
+
+        with self._lock:
+            if city:
+                rows = self._city_rows.get(city.strip().lower(), np.zeros(0, dtype=np.int64))
+            else:
+                rows = np.arange(len(self._room_ids))
+            rows = rows[self._max_guests[rows] >= guests]
+            free = ~(self._bits[rows] & mask).any(axis=1)
+            return self._room_ids[rows[free]]
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def _row_for(self, room_id):
+        """Row of a room, appending an empty bitmap for rooms created after build"""
+        row = self._rows.get(room_id)
+        if row is not None:
+            return row
+
+        room = db.session.query(Room.id, Room.max_guests, Hotel.city).join(
+            Hotel, Hotel.id == Room.hotel_id
+        ).filter(Room.id == room_id).first()
+        if room is None:
+            return None
+
+        row = len(self._room_ids)
+        self._bits = np.vstack([self._bits, np.zeros((1, self._bits.shape[1]), dtype=np.uint8)])
+        self._room_ids = np.append(self._room_ids, room.id)
+        self._max_guests = np.append(self._max_guests, room.max_guests)
+        self._rows[room.id] = row
+        city = room.city.strip().lower()
+        self._city_rows[city] = np.append(self._city_rows.get(city, np.zeros(0, dtype=np.int64)), row)
+        return row
+
+    def mark_booked(self, booking):
+        """Set the nights of a newly confirmed booking"""
+        if not self.enabled or self.origin is None:
+            return
+
+        with self._lock:
+            mask = self._clipped_mask(booking.check_in_date, booking.check_out_date)
+            row = self._row_for(booking.room_id)
+            if mask is not None and row is not None:
+                self._bits[row] |= mask
+
+    def release(self, booking):
+        """Clear the nights of a cancelled booking, keeping other confirmed bookings"""
+        if not self.enabled or self.origin is None:
+            return
+
+        with self._lock:
+            mask = self._clipped_mask(booking.check_in_date, booking.check_out_date)
+            row = self._rows.get(booking.room_id)
+            if mask is None or row is None:
+                return
+
+            self._bits[row] &= ~mask
+
+            # Re-apply any other confirmed booking sharing those nights
+            others = db.session.query(Booking.check_in_date, Booking.check_out_date).filter(
+                Booking.room_id == booking.room_id,
+                Booking.id != booking.id,
+                Booking.status == 'confirmed',
+                Booking.check_in_date < booking.check_out_date,
+                Booking.check_out_date > booking.check_in_date
+            ).all()
+            for other in others:
+                other_mask = self._clipped_mask(other.check_in_date, other.check_out_date)
+                if other_mask is not None:
+                    self._bits[row] |= other_mask
+
+    def _clipped_mask(self, check_in, check_out):
+        """Packed mask for a booking clipped to the horizon, or None if disjoint"""
+        horizon_end = self.origin + timedelta(days=self.horizon_days)
+        check_in = max(check_in, self.origin)
+        check_out = min(check_out, horizon_end)
+        if check_out <= check_in:
+            return None
+        return self._range_mask(check_in, check_out)
+
+    # ------------------------------------------------------------------
+    # Diagnostics
+    # ------------------------------------------------------------------
+
+    def verify(self):
+        """
+        Compare the in-memory bitmaps with a fresh load from the database
+
+        Returns:
+            Dict with the number of rooms checked and the ids of mismatching rooms
+        """
+        with self._lock:
+            if self.origin is None:
+                return {'checked': 0, 'mismatched_room_ids': []}
+            expected = self._load_bits(self._rows, self.origin)
+            mismatched = np.nonzero((expected != self._bits).any(axis=1))[0]
+            return {
+                'checked': len(self._room_ids),
+                'mismatched_room_ids': self._room_ids[mismatched].tolist(),
+            }
+
+    def memory_report(self):
+        """Memory used by the engine, for sizing workers"""
+        with self._lock:
+            bitmap_bytes = self._bits.nbytes
+            array_bytes = (
+                self._room_ids.nbytes
+                + self._max_guests.nbytes
+                + sum(rows.nbytes for rows in self._city_rows.values())
+            )
+            # Dict of room id -> row: table plus one boxed int key/value per room
+            index_bytes = sys.getsizeof(self._rows) + len(self._rows) * 2 * 28
+
+            return {
+                'enabled': self.enabled,
+                'origin': self.origin.isoformat() if self.origin else None,
+                'horizon_days': self.horizon_days,
+                'rooms': len(self._room_ids),
+                'bytes_per_room': self._bits.shape[1] if self._bits.ndim == 2 else 0,
+                'bitmap_bytes': bitmap_bytes,
+                'index_bytes': array_bytes + index_bytes,
+                'total_bytes': bitmap_bytes + array_bytes + index_bytes,
+            }
+
+
+occupancy_engine = OccupancyEngine()
@@ -0,0 +1,175 @@
+"""
+Password hashing for HoteliaSEM
+bcrypt hashing and verification on a bounded process pool
+
+bcrypt is CPU-bound by design: run on the request thread, a burst of logins
+pins every web worker and cheap catalog reads queue behind them. Hashes are
+computed instead by PASSWORD_HASH_WORKERS processes, started on first use in
+each web worker from a forkserver (spawn where unavailable): forking a
+threaded web worker could copy a lock held by another thread into the pool
+process. At most PASSWORD_HASH_MAX_QUEUE operations may be running or
+waiting per web worker, each holding its slot until the pool is done with
+it; past that, callers get PasswordHasherBusy at once (a 503 for the client)
+rather than queueing. An operation not finished within PASSWORD_HASH_TIMEOUT
+also raises PasswordHasherBusy. PASSWORD_HASH_WORKERS = 0 hashes on the
+request thread.
+
+The cost factor is BCRYPT_LOG_ROUNDS (per environment). Hashes made with
+another cost still verify, and are upgraded on the next successful login
+(needs_rehash).
+
+Hashes are compatible with Flask-Bcrypt (same prefix, rounds and
+BCRYPT_HANDLE_LONG_PASSWORDS pre-hashing).
+"""
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Too many password hashes are queued in this worker"""
+    pass
+
+
+def _prepare(password, prehash):
+    password = password.encode('utf-8')
+    if prehash:
+        password = hashlib.sha256(password).hexdigest().encode('utf-8')
+    return password
+
+
+def _hash(password, rounds, prehash):
+    """Hash a password (runs in a pool process)"""
+    salt = bcrypt.gensalt(rounds=rounds, prefix=b'2b')
+    return bcrypt.hashpw(_prepare(password, prehash), salt).decode('utf-8')
+
+
+def _check(pw_hash, password, prehash):
+    """Verify a password against its hash (runs in a pool process)"""
+    pw_hash = pw_hash.encode('utf-8')
+    return hmac.compare_digest(bcrypt.hashpw(_prepare(password, prehash), pw_hash), pw_hash)
+
+
+def hash_rounds(pw_hash):
+    """Cost factor of a bcrypt hash ($2b$<rounds>$...)"""
+    return int(pw_hash.split('$')[2])
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded process pool"""
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.prehash = False
+        self.workers = 2
+        self.max_queue = 64
+        self.timeout = 30
+        self._pool = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the cost factor and pool settings from the app config"""
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prehash = app.config.get('BCRYPT_HANDLE_LONG_PASSWORDS', False)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 64)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 30)
+        self._slots = threading.BoundedSemaphore(self.max_queue)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def _executor(self):
+        with self._lock:
+            # A pool inherited from a parent process (preloaded app) is not usable
+            if self._pool is None or self._pid != os.getpid():
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _submit(self, fn, *args):
+        """Submit on a queue slot, released only once the pool is done with the task"""
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            self.rejected += 1
+            raise PasswordHasherBusy('Too many password operations in progress')
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            # Drop it if still queued; a running hash keeps its slot until done
+            future.cancel()
+            raise PasswordHasherBusy('Password operation timed out')
+
+    def _run(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        try:
+            return self._result(self._submit(fn, *args))
+        except BrokenProcessPool:
+            # A pool process died: start a new pool and retry once
+            self.shutdown()
+            return self._result(self._submit(fn, *args))
+
+    def hash(self, password):
+        """
+        Hash a password with the configured cost factor
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        if not password:
+            raise ValueError('Password must be non-empty.')
+        return self._run(_hash, password, self.rounds, self.prehash)
+
+    def check(self, pw_hash, password):
+        """
+        Verify a password against a hash
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        return self._run(_check, pw_hash, password, self.prehash)
+
+    def needs_rehash(self, pw_hash):
+        """Whether the hash was made with another cost factor"""
+        return hash_rounds(pw_hash) != self.rounds
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'rounds': self.rounds,
+            'max_queue': self.max_queue,
+            'rejected': self.rejected,
+        }
+
+
+password_hasher = PasswordHasher()
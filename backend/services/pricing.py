@@ -0,0 +1,248 @@
+"""
+Nightly-rate pricing engine for HoteliaSEM
+
+A hotel's rate rules (models.rate_rule) are compiled into a dense int64
+array of prices in cents, one row per distinct room pricing (rooms of the
+same type and base price share a row) and one column per night from today
+over RATE_CALENDAR_HORIZON_DAYS. Length-of-stay rules get one extra
+array per distinct min_nights threshold, so every stay length maps to one
+array. The price of a stay is then a slice sum over its nights, for any
+number of rooms at once.
+
+Compiled calendars are cached per worker and shared by search, quotes,
+holds and bookings. They are recompiled after a rule change in this worker,
+when the day rolls over, once older than RATE_CALENDAR_MAX_AGE (rule
+changes made through another worker), or when a room is missing.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from database import db
+from models.rate_rule import RateRule
+from models.room import Room
+
+
+class RateCalendar:
+    """Compiled nightly prices of one hotel's rooms over a date window"""
+
+    def __init__(self, origin, days, rows, thresholds, prices):
+        self.origin = origin
+        self.days = days
+        self.rows = rows  # room_id -> price row (rooms priced alike share one)
+        self.thresholds = thresholds  # ascending min_nights, starting at 1
+        self.prices = prices  # one (price rows x days) cents array per threshold
+        self.built_at = time.monotonic()
+
+    def totals(self, room_ids, check_in, check_out):
+        """Stay totals in cents for room_ids (all present in the calendar)"""
+        start = (check_in - self.origin).days
+        end = (check_out - self.origin).days
+        prices = self.prices[bisect_right(self.thresholds, end - start) - 1]
+        rows = np.fromiter((self.rows[room_id] for room_id in room_ids), dtype=np.int64, count=len(room_ids))
+        return prices[rows, start:end].sum(axis=1)
+
+    def nightly(self, room_id, check_in, check_out):
+        """Per-night prices in cents of one room for a stay"""
+        start = (check_in - self.origin).days
+        end = (check_out - self.origin).days
+        prices = self.prices[bisect_right(self.thresholds, end - start) - 1]
+        return prices[self.rows[room_id], start:end]
+
+
+def _room_mask(rule, room_ids, room_types):
+    if rule.room_id is not None:
+        return room_ids == rule.room_id
+    if rule.room_type is not None:
+        return room_types == rule.room_type
+    return np.ones(len(room_ids), dtype=bool)
+
+
+def _day_mask(rule, origin, days, weekdays):
+    mask = np.ones(days, dtype=bool)
+    if rule.start_date is not None:
+        mask[:max(0, min(days, (rule.start_date - origin).days))] = False
+    if rule.end_date is not None:
+        mask[max(0, (rule.end_date - origin).days + 1):] = False
+    if rule.weekdays is not None:
+        mask &= (rule.weekdays >> weekdays & 1).astype(bool)
+    return mask
+
+
+def _apply(block, rule):
+    if rule.adjustment == 'fixed':
+        return np.full_like(block, int(rule.value * 100))
+    if rule.adjustment == 'percent':
+        return np.floor(block * (1 + float(rule.value) / 100) + 0.5).astype(np.int64)
+    return block + int(rule.value * 100)
+
+
+def compile_calendar(hotel_id, origin, days):
+    """
+    Compile a hotel's rooms and rate rules for the nights [origin, origin + days)
+
+    Returns:
+        RateCalendar
+    """
+    end = origin + timedelta(days=days)
+    rooms = db.session.query(Room.id, Room.room_type, Room.price_per_night).filter(
+        Room.hotel_id == hotel_id
+    ).order_by(Room.id).all()
+    rules = RateRule.query.filter(
+        RateRule.hotel_id == hotel_id,
+        db.or_(RateRule.start_date.is_(None), RateRule.start_date < end),
+        db.or_(RateRule.end_date.is_(None), RateRule.end_date >= origin)
+    ).order_by(RateRule.priority, RateRule.id).all()
+
+    # Rooms priced alike (same base price and type, no rule of their own)
+    # share one row, so a hotel typically compiles a handful of rows
+    own_rules = {rule.room_id for rule in rules if rule.room_id is not None}
+    profiles = {}
+    room_rows = {}
+    for room in rooms:
+        key = (room.id if room.id in own_rules else -1, room.room_type, int(room.price_per_night * 100))
+        room_rows[room.id] = profiles.setdefault(key, len(profiles))
+
+    profile_room_ids = np.array([key[0] for key in profiles], dtype=np.int64)
+    profile_types = np.array([key[1] for key in profiles], dtype=object)
+    base = np.array([key[2] for key in profiles], dtype=np.int64)
+    weekdays = (origin.weekday() + np.arange(days)) % 7
+
+    # Masks do not depend on the stay length: compute them once
+    targets = []
+    for rule in rules:
+        rows = np.flatnonzero(_room_mask(rule, profile_room_ids, profile_types))
+        cols = np.flatnonzero(_day_mask(rule, origin, days, weekdays))
+        if len(rows) and len(cols):
+            targets.append((rule, np.ix_(rows, cols)))
+
+    thresholds = [1] + sorted({rule.min_nights for rule, _ in targets if rule.min_nights and rule.min_nights > 1})
+    variants = []
+    for threshold in thresholds:
+        prices = np.repeat(base[:, None], days, axis=1)
+        for rule, index in targets:
+            if rule.min_nights and rule.min_nights > threshold:
+                continue
+            prices[index] = _apply(prices[index], rule)
+        np.maximum(prices, 0, out=prices)
+        variants.append(prices)
+
+    return RateCalendar(origin, days, room_rows, thresholds, variants)
+
+
+def to_amount(cents):
+    """Cents (numpy or int) to a 2-decimal Decimal"""
+    return Decimal(int(cents)).scaleb(-2)
+
+
+class RateCalendars:
+    """Per-worker LRU of compiled hotel rate calendars"""
+
+    def __init__(self, app=None):
+        self.horizon_days = 730
+        self.max_age = 300
+        self.max_hotels = 1000
+        self._calendars = OrderedDict()
+        self._lock = threading.Lock()
+        self.compilations = 0
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read calendar settings from the app config"""
+        self.horizon_days = app.config.get('RATE_CALENDAR_HORIZON_DAYS', 730)
+        self.max_age = app.config.get('RATE_CALENDAR_MAX_AGE', 300)
+        self.max_hotels = app.config.get('RATE_CALENDAR_MAX_HOTELS', 1000)
+        app.extensions['rate_calendars'] = self
+
+    def invalidate(self, hotel_ids=None):
+        """Drop the calendars of some hotels (all when None)"""
+        with self._lock:
+            if hotel_ids is None:
+                self._calendars.clear()
+            for hotel_id in hotel_ids or ():
+                self._calendars.pop(hotel_id, None)
+
+    def calendar(self, hotel_id, check_in, check_out, room_ids=()):
+        """
+        Calendar of a hotel covering the stay and the rooms
+
+        Stays outside [today, today + horizon) get a one-off calendar of
+        just their nights, which is not cached.
+        """
+        today = date.today()
+        if check_in < today or check_out > today + timedelta(days=self.horizon_days):
+            self.compilations += 1
+            return compile_calendar(hotel_id, check_in, (check_out - check_in).days)
+
+        with self._lock:
+            calendar = self._calendars.get(hotel_id)
+            if calendar is not None:
+                self._calendars.move_to_end(hotel_id)
+
+        fresh = (
+            calendar is not None
+            and calendar.origin == today
+            and time.monotonic() - calendar.built_at < self.max_age
+            and all(room_id in calendar.rows for room_id in room_ids)
+        )
+        if fresh:
+            return calendar
+
+        calendar = compile_calendar(hotel_id, today, self.horizon_days)
+        with self._lock:
+            self.compilations += 1
+            self._calendars[hotel_id] = calendar
+            self._calendars.move_to_end(hotel_id)
+            while len(self._calendars) > self.max_hotels:
+                self._calendars.popitem(last=False)
+        return calendar
+
+    def quote_rooms(self, rooms, check_in, check_out):
+        """
+        Price a stay for many rooms: one slice sum per hotel
+
+        Args:
+            rooms: Objects with id and hotel_id (Room instances or rows)
+
+        Returns:
+            Dict of room_id -> total price (Decimal)
+        """
+        by_hotel = {}
+        for room in rooms:
+            by_hotel.setdefault(room.hotel_id, []).append(room.id)
+
+        quotes = {}
+        for hotel_id, room_ids in by_hotel.items():
+            room_ids = list(dict.fromkeys(room_ids))
+            calendar = self.calendar(hotel_id, check_in, check_out, room_ids)
+            for room_id, cents in zip(room_ids, calendar.totals(room_ids, check_in, check_out)):
+                quotes[room_id] = to_amount(cents)
+        return quotes
+
+    def quote_room(self, room, check_in, check_out):
+        """Total price of a stay in one room (Decimal)"""
+        return self.quote_rooms([room], check_in, check_out)[room.id]
+
+    def nightly_prices(self, room, check_in, check_out):
+        """Per-night prices of one room for a stay (list of Decimal)"""
+        calendar = self.calendar(room.hotel_id, check_in, check_out, [room.id])
+        return [to_amount(cents) for cents in calendar.nightly(room.id, check_in, check_out)]
+
+    def stats(self):
+        with self._lock:
+            calendars = list(self._calendars.values())
+        return {
+            'hotels': len(calendars),
+            'compilations': self.compilations,
+            'total_bytes': sum(prices.nbytes for calendar in calendars for prices in calendar.prices),
+        }
+
+
+rate_calendars = RateCalendars()
@@ -0,0 +1,313 @@
+"""
+Contention-safe booking creation for HoteliaSEM
+
+A booking is created in one short transaction: the room row is locked
+(UPDLOCK on SQL Server, FOR UPDATE elsewhere, the database write lock on
+SQLite), overlapping confirmed bookings are looked up with a seek on
+ix_bookings_avail, and the booking is inserted and committed. Concurrent
+requests for the same room queue on the row lock; other rooms of the same
+hotel are not blocked. Deadlock victims and lock timeouts are retried a
+bounded number of times.
+
+Group bookings lock all their rooms in id order and insert every booking in
+one batch, so their cost barely grows with the number of rooms.
+
+Rooms held by another client (services.holds) are treated as booked; a
+client's own hold is converted with the same single locked insert. Holds are
+placed under the same room lock, so a hold and a booking of the same room
+cannot pass their checks concurrently.
+"""
+import random
+import time
+from datetime import date
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import and_, insert, literal_column, or_, select
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from database import db
+from models.booking import Booking
+from models.room import Room
+from services.availability import BLOCKING_STATUSES, overlapping_bookings
+from services.holds import hold_store
+from services.pricing import rate_calendars
+from utils.auth_helpers import generate_booking_reference, log_user_actions
+from utils.validators import ValidationError
+
+
+class BookingConflict(Exception):
+    """The room already has a confirmed booking (or another client's hold) overlapping the stay"""
+    pass
+
+
+def _begin_locking():
+    """SQLite has no row locks: take the database write lock before reading"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        connection = db.session.connection()
+        if not connection.connection.driver_connection.in_transaction:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def lock_room(room_id):
+    """Lock a room row until the end of the current transaction"""
+    _begin_locking()
+    statement = select(Room.id).where(Room.id == room_id).with_for_update().with_hint(
+        Room, 'WITH (UPDLOCK, ROWLOCK)', 'mssql'
+    )
+    return db.session.execute(statement).scalar_one_or_none()
+
+
+def has_overlap(room_id, check_in, check_out):
+    """Whether a confirmed booking overlaps [check_in, check_out) for the room"""
+    statement = select(literal_column('1')).where(overlapping_bookings(room_id, check_in, check_out))
+    return db.session.execute(statement).first() is not None
+
+
+def _retryable(error):
+    """Deadlocks, lock timeouts and busy databases"""
+    if isinstance(error, OperationalError):
+        return True
+    # SQL Server reports deadlock victims (1205) with SQLSTATE 40001
+    return '40001' in str(error.orig)
+
+
+def with_retries(operation):
+    """
+    Run a transactional operation, retrying deadlocks and lock timeouts
+
+    The session is rolled back before each retry and when giving up.
+    """
+    max_retries = current_app.config.get('BOOKING_MAX_RETRIES', 3)
+    backoff = current_app.config.get('BOOKING_RETRY_BACKOFF', 0.02)
+
+    for attempt in range(max_retries + 1):
+        try:
+            return operation()
+        except DBAPIError as e:
+            db.session.rollback()
+            if attempt == max_retries or not _retryable(e):
+                raise
+            # Jittered exponential backoff so retries do not collide again
+            time.sleep(backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def _book(room_id, hotel_id, user_id, check_in, check_out, num_adults, num_children,
+          total_price, special_requests):
+    """Lock the room, check for overlaps and insert the booking in one transaction"""
+    def attempt():
+        lock_room(room_id)
+        if has_overlap(room_id, check_in, check_out):
+            db.session.rollback()
+            raise BookingConflict('Room is already booked for these dates')
+        if hold_store.blocking(room_id, check_in, check_out, user_id) is not None:
+            db.session.rollback()
+            raise BookingConflict('Room is on hold for these dates')
+
+        booking = Booking(
+            booking_ref=generate_booking_reference(),
+            user_id=user_id,
+            hotel_id=hotel_id,
+            room_id=room_id,
+            check_in_date=check_in,
+            check_out_date=check_out,
+            num_adults=num_adults,
+            num_children=num_children,
+            total_price=total_price,
+            special_requests=special_requests
+        )
+        db.session.add(booking)
+        db.session.commit()
+        return booking
+
+    return with_retries(attempt)
+
+
+def reserve_room(room, user_id, check_in, check_out, num_adults, num_children=0, special_requests=None):
+    """
+    Atomically check the room is free for the stay and insert a booking
+
+    Args:
+        room: Room to book (already validated for availability and capacity)
+        user_id: Booking client
+
+    Returns:
+        The committed Booking
+
+    Raises:
+        BookingConflict: If a confirmed booking or another client's hold overlaps the stay
+    """
+    return _book(
+        room.id, room.hotel_id, user_id, check_in, check_out, num_adults, num_children,
+        total_price=rate_calendars.quote_room(room, check_in, check_out),
+        special_requests=special_requests
+    )
+
+
+def place_hold(room, user_id, check_in, check_out, num_adults, num_children=0):
+    """
+    Hold a room for a stay if no confirmed booking overlaps it
+
+    The overlap check and the hold are done under the room lock, the one
+    taken by booking creation; nothing is written to the database.
+
+    Returns:
+        The new hold dict
+
+    Raises:
+        BookingConflict: If a confirmed booking overlaps the stay
+        HoldConflict: If another client holds the room for overlapping dates
+        HoldLimitReached: If the client already has HOLD_MAX_PER_USER live holds
+    """
+    def attempt():
+        try:
+            lock_room(room.id)
+            if has_overlap(room.id, check_in, check_out):
+                raise BookingConflict('Room is already booked for these dates')
+            return hold_store.place(room, user_id, check_in, check_out, num_adults, num_children)
+        finally:
+            # Release the room lock
+            db.session.rollback()
+
+    return with_retries(attempt)
+
+
+def convert_hold(hold, special_requests=None):
+    """
+    Turn a live hold into a confirmed booking
+
+    The room, capacity and price were validated when the hold was placed, so
+    this is only the locked overlap check and insert; the held price is kept.
+    The hold is released once the booking is committed.
+
+    Returns:
+        The committed Booking
+
+    Raises:
+        BookingConflict: If a confirmed booking overlaps the stay
+    """
+    booking = _book(
+        hold['room_id'], hold['hotel_id'], hold['user_id'],
+        date.fromisoformat(hold['check_in_date']), date.fromisoformat(hold['check_out_date']),
+        hold['num_adults'], hold['num_children'],
+        total_price=Decimal(hold['total_price']),
+        special_requests=special_requests
+    )
+    hold_store.release(hold['id'])
+    return booking
+
+
+def _lock_rooms(room_ids):
+    """Lock many room rows in id order (a fixed order avoids deadlocks)"""
+    _begin_locking()
+    statement = select(Room).where(Room.id.in_(room_ids)).order_by(Room.id).with_for_update().with_hint(
+        Room, 'WITH (UPDLOCK, ROWLOCK)', 'mssql'
+    )
+    return {room.id: room for room in db.session.execute(statement).scalars()}
+
+
+def _validate_group(items, rooms):
+    """Check rooms, capacity and overlaps inside the request itself"""
+    for index, item in enumerate(items):
+        room = rooms.get(item['room_id'])
+        if room is None:
+            raise ValidationError(f"items[{index}]: room {item['room_id']} not found")
+        if not room.is_available:
+            raise ValidationError(f"items[{index}]: room {room.room_number} is not available")
+        if item['num_adults'] + item['num_children'] > room.max_guests:
+            raise ValidationError(f"items[{index}]: room {room.room_number} capacity is {room.max_guests} guests")
+
+    by_room = {}
+    for index, item in enumerate(items):
+        for other in by_room.get(item['room_id'], []):
+            if item['check_in'] < other['check_out'] and item['check_out'] > other['check_in']:
+                raise ValidationError(f"items[{index}]: overlaps another item for the same room")
+        by_room.setdefault(item['room_id'], []).append(item)
+
+
+def _conflicting_room_ids(items):
+    """Rooms with a confirmed booking overlapping any item, in one query"""
+    statement = select(Booking.room_id).where(
+        Booking.status.in_(BLOCKING_STATUSES),
+        or_(*[
+            and_(
+                Booking.room_id == item['room_id'],
+                Booking.check_in_date < item['check_out'],
+                Booking.check_out_date > item['check_in']
+            )
+            for item in items
+        ])
+    ).distinct()
+    return sorted(db.session.execute(statement).scalars())
+
+
+def reserve_rooms(user_id, items, special_requests=None):
+    """
+    Book many rooms all-or-nothing in one transaction
+
+    All rooms are loaded and locked in one query, overlaps with existing
+    bookings are checked in one query, the bookings are inserted in one
+    executemany and a single summarized audit entry is written.
+
+    Args:
+        user_id: Booking client
+        items: Dicts with room_id, check_in, check_out (dates), num_adults, num_children
+
+    Returns:
+        List of new booking ids, in item order
+
+    Raises:
+        ValidationError: Unknown or unavailable room, capacity, or items overlapping each other
+        BookingConflict: If an existing confirmed booking or another client's hold overlaps any item
+    """
+    room_ids = sorted({item['room_id'] for item in items})
+
+    def attempt():
+        rooms = _lock_rooms(room_ids)
+        try:
+            _validate_group(items, rooms)
+        except ValidationError:
+            db.session.rollback()
+            raise
+
+        conflicts = _conflicting_room_ids(items)
+        conflicts += sorted(hold_store.held_stays(items, user_id) - set(conflicts))
+        if conflicts:
+            db.session.rollback()
+            raise BookingConflict(f"Rooms already booked or held for these dates: {', '.join(map(str, conflicts))}")
+
+        rows = []
+        for item in items:
+            room = rooms[item['room_id']]
+            rows.append({
+                'booking_ref': generate_booking_reference(),
+                'user_id': user_id,
+                'hotel_id': room.hotel_id,
+                'room_id': room.id,
+                'check_in_date': item['check_in'],
+                'check_out_date': item['check_out'],
+                'num_adults': item['num_adults'],
+                'num_children': item['num_children'],
+                'total_price': rate_calendars.quote_room(room, item['check_in'], item['check_out']),
+                'status': 'confirmed',
+                'special_requests': special_requests,
+            })
+
+        booking_ids = db.session.execute(
+            insert(Booking).returning(Booking.id, sort_by_parameter_order=True), rows
+        ).scalars().all()
+
+        log_user_actions([{
+            'user_id': user_id,
+            'action': 'group_create',
+            'entity_type': 'booking',
+            'new_values': {
+                'booking_ids': booking_ids,
+                'room_ids': room_ids,
+                'total_price': float(sum(row['total_price'] for row in rows)),
+            },
+        }])
+        db.session.commit()
+        return booking_ids
+
+    return with_retries(attempt)
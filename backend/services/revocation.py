@@ -0,0 +1,203 @@
+"""
+Token revocation for HoteliaSEM
+Expiring set of revoked JWTs, checked on every authenticated request
+
+Access tokens carry the user's role and active state (see
+utils.auth_helpers.access_claims), so authorization needs no database
+lookup. Tokens are revoked before they expire in two ways:
+
+- one token (logout): its jti is kept until the token's own expiry
+- every token of a user issued up to now (deactivation, role change): a
+  per-user cutoff on the token's issue time, kept for JWT_ACCESS_TOKEN_EXPIRES.
+  Older refresh tokens are checked against the database when used anyway.
+
+iat only has whole seconds, which cannot tell a token issued just before a
+revocation from one issued (e.g. by a new login) just after it in the same
+second. Tokens therefore carry an iat_ms claim and cutoffs are kept in
+milliseconds; a token without iat_ms counts as issued at the start of its
+iat second, so a revocation is never missed.
+
+Backends:
+- memory: per-process (default, single worker deployments). Entries expire
+  lazily; past TOKEN_REVOCATION_MAX_ENTRIES revoked tokens, the ones
+  expiring first are folded into their user's cutoff, so memory stays
+  bounded without a revocation ever being forgotten.
+- redis: shared across gunicorn workers (requires the redis package)
+"""
+import heapq
+import threading
+import time
+
+
+class MemoryRevocations:
+    """Thread-safe in-process revocation set"""
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._tokens = {}  # jti -> (user_id, issued_ms, expires_at)
+        self._users = {}  # user_id -> (issued_ms cutoff, expires_at)
+        self._expiry = []  # heap of (expires_at, kind, key), may hold stale entries
+        self._lock = threading.Lock()
+        self.folded = 0
+
+    def _expire(self, now):
+        """Drop entries whose time is up (heap entries replaced since are skipped)"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, kind, key = heapq.heappop(self._expiry)
+            entries = self._tokens if kind == 'token' else self._users
+            entry = entries.get(key)
+            if entry is not None and entry[-1] == expires_at:
+                del entries[key]
+
+    def _cut(self, user_id, issued, expires_at):
+        cutoff, until = self._users.get(user_id, (issued, expires_at))
+        entry = (max(cutoff, issued), max(until, expires_at))
+        self._users[user_id] = entry
+        heapq.heappush(self._expiry, (entry[1], 'user', user_id))
+
+    def _fold(self):
+        """Replace the first-expiring revoked token by its user's cutoff"""
+        live_users = []
+        while self._expiry:
+            item = heapq.heappop(self._expiry)
+            expires_at, kind, key = item
+            if kind == 'user':
+                if key in self._users and self._users[key][1] == expires_at:
+                    live_users.append(item)
+                continue
+            entry = self._tokens.get(key)
+            if entry is not None and entry[2] == expires_at:
+                del self._tokens[key]
+                self._cut(*entry)
+                self.folded += 1
+                break
+        for item in live_users:
+            heapq.heappush(self._expiry, item)
+
+    def revoke_token(self, jti, user_id, issued, expires_at):
+        with self._lock:
+            self._expire(time.time())
+            self._tokens[jti] = (user_id, issued, expires_at)
+            heapq.heappush(self._expiry, (expires_at, 'token', jti))
+            while len(self._tokens) > self.max_entries:
+                self._fold()
+
+    def revoke_user(self, user_id, issued, expires_at):
+        with self._lock:
+            self._expire(time.time())
+            self._cut(user_id, issued, expires_at)
+
+    def is_revoked(self, jti, user_id, issued):
+        now = time.time()
+        with self._lock:
+            token = self._tokens.get(jti)
+            if token is not None and token[2] > now:
+                return True
+            user = self._users.get(user_id)
+            return user is not None and user[1] > now and issued <= user[0]
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self._expiry.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'tokens': len(self._tokens),
+                'users': len(self._users),
+                'max_entries': self.max_entries,
+                'folded': self.folded,
+            }
+
+
+class RedisRevocations:
+    """
+    Revocation set shared by all workers through Redis
+
+    One key per revoked jti and one per user cutoff, each expiring with the
+    entry; checking a token is a single MGET.
+    """
+
+    def __init__(self, url, prefix='hsem:revoked:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for TOKEN_REVOCATION_BACKEND='redis'")
+
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def revoke_token(self, jti, user_id, issued, expires_at):
+        self._client.set(f'{self.prefix}jti:{jti}', 1, pxat=int(expires_at * 1000) + 1)
+
+    def revoke_user(self, user_id, issued, expires_at):
+        self._client.set(f'{self.prefix}user:{user_id}', issued, pxat=int(expires_at * 1000) + 1)
+
+    def is_revoked(self, jti, user_id, issued):
+        token, cutoff = self._client.mget(f'{self.prefix}jti:{jti}', f'{self.prefix}user:{user_id}')
+        return token is not None or (cutoff is not None and issued <= int(cutoff))
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + '*'):
+            self._client.delete(key)
+
+    def stats(self):
+        return {'backend': 'redis'}
+
+
+class TokenRevocations:
+    """Revokes tokens and checks decoded tokens against the revocation set"""
+
+    def __init__(self, app=None):
+        self.backend = MemoryRevocations()
+        self.user_ttl = 3600
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Select the backend from TOKEN_REVOCATION_BACKEND"""
+        backend = app.config.get('TOKEN_REVOCATION_BACKEND', 'memory')
+        self.user_ttl = app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()
+
+        if backend == 'redis':
+            self.backend = RedisRevocations(app.config['CATALOG_CACHE_REDIS_URL'])
+        else:
+            self.backend = MemoryRevocations(app.config.get('TOKEN_REVOCATION_MAX_ENTRIES', 100000))
+
+        app.extensions['token_revocations'] = self
+
+    @staticmethod
+    def issue_claims():
+        """Claims added to every token issued (see the module docstring)"""
+        return {'iat_ms': int(time.time() * 1000)}
+
+    @staticmethod
+    def _issued(payload):
+        """Issue time of a decoded token in ms, the start of its iat second without iat_ms"""
+        issued = payload.get('iat_ms')
+        return issued if isinstance(issued, int) else payload['iat'] * 1000
+
+    def revoke_token(self, payload):
+        """Revoke one decoded token until it expires"""
+        self.backend.revoke_token(payload['jti'], str(payload['sub']), self._issued(payload), payload['exp'])
+
+    def revoke_user(self, user_id):
+        """Revoke every token issued to a user up to now"""
+        now = time.time()
+        self.backend.revoke_user(str(user_id), int(now * 1000), now + self.user_ttl)
+
+    def is_revoked(self, payload):
+        return self.backend.is_revoked(payload['jti'], str(payload['sub']), self._issued(payload))
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return self.backend.stats()
+
+
+token_revocations = TokenRevocations()
@@ -0,0 +1,117 @@
+"""
+Authenticated-user cache for HoteliaSEM
+Cross-request cache of the user rows loaded from access tokens
+
+Every authenticated request resolves its user once (see
+utils.auth_helpers.get_current_user). With AUTH_USER_CACHE_BACKEND set,
+that load is served from a short-TTL cache instead of a SELECT:
+
+- memory: per-process LRU bounded by AUTH_USER_CACHE_MAX_ENTRIES
+- redis: shared across gunicorn workers (requires the redis package)
+- none: every request loads its user from the database (default)
+
+Cached rows are re-attached to the request's session without a query, so
+routes can still modify and commit the user. Writes to a user (role,
+activation, profile, password) invalidate its entry; with the memory
+backend other workers keep their copy for at most AUTH_USER_CACHE_TTL
+seconds.
+"""
+from datetime import datetime
+
+from flask import g
+from sqlalchemy.orm import make_transient_to_detached
+
+from database import db
+from models.user import User
+from services.cache import MemoryCache, NullCache, RedisCache
+
+USER_COLUMNS = [column.key for column in User.__table__.columns]
+DATETIME_COLUMNS = {column.key for column in User.__table__.columns if isinstance(column.type, db.DateTime)}
+
+
+def _snapshot(user):
+    """JSON-safe column values of a loaded user"""
+    return {
+        key: value.isoformat() if key in DATETIME_COLUMNS and value is not None else value
+        for key in USER_COLUMNS
+        for value in [getattr(user, key)]
+    }
+
+
+def _restore(snapshot):
+    """Session-attached User rebuilt from a snapshot, without a query"""
+    user = User.__mapper__.class_manager.new_instance()
+    for key, value in snapshot.items():
+        if key in DATETIME_COLUMNS and value is not None:
+            value = datetime.fromisoformat(value)
+        setattr(user, key, value)
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+
+def _reset_request_user():
+    """
+    Start every request without a resolved user
+
+    g outlives a request when an app context is pushed around several
+    (CLI, tests).
+    """
+    g.pop('auth_user', None)
+
+
+class UserCache:
+    """Loads users by id through an optional TTL cache"""
+
+    def __init__(self, app=None):
+        self.cache = NullCache()
+        self.ttl = 30
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Select the backend from AUTH_USER_CACHE_BACKEND"""
+        backend = app.config.get('AUTH_USER_CACHE_BACKEND', 'none')
+        self.ttl = app.config.get('AUTH_USER_CACHE_TTL', 30)
+
+        if backend == 'memory':
+            self.cache = MemoryCache(app.config.get('AUTH_USER_CACHE_MAX_ENTRIES', 10000))
+        elif backend == 'redis':
+            self.cache = RedisCache(app.config['CATALOG_CACHE_REDIS_URL'], prefix='hsem:users:')
+        else:
+            self.cache = NullCache()
+
+        app.before_request(_reset_request_user)
+        app.extensions['user_cache'] = self
+
+    def load(self, user_id):
+        """
+        User by id, attached to the current session
+
+        Returns:
+            User or None
+        """
+        if user_id is None:
+            return None
+
+        snapshot = self.cache.get(str(user_id))
+        if snapshot is not None:
+            return _restore(snapshot)
+
+        user = db.session.get(User, int(user_id))
+        if user is not None:
+            self.cache.set(str(user_id), _snapshot(user), self.ttl)
+        return user
+
+    def invalidate(self, *user_ids):
+        """Drop cached users after they were modified"""
+        self.cache.delete(*[str(user_id) for user_id in user_ids])
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self):
+        return self.cache.stats()
+
+
+user_cache = UserCache()
@@ -1,26 +1,23 @@
 """Authentication helper utilities"""
-import secrets
-import string
 from datetime import datetime, timedelta
 from functools import wraps
-from flask import request, jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask import current_app, g, has_request_context, request, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 from models.user import User
 from models.audit_log import AuditLog
+from services.user_cache import user_cache
+from utils.references import reference_ids
 import json
 
 
 def generate_booking_reference():
-    """Generate unique booking reference (e.g., HSEM-ABC123)"""
-    random_part = ''.join(secrets.choice(string.ascii_uppercase + string.digits) for _ in range(6))
-    return f"HSEM-{random_part}"
+    """Generate unique booking reference (e.g., HSEM-0JA3Q9V8K2M1X7R)"""
+    return reference_ids.next_reference('HSEM')
 
 
 def generate_transaction_reference():
-    """Generate unique transaction reference"""
-    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-    random_part = ''.join(secrets.choice(string.digits) for _ in range(4))
-    return f"TXN-{timestamp}-{random_part}"
+    """Generate unique transaction reference (e.g., TXN-0JA3Q9V8K2M1X7S)"""
+    return reference_ids.next_reference('TXN')
 
 
 def get_client_ip():
@@ -63,18 +60,109 @@ def log_user_action(user_id, action, entity_type, entity_id=None, old_values=Non
         print(f"[v0] Audit log error: {str(e)}")
 
 
-def get_current_user():
-    """Get current authenticated user from JWT token"""
+def log_user_actions(entries):
+    """
+    Add many audit entries to the current transaction in one batch
+    
+    Args:
+        entries: Iterable of dicts with log_user_action() arguments
+    
+    Unlike log_user_action, nothing is committed here: the entries are
+    written together with the caller's batch. Outside a request (CLI,
+    background jobs) no IP address is recorded and the agent is 'system'.
+    """
+    if has_request_context():
+        ip_address = get_client_ip()
+        user_agent = get_user_agent()
+    else:
+        ip_address = None
+        user_agent = 'system'
+    
+    AuditLog.log_actions([
+        {
+            **entry,
+            'old_values': json.dumps(entry['old_values']) if entry.get('old_values') else None,
+            'new_values': json.dumps(entry['new_values']) if entry.get('new_values') else None,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+        }
+        for entry in entries
+    ])
+
+
+def load_current_user():
+    """
+    Resolve the request's user once and keep it for the rest of the request
+    
+    The token is only verified if no decorator has done it yet, and the
+    user is loaded through user_cache. Raises if the token is missing or
+    invalid.
+    
+    Returns:
+        User or None if the token's user no longer exists
+    """
+    if 'auth_user' in g:
+        return g.auth_user
+    
     try:
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        # Not verified yet in this request
         verify_jwt_in_request()
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        return user
+    
+    g.auth_user = user_cache.load(user_id)
+    return g.auth_user
+
+
+def get_optional_identity():
+    """
+    Identity of the request's access token, or None
+    
+    For public endpoints: a missing, invalid, expired or revoked token is
+    treated as anonymous instead of failing the request with 401/422.
+    """
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def get_current_user():
+    """Get current authenticated user from JWT token"""
+    try:
+        return load_current_user()
     except Exception as e:
         print(f"[v0] Error getting current user: {str(e)}")
         return None
 
 
+def access_claims(user):
+    """
+    Claims embedded in the user's access tokens (JWT_ROLE_CLAIMS)
+    
+    Usage:
+        create_access_token(identity=user.id, additional_claims=access_claims(user))
+    """
+    if not current_app.config.get('JWT_ROLE_CLAIMS', True):
+        return {}
+    return {'role': user.user_type, 'active': user.is_active}
+
+
+def token_role():
+    """
+    Role and active state from the verified token's claims
+    
+    Returns:
+        (role, is_active), or (None, None) for tokens issued without claims
+    """
+    claims = get_jwt()
+    if 'role' not in claims:
+        return None, None
+    return claims['role'], bool(claims.get('active'))
+
+
 def create_token_response(user, access_token, refresh_token=None):
     """Create standardized token response"""
     response_data = {
@@ -0,0 +1,58 @@
+"""Sparse fieldset helpers (?fields=...) for HoteliaSEM list endpoints"""
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy.orm import load_only
+
+from utils.validators import ValidationError
+
+
+def parse_fields(value, allowed):
+    """
+    Parse a comma-separated fields parameter against the allowed field names
+
+    Returns:
+        Tuple of field names in request order (always starting with 'id'),
+        or None when the full representation is requested
+    """
+    if not value:
+        return None
+
+    fields = ['id']
+    for part in value.split(','):
+        field = part.strip()
+        if field and field not in fields:
+            fields.append(field)
+
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValidationError(f"Unknown field: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+
+    return tuple(fields)
+
+
+def projection(model, fields, *required):
+    """
+    load_only() option so only the requested columns are SELECTed
+
+    Args:
+        model: Mapped class
+        fields: Field names from parse_fields
+        *required: Extra column names needed by the query itself (sort keys)
+    """
+    columns = dict.fromkeys(list(fields) + list(required))
+    return load_only(*[getattr(model, name) for name in columns])
+
+
+def json_value(value):
+    """Convert a column value to its JSON representation"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def project(obj, fields):
+    """Serialize only the requested fields of a model instance"""
+    return {field: json_value(getattr(obj, field)) for field in fields}
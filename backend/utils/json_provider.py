@@ -0,0 +1,52 @@
+"""
+Fast JSON provider for HoteliaSEM
+
+Swaps Flask's stdlib json encoder for orjson (C encoder) when it is installed
+and selected with JSON_PROVIDER. Output is equivalent to the default provider:
+sorted keys, and anything orjson does not handle natively (Decimal, dates)
+goes through Flask's default conversion.
+"""
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider with orjson doing the encoding and decoding"""
+
+    def _options(self, pretty=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options()).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build the response body as bytes, skipping the str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the JSON provider selected by JSON_PROVIDER"""
+    name = app.config.get('JSON_PROVIDER', 'orjson')
+    if name != 'orjson':
+        return
+
+    if orjson is None:
+        print("[v0] orjson is not installed, using the default JSON provider")
+        return
+
+    app.json = OrjsonProvider(app)
@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination helpers for HoteliaSEM list endpoints"""
+import base64
+import json
+
+from flask import current_app
+
+from utils.validators import ValidationError
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode an opaque cursor back into its sort key values
+
+    Raises:
+        ValidationError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValidationError("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise ValidationError("Invalid cursor")
+
+    return values
+
+
+def parse_limit(value):
+    """Clamp the requested page size to the configured bounds"""
+    default = current_app.config['PAGINATION_DEFAULT_LIMIT']
+    maximum = current_app.config['PAGINATION_MAX_LIMIT']
+
+    if value is None or value == '':
+        return default
+
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError("limit must be an integer")
+
+    if limit < 1:
+        raise ValidationError("limit must be at least 1")
+
+    return min(limit, maximum)
+
+
+def paginate_keyset(query, limit, cursor_for):
+    """
+    Fetch one page from an already ordered and cursor-filtered query
+
+    One extra row is fetched to detect whether another page exists, so no
+    COUNT(*) over the full result set is ever issued.
+
+    Args:
+        query: Ordered query positioned after the previous cursor
+        limit: Page size
+        cursor_for: Callable returning the cursor values for a row
+
+    Returns:
+        Tuple of (rows, next_cursor)
+    """
+    rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(cursor_for(rows[-1]))
+
+    return rows, next_cursor
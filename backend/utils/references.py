@@ -0,0 +1,152 @@
+"""
+Reference IDs for bookings and transactions
+
+References are generated in-process, without a database lookup, as a
+fixed-width Crockford base32 encoding of a 75-bit integer:
+
+    41 bits  milliseconds since 2024-01-01 (until 2093)
+     7 bits  host id (REFERENCE_HOST_ID, default: a hash of the host name)
+    15 bits  process slot, unique among the live processes of the host
+    12 bits  sequence within the millisecond (4096 ids/ms per process)
+
+IDs from one process are strictly increasing. When the clock stalls or goes
+backwards, or a millisecond's sequence is exhausted, the generator borrows
+the next millisecond instead of sleeping.
+
+The process slot starts from the process id and is claimed with a
+non-blocking lock on a per-slot file in the temp directory, held for the
+life of the process, so forked workers on a host never share a slot (where
+file locks are unavailable, the low bits of the process id are used).
+Set REFERENCE_HOST_ID (0-127) to a distinct value per host or container
+when several of them write to the same database: host name hashes may
+collide.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'  # Crockford base32, no I/L/O/U
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+
+TIMESTAMP_BITS = 41
+HOST_BITS = 7
+SLOT_BITS = 15
+NODE_BITS = HOST_BITS + SLOT_BITS
+SEQUENCE_BITS = 12
+ID_LENGTH = 15  # ceil(75 / 5) base32 characters
+
+MAX_HOST = (1 << HOST_BITS) - 1
+MAX_SLOT = (1 << SLOT_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+SLOT_DIRECTORY = os.path.join(tempfile.gettempdir(), 'hoteliasem-reference-slots')
+
+
+def default_host_id():
+    """Hash of the host name (distinct hosts may collide: set REFERENCE_HOST_ID)"""
+    return zlib.crc32(socket.gethostname().encode('utf-8')) & MAX_HOST
+
+
+def claim_slot(directory=SLOT_DIRECTORY):
+    """
+    Claim a process slot no other live process on this host holds
+
+    Returns:
+        (slot, open lock file to keep for the life of the process, or None)
+    """
+    start = os.getpid() & MAX_SLOT
+    if fcntl is None:
+        return start, None
+
+    os.makedirs(directory, exist_ok=True)
+    for offset in range(MAX_SLOT + 1):
+        slot = (start + offset) & MAX_SLOT
+        handle = open(os.path.join(directory, str(slot)), 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return slot, handle
+        except OSError:
+            handle.close()
+    raise RuntimeError('No free reference ID process slot on this host')
+
+
+def encode(value):
+    """Fixed-width base32 encoding of a non-negative integer"""
+    chars = []
+    for _ in range(ID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+class ReferenceGenerator:
+    """Monotonic, per-node unique reference IDs (thread and fork safe)"""
+
+    def __init__(self, host_id=None):
+        self._host = host_id
+        self._slot_file = None
+        self._lock = threading.Lock()
+        self._reset()
+
+    def init_app(self, app):
+        """Use REFERENCE_HOST_ID from the app config when set"""
+        host_id = app.config.get('REFERENCE_HOST_ID')
+        if host_id is not None and host_id != '':
+            host_id = int(host_id)
+            if not 0 <= host_id <= MAX_HOST:
+                raise ValueError(f'REFERENCE_HOST_ID must be between 0 and {MAX_HOST}')
+            with self._lock:
+                self._host = host_id
+                self._node = None
+
+    def _reset(self):
+        self._pid = os.getpid()
+        if self._slot_file is not None:
+            # Inherited from the parent, whose lock this copy must not keep
+            self._slot_file.close()
+            self._slot_file = None
+        self._node = None  # slot claimed on first use
+        self._last_ms = 0
+        self._sequence = 0
+
+    def _claim_node(self):
+        host = self._host if self._host is not None else default_host_id()
+        if self._slot_file is None:
+            self._slot, self._slot_file = claim_slot()
+        self._node = (host << SLOT_BITS) | self._slot
+
+    def next_id(self):
+        """Next 75-bit id as an integer"""
+        with self._lock:
+            if os.getpid() != self._pid:
+                # Forked worker: take a process slot of its own
+                self._reset()
+            if self._node is None:
+                self._claim_node()
+
+            now = int(time.time() * 1000) - EPOCH_MS
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            elif self._sequence < MAX_SEQUENCE:
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+
+            return (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self._node << SEQUENCE_BITS) | self._sequence
+
+    def next_reference(self, prefix):
+        """Next reference such as HSEM-0JA3Q9V8K2M1X7R"""
+        return f'{prefix}-{encode(self.next_id())}'
+
+
+reference_ids = ReferenceGenerator()
@@ -0,0 +1,54 @@
+"""
+Row-to-JSON serialization for HoteliaSEM list endpoints
+
+List endpoints select plain column tuples (query.with_entities(...)) instead
+of hydrating ORM objects, and turn them into dicts here with one converter
+per column chosen once from the column type, not per value.
+"""
+from sqlalchemy import Date, DateTime, Numeric
+
+
+def columns_for(model, fields=None):
+    """Mapped columns for the given field names (default: model.SERIALIZED_FIELDS)"""
+    return [getattr(model, name) for name in (fields or model.SERIALIZED_FIELDS)]
+
+
+def _converter(column):
+    if isinstance(column.type, Numeric):
+        return float
+    if isinstance(column.type, (Date, DateTime)):
+        return _isoformat
+    return None
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def serialize_rows(rows, columns):
+    """
+    Convert result rows to JSON-ready dicts keyed by column name
+
+    Rows may carry extra trailing entities (e.g. a sort key for the cursor);
+    only the first len(columns) values are emitted.
+
+    Args:
+        rows: Result rows selected with columns first
+        columns: Mapped columns from columns_for()
+    """
+    names = [column.key for column in columns]
+    converters = [
+        (name, convert) for name, convert in
+        ((column.key, _converter(column)) for column in columns)
+        if convert is not None
+    ]
+
+    payloads = []
+    for row in rows:
+        data = dict(zip(names, row))
+        for name, convert in converters:
+            value = data[name]
+            if value is not None:
+                data[name] = convert(value)
+        payloads.append(data)
+    return payloads
@@ -81,3 +81,142 @@ def validate_full_name(name):
         raise ValidationError("Full name must not exceed 120 characters")
     
     return name.strip()
+
+
+def parse_iso_datetime(value, name):
+    """
+    Parse an optional ISO date or datetime query parameter
+
+    Returns:
+        datetime (midnight for a plain date), or None when the value is empty
+    """
+    from datetime import datetime
+
+    if not value:
+        return None
+
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Invalid {name}. Use ISO format (YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS)")
+
+
+def parse_price(value, name):
+    """
+    Parse an optional non-negative price query parameter
+
+    Returns:
+        float, or None when the value is empty
+    """
+    import math
+
+    if value is None or value == '':
+        return None
+
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"{name} must be a number")
+    if not math.isfinite(price) or price < 0:
+        raise ValidationError(f"{name} must be a finite, non-negative number")
+    return price
+
+
+def validate_date_range(check_in, check_out, allow_past=False):
+    """
+    Validate an ISO (YYYY-MM-DD) stay date range
+
+    Returns:
+        Tuple of (check_in, check_out) as date objects
+    """
+    from datetime import datetime, date
+
+    if not check_in or not check_out:
+        raise ValidationError("check_in and check_out dates are required")
+
+    try:
+        check_in = datetime.fromisoformat(check_in).date()
+        check_out = datetime.fromisoformat(check_out).date()
+    except (TypeError, ValueError):
+        raise ValidationError("Invalid date format. Use ISO format (YYYY-MM-DD)")
+
+    if check_out <= check_in:
+        raise ValidationError("Check-out date must be after check-in date")
+
+    if not allow_past and check_in < date.today():
+        raise ValidationError("Check-in date cannot be in the past")
+
+    return check_in, check_out
+
+
+def validate_rate_rule(data):
+    """
+    Validate a rate rule payload
+
+    Accepts room_id or room_type (whole hotel when both are omitted),
+    start_date/end_date (inclusive ISO dates), weekdays (0 = Monday ... 6),
+    min_nights, adjustment ('fixed', 'percent', 'amount'), value, priority
+    and name.
+
+    Returns:
+        Dict of RateRule column values
+    """
+    from datetime import datetime
+    from decimal import Decimal, InvalidOperation
+
+    if not isinstance(data, dict):
+        raise ValidationError("Rate rule must be a JSON object")
+
+    adjustment = data.get('adjustment')
+    if adjustment not in ('fixed', 'percent', 'amount'):
+        raise ValidationError("adjustment must be one of: fixed, percent, amount")
+
+    try:
+        value = Decimal(str(data['value'])).quantize(Decimal('0.01'))
+    except (KeyError, InvalidOperation):
+        raise ValidationError("value is required and must be a number")
+    if adjustment == 'fixed' and value <= 0:
+        raise ValidationError("A fixed nightly price must be positive")
+    if adjustment == 'percent' and value < -100:
+        raise ValidationError("A percent adjustment cannot be below -100")
+
+    if data.get('room_id') is not None and data.get('room_type'):
+        raise ValidationError("Give room_id or room_type, not both")
+
+    dates = {}
+    for name in ('start_date', 'end_date'):
+        try:
+            dates[name] = datetime.fromisoformat(data[name]).date() if data.get(name) else None
+        except (TypeError, ValueError):
+            raise ValidationError(f"Invalid {name}. Use ISO format (YYYY-MM-DD)")
+    if dates['start_date'] and dates['end_date'] and dates['end_date'] < dates['start_date']:
+        raise ValidationError("end_date must not be before start_date")
+
+    weekdays = None
+    if data.get('weekdays') is not None:
+        days = data['weekdays']
+        if not isinstance(days, list) or not days or not all(isinstance(day, int) and 0 <= day <= 6 for day in days):
+            raise ValidationError("weekdays must be a non-empty list of integers from 0 (Monday) to 6 (Sunday)")
+        weekdays = sum(1 << day for day in set(days))
+
+    try:
+        room_id = int(data['room_id']) if data.get('room_id') is not None else None
+        min_nights = int(data['min_nights']) if data.get('min_nights') is not None else None
+        priority = int(data.get('priority', 0))
+    except (TypeError, ValueError):
+        raise ValidationError("room_id, min_nights and priority must be integers")
+    if min_nights is not None and min_nights < 1:
+        raise ValidationError("min_nights must be at least 1")
+
+    return {
+        'room_id': room_id,
+        'room_type': data.get('room_type') or None,
+        'name': (data.get('name') or '')[:100] or None,
+        'start_date': dates['start_date'],
+        'end_date': dates['end_date'],
+        'weekdays': weekdays,
+        'min_nights': min_nights,
+        'adjustment': adjustment,
+        'value': value,
+        'priority': priority,
+    }
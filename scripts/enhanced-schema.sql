@@ -157,6 +157,24 @@ BEGIN
 END
 GO
 
+-- Index de pagination par curseur (created_at DESC, id DESC) par perimetre
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_created')
+    CREATE INDEX IX_bookings_created       ON bookings(created_at DESC, id DESC);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_user_created')
+    CREATE INDEX IX_bookings_user_created  ON bookings(user_id, created_at DESC, id DESC);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_hotel_created')
+    CREATE INDEX IX_bookings_hotel_created ON bookings(hotel_id, created_at DESC, id DESC);
+-- Index couvrant du calendrier d'occupation par hotel
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_hotel_stay')
+    CREATE INDEX IX_bookings_hotel_stay    ON bookings(hotel_id, check_in_date, check_out_date)
+        INCLUDE (status, total_price);
+-- Index du balayage de cycle de vie (confirmed -> completed / no-show)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_status_checkin')
+    CREATE INDEX IX_bookings_status_checkin  ON bookings(status, check_in_date, id);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='IX_bookings_status_checkout')
+    CREATE INDEX IX_bookings_status_checkout ON bookings(status, check_out_date, id);
+GO
+
 -- ============================================================================
 -- 5. TABLE TRANSACTIONS (DECIMAL + coherence financiere)
 -- ============================================================================
@@ -360,7 +378,97 @@ END
 GO
 
 -- ============================================================================
-PRINT 'SCHEMA HOTELIASEM AMELIORE - 11 TABLES CREEES AVEC SUCCES';
+-- 12. NOUVELLE TABLE: HOTEL_SUMMARY (Projection materialisee des listes)
+-- ============================================================================
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='hotel_summary' AND xtype='U')
+BEGIN
+    CREATE TABLE hotel_summary (
+        hotel_id             INT PRIMARY KEY,
+        min_price            DECIMAL(18,2),
+        max_price            DECIMAL(18,2),
+        room_count           INT NOT NULL DEFAULT 0,
+        available_room_count INT NOT NULL DEFAULT 0,
+        free_rooms_today     INT NOT NULL DEFAULT 0,
+        rating               DECIMAL(3,2) NOT NULL DEFAULT 0,
+        updated_at           DATETIME NOT NULL DEFAULT GETUTCDATE(),
+        CONSTRAINT FK_summary_hotel FOREIGN KEY (hotel_id) REFERENCES hotels(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IX_summary_price ON hotel_summary(min_price, hotel_id);  -- tri/filtre par prix
+    PRINT 'Table hotel_summary creee (flask rebuild-hotel-summary pour la remplir)';
+END
+GO
+
+-- ============================================================================
+-- 13. NOUVELLE TABLE: IDEMPOTENCY_KEYS (Rejeu des POST avec Idempotency-Key)
+-- ============================================================================
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='idempotency_keys' AND xtype='U')
+BEGIN
+    CREATE TABLE idempotency_keys (
+        id              INT IDENTITY(1,1) PRIMARY KEY,
+        user_id         INT NOT NULL,
+        endpoint        NVARCHAR(200) NOT NULL,
+        idem_key        NVARCHAR(100) NOT NULL,
+        fingerprint     NVARCHAR(64) NOT NULL,
+        status          NVARCHAR(20) NOT NULL DEFAULT 'in_progress',
+        response_status INT,
+        response_body   NVARCHAR(MAX),
+        created_at      DATETIME NOT NULL DEFAULT GETUTCDATE(),
+        expires_at      DATETIME NOT NULL,
+        CONSTRAINT FK_idem_user         FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        CONSTRAINT UQ_idempotency_scope UNIQUE (user_id, endpoint, idem_key),
+        CONSTRAINT CK_idempotency_status CHECK (status IN ('in_progress','completed'))
+    );
+    CREATE INDEX IX_idem_expires ON idempotency_keys(expires_at);
+    PRINT 'Table idempotency_keys creee';
+END
+GO
+
+-- ============================================================================
+-- 14. NOUVELLE TABLE: JOB_WATERMARKS (Progression des traitements par lots)
+-- ============================================================================
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='job_watermarks' AND xtype='U')
+BEGIN
+    CREATE TABLE job_watermarks (
+        job        NVARCHAR(50) PRIMARY KEY,
+        value      NVARCHAR(100) NOT NULL,
+        updated_at DATETIME NOT NULL DEFAULT GETUTCDATE()
+    );
+    PRINT 'Table job_watermarks creee';
+END
+GO
+
+-- ============================================================================
+-- 15. NOUVELLE TABLE: RATE_RULES (Tarifs saisonniers, semaine, duree de sejour)
+-- ============================================================================
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='rate_rules' AND xtype='U')
+BEGIN
+    CREATE TABLE rate_rules (
+        id          INT IDENTITY(1,1) PRIMARY KEY,
+        hotel_id    INT NOT NULL,
+        room_id     INT NULL,                       -- une chambre, ou
+        room_type   NVARCHAR(50) NULL,              -- un type de chambre, ou tout l'hotel
+        name        NVARCHAR(100) NULL,
+        start_date  DATE NULL,                      -- bornes incluses, ouvertes si NULL
+        end_date    DATE NULL,
+        weekdays    INT NULL,                       -- masque de bits, bit 0 = lundi
+        min_nights  INT NULL,                       -- regle de duree de sejour
+        adjustment  NVARCHAR(10) NOT NULL,
+        value       DECIMAL(18,2) NOT NULL,
+        priority    INT NOT NULL DEFAULT 0,
+        created_at  DATETIME NOT NULL DEFAULT GETUTCDATE(),
+        CONSTRAINT FK_rate_hotel FOREIGN KEY (hotel_id) REFERENCES hotels(id) ON DELETE CASCADE,
+        CONSTRAINT FK_rate_room  FOREIGN KEY (room_id)  REFERENCES rooms(id),
+        CONSTRAINT CK_rate_adjustment CHECK (adjustment IN ('fixed','percent','amount')),
+        CONSTRAINT CK_rate_dates      CHECK (end_date IS NULL OR start_date IS NULL OR end_date >= start_date),
+        CONSTRAINT CK_rate_weekdays   CHECK (weekdays IS NULL OR weekdays BETWEEN 1 AND 127)
+    );
+    CREATE INDEX IX_rate_rules_hotel ON rate_rules(hotel_id);
+    PRINT 'Table rate_rules creee';
+END
+GO
+
+-- ============================================================================
+PRINT 'SCHEMA HOTELIASEM AMELIORE - 15 TABLES CREEES AVEC SUCCES';
 PRINT 'Ameliorations: DECIMAL financier, 3 nouvelles tables, index composites';
 PRINT 'et filtres, contraintes metier renforcees, support 3D et tri-canal.';
 GO